@@ -1,8 +1,14 @@
 """Shared API dependencies."""
 
 import socketio
+from fastapi import HTTPException, Query
 
+from app.core.config import settings
+from app.models.table import CellWindow, TableQuery
 from app.services.config_service import ConfigService
+from app.services.query_service import QueryService
+from app.services.search_service import SearchService
+from app.services.stats_service import StatsService
 from app.services.table_service import TableService
 
 # Global reference to the socketio server (set by main.py)
@@ -22,6 +28,14 @@ def get_socketio_server() -> socketio.AsyncServer:
     return _socketio_server
 
 
+def require_postgres() -> None:
+    """Reject endpoints backed by Postgres-only functions when running on SQLite."""
+    if settings.db_backend == "sqlite":
+        raise HTTPException(
+            status_code=501, detail="Not available with the SQLite backend (DB_BACKEND=sqlite)"
+        )
+
+
 def get_table_service() -> TableService:
     """Get table service instance."""
     return TableService()
@@ -30,3 +44,45 @@ def get_table_service() -> TableService:
 def get_config_service() -> ConfigService:
     """Get config service instance."""
     return ConfigService()
+
+
+def get_query_service() -> QueryService:
+    """Get query service instance."""
+    return QueryService()
+
+
+def get_search_service() -> SearchService:
+    """Get search service instance."""
+    return SearchService()
+
+
+def get_stats_service() -> StatsService:
+    """Get stats service instance."""
+    return StatsService()
+
+
+def get_cell_window(
+    row_start: int = Query(0, ge=0, description="First row of the window"),
+    row_end: int | None = Query(None, ge=0, description="Row after the last row of the window"),
+    col_start: int = Query(0, ge=0, description="First column of the window"),
+    col_end: int | None = Query(
+        None, ge=0, description="Column after the last column of the window"
+    ),
+) -> CellWindow:
+    """Get the requested cell window from query parameters."""
+    return CellWindow(row_start=row_start, row_end=row_end, col_start=col_start, col_end=col_end)
+
+
+def get_table_query(
+    filter: list[str] = Query([], description="Column predicate 'col:op:value' (repeatable)"),
+    sort: list[str] = Query([], description="Sort key 'col' or '-col' (repeatable)"),
+    limit: int = Query(100, ge=1, le=settings.query_page_max_size),
+    offset: int = Query(0, ge=0),
+) -> TableQuery:
+    """Get table query filters, sort keys and row page from query parameters."""
+    return TableQuery(
+        filters=[QueryService.parse_filter(raw) for raw in filter],
+        sort=[QueryService.parse_sort(raw) for raw in sort],
+        limit=limit,
+        offset=offset,
+    )
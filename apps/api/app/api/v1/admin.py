@@ -0,0 +1,25 @@
+"""Operator endpoints, authorized with the JOB_KEY."""
+
+from fastapi import APIRouter, Depends, Query
+
+from app.api.dependencies import get_search_service, require_postgres
+from app.core.security import require_operator
+from app.models.table import TableSearchResponse
+from app.services.search_service import SearchService
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(require_operator), Depends(require_postgres)],
+)
+
+
+@router.get("/search", response_model=TableSearchResponse)
+async def search_tables(
+    q: str = Query(..., min_length=1, max_length=200, description="Web search style query"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    search_service: SearchService = Depends(get_search_service),
+):
+    """Search cell values, titles and descriptions across all live tables."""
+    return await search_service.search(q, limit, offset)
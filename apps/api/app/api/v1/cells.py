@@ -1,16 +1,39 @@
 """Cell management endpoints."""
 
-from fastapi import APIRouter, Depends, HTTPException
+import logging
+from typing import Any
 
-from app.api.dependencies import get_socketio_server, get_table_service
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.api.dependencies import get_cell_window, get_socketio_server, get_table_service
+from app.core.config import settings
+from app.core.rate_limit import enforce_write_rate_limit
+from app.core.realtime import cell_update_body, room_events
 from app.core.security import extract_bearer_token, verify_token
-from app.models.table import CellBatchUpdateRequest
+from app.core.serialization import RawJSONResponse
+from app.core.tasks import TaskPriority, task_queue
+from app.core.traffic import note_batch
+from app.models.table import CellBatchUpdateRequest, CellWindow
 from app.services.table_service import TableService
 
 router = APIRouter(prefix="/tables", tags=["cells"])
 
-# We'll get the socketio server from main module when needed
-sio = None
+logger = logging.getLogger("api.realtime")
+
+
+async def broadcast_cell_update(room: str, event: dict[str, Any]) -> None:
+    """Emit a sequenced cell update to the clients in a table room."""
+    await get_socketio_server().emit("cell_update", event, room=room)
+    logger.info(
+        "Cell update broadcast",
+        extra={
+            "extra_fields": {
+                "table_id": event["table_id"],
+                "room": room,
+                "cells_updated": len(event["rows"] if "rows" in event else event["cells"]),
+            }
+        },
+    )
 
 
 @router.post("/{slug}/cells")
@@ -27,31 +50,23 @@ async def update_cells(
     if role not in ["admin", "editor"]:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
+    enforce_write_rate_limit(table["id"], authorization, role, cells=len(request.cells))
+    note_batch(len(request.cells))
+
     # Update cells in database
-    await table_service.update_cells(table["id"], request.cells)
+    await table_service.update_cells(table, request.cells)
 
-    # Emit real-time update to other clients in the table room
-    sio = get_socketio_server()
+    # Sequence the update now; other clients get it from the task queue after we respond
     room = f"table:{table['id']}"
-    cell_updates = [
-        {"row": cell.row, "col": cell.col, "value": cell.value} for cell in request.cells
-    ]
-
-    await sio.emit("cell_update", {"table_id": table["id"], "cells": cell_updates}, room=room)
-
-    # Log the real-time update
-    import logging
-
-    logger = logging.getLogger("api.realtime")
-    logger.info(
-        "Cell update broadcast",
-        extra={
-            "extra_fields": {
-                "table_id": table["id"],
-                "room": room,
-                "cells_updated": len(cell_updates),
-            }
-        },
+    event = {"table_id": table["id"], **cell_update_body(request.cells)}
+    seq = room_events.append(room, event)
+    task_queue.submit(
+        broadcast_cell_update,
+        room,
+        {**event, "seq": seq, "epoch": room_events.epoch},
+        priority=TaskPriority.HIGH,
+        key=room,
+        retries=0,
     )
 
     return {"success": True, "updated_cells": len(request.cells)}
@@ -60,10 +75,15 @@ async def update_cells(
 @router.get("/{slug}/cells")
 async def get_cells(
     slug: str,
+    window: CellWindow = Depends(get_cell_window),
+    after: str | None = Query(None, description="Keyset cursor ('row:col') from next_cursor"),
+    limit: int | None = Query(None, ge=1, le=settings.cell_page_max_size),
     table_service: TableService = Depends(get_table_service),
     authorization: str = Depends(extract_bearer_token),
 ):
-    """Get all cell data for a table."""
+    """Get cell data for a table, optionally windowed and paginated by (row, col)."""
     table, _role = await verify_token(slug, authorization)
-    cells = await table_service.get_cells(table["id"])
+    if settings.fast_serialization or limit is not None:
+        return RawJSONResponse(await table_service.get_cells_payload(table, window, after, limit))
+    cells = await table_service.get_cells(table, window)
     return {"cells": cells}
@@ -1,32 +1,93 @@
-"""Configuration endpoints."""
+"""Configuration endpoints.
+
+Responses come precomputed from the process-wide config cache and carry a
+strong ETag, so browsers and CDNs revalidate with ``If-None-Match`` and get
+an empty 304 while the configuration is unchanged. While the configuration
+cannot be loaded at all, they get an uncacheable 503 instead of an empty one.
+"""
 
 from typing import Any
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Request
+from starlette.responses import JSONResponse, Response
 
-from app.api.dependencies import get_config_service
-from app.services.config_service import ConfigService
+from app.core.compression import select_encoding
+from app.core.config import settings
+from app.core.logging import request_id_context
+from app.services.config_service import ConfigPayload, ConfigSnapshot, config_cache
 
 router = APIRouter(prefix="/config", tags=["config"])
 
+# Payloads below this size are sent uncompressed, matching CompressionMiddleware
+MIN_COMPRESS_SIZE = 1024
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison, RFC 9110)."""
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+def _cached_response(request: Request, payload: ConfigPayload) -> Response:
+    """Serve a precomputed payload, or 304 when the client already has it."""
+    encoding = None
+    if len(payload.body) >= MIN_COMPRESS_SIZE:
+        encoding = select_encoding(request.headers.get("accept-encoding", ""))
+    body, etag = payload.encoded(encoding)
+
+    headers = {
+        "ETag": etag,
+        "Cache-Control": (
+            f"public, max-age={settings.config_cache_max_age}, "
+            f"stale-while-revalidate={settings.config_cache_max_age * 5}"
+        ),
+        "Vary": "Accept-Encoding",
+    }
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _unavailable_response() -> Response:
+    """503 for the fallback snapshot, kept out of browser and CDN caches."""
+    return JSONResponse(
+        status_code=503,
+        content={
+            "detail": {
+                "error": "Configuration unavailable, please retry",
+                "request_id": request_id_context.get(""),
+            }
+        },
+        headers={"Cache-Control": "no-store", "Retry-After": "1"},
+    )
+
+
+async def _snapshot() -> ConfigSnapshot | None:
+    """Get the config snapshot, None when only the fallback is available."""
+    snapshot = await config_cache.get()
+    return None if snapshot.fallback else snapshot
+
 
 @router.get("", response_model=dict[str, Any])
-async def get_config(
-    config_service: ConfigService = Depends(get_config_service),
-):
+async def get_config(request: Request):
     """Get all application configuration for frontend."""
-    return await config_service.get_all_config_for_frontend()
+    snapshot = await _snapshot()
+    if snapshot is None:
+        return _unavailable_response()
+    return _cached_response(request, snapshot.frontend)
 
 
 @router.get("/{key}")
-async def get_config_value(
-    key: str,
-    locale: str = "en",
-    config_service: ConfigService = Depends(get_config_service),
-):
+async def get_config_value(request: Request, key: str, locale: str = "en"):
     """Get a specific configuration value by key."""
-    value = await config_service.get_config_value(key, locale)
-    if value is None:
+    snapshot = await _snapshot()
+    if snapshot is None:
+        return _unavailable_response()
+    payload = snapshot.value_payload(key, locale)
+    if payload is None:
         return {"error": f"Configuration key '{key}' not found"}
 
-    return {"key": key, "value": value, "locale": locale}
+    return _cached_response(request, payload)
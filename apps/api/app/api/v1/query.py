@@ -0,0 +1,39 @@
+"""Table query endpoints (Postgres only; 501 on the SQLite backend)."""
+
+from fastapi import APIRouter, Depends, Query
+
+from app.api.dependencies import get_query_service, get_table_query, require_postgres
+from app.core.security import extract_bearer_token, verify_token
+from app.models.table import RangeOverlapResponse, TableQuery, TableQueryResponse
+from app.services.query_service import QueryService
+
+router = APIRouter(prefix="/tables", tags=["query"], dependencies=[Depends(require_postgres)])
+
+
+@router.get("/{slug}/query", response_model=TableQueryResponse)
+async def query_table(
+    slug: str,
+    query: TableQuery = Depends(get_table_query),
+    query_service: QueryService = Depends(get_query_service),
+    authorization: str = Depends(extract_bearer_token),
+):
+    """Filter, sort and paginate table rows on the server.
+
+    Filters are ``col:op:value`` (repeatable, all must match) and sort keys are
+    ``col`` or ``-col``. Only the cells of the requested page of rows are returned.
+    """
+    table, _role = await verify_token(slug, authorization)
+    return await query_service.query_rows(table, query)
+
+
+@router.get("/{slug}/columns/{col}/overlaps", response_model=RangeOverlapResponse)
+async def find_overlaps(
+    slug: str,
+    col: int,
+    limit: int = Query(100, ge=1, le=1000),
+    query_service: QueryService = Depends(get_query_service),
+    authorization: str = Depends(extract_bearer_token),
+):
+    """Find rows whose time ranges in a timerange column overlap, e.g. double bookings."""
+    table, _role = await verify_token(slug, authorization)
+    return await query_service.find_overlaps(table, col, limit)
@@ -0,0 +1,40 @@
+"""Table stats endpoints (Postgres only; 501 on the SQLite backend)."""
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.api.dependencies import get_stats_service, require_postgres
+from app.core.rate_limit import enforce_write_rate_limit
+from app.core.security import extract_bearer_token, verify_token
+from app.models.table import StatsRebuildResponse, TableStatsResponse
+from app.services.stats_service import StatsService
+
+router = APIRouter(prefix="/tables", tags=["stats"], dependencies=[Depends(require_postgres)])
+
+
+@router.get("/{slug}/stats", response_model=TableStatsResponse)
+async def get_table_stats(
+    slug: str,
+    stats_service: StatsService = Depends(get_stats_service),
+    authorization: str = Depends(extract_bearer_token),
+):
+    """Get per-column counts, and date range and per-date occupancy for date columns."""
+    table, _role = await verify_token(slug, authorization)
+    return await stats_service.get_stats(table)
+
+
+@router.post("/{slug}/stats/rebuild", response_model=StatsRebuildResponse)
+async def rebuild_table_stats(
+    slug: str,
+    stats_service: StatsService = Depends(get_stats_service),
+    authorization: str = Depends(extract_bearer_token),
+):
+    """Recompute stats from the table's cells (admin only)."""
+    table, role = await verify_token(slug, authorization)
+
+    # Only admin can force a rebuild
+    if role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    enforce_write_rate_limit(table["id"], authorization, role, cells=table["rows"] * table["cols"])
+
+    return await stats_service.rebuild(table)
@@ -1,17 +1,36 @@
 """Table management endpoints."""
 
-from fastapi import APIRouter, Depends, HTTPException
+from collections import Counter
+from collections.abc import AsyncIterator
 
-from app.api.dependencies import get_table_service
-from app.core.security import extract_bearer_token, verify_token
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from app.api.dependencies import get_cell_window, get_table_service
+from app.core.config import settings
+from app.core.db_scheduler import DatabaseUnavailableError
+from app.core.rate_limit import enforce_create_rate_limit, enforce_write_rate_limit
+from app.core.security import extract_bearer_token, verify_token, verify_tokens
+from app.core.serialization import RawJSONResponse
+from app.core.stale_cache import stale_tables
+from app.core.traffic import note_batch
 from app.models.table import (
     AddColumnRequest,
     AddRowRequest,
+    BatchCreateTableRequest,
+    BatchCreateTableResponse,
+    BatchGetTablesRequest,
+    BatchGetTablesResponse,
+    CellWindow,
+    CloneTableRequest,
     CreateTableRequest,
     CreateTableResponse,
     RemoveColumnRequest,
     RemoveRowRequest,
     RowColumnResponse,
+    StorageModeRequest,
+    StorageModeResponse,
     TableConfigRequest,
     TableConfigResponse,
     TableResponse,
@@ -24,22 +43,104 @@ router = APIRouter(prefix="/tables", tags=["tables"])
 @router.post("", response_model=CreateTableResponse)
 async def create_table(
     request: CreateTableRequest,
+    http_request: Request,
     locale: str = "en",
     table_service: TableService = Depends(get_table_service),
 ):
     """Create a new table with admin and editor tokens."""
+    enforce_create_rate_limit(http_request)
     return await table_service.create_table(request, locale)
 
 
+@router.post("/batch", response_model=BatchCreateTableResponse)
+async def create_tables(
+    request: BatchCreateTableRequest,
+    http_request: Request,
+    locale: str = "en",
+    table_service: TableService = Depends(get_table_service),
+):
+    """Create several tables in one transaction, returning tokens in request order."""
+    enforce_create_rate_limit(http_request, tables=len(request.tables))
+    note_batch(len(request.tables))
+    tables = await table_service.create_tables(request.tables, locale)
+    return BatchCreateTableResponse(tables=tables)
+
+
+@router.post("/batch-get", response_model=BatchGetTablesResponse)
+async def get_tables(
+    request: BatchGetTablesRequest,
+    table_service: TableService = Depends(get_table_service),
+):
+    """Load several tables by slug and token, with a result or error per table in request order.
+
+    Tokens are checked with one query up front. The authorized tables are
+    then fetched and encoded while the body streams, so a table is sent as
+    soon as it is read and memory holds one chunk of tables, not the batch.
+    """
+    if not 1 <= len(request.tables) <= settings.table_batch_limit:
+        raise ValueError(f"Batches must contain 1 to {settings.table_batch_limit} tables")
+    note_batch(len(request.tables))
+
+    verified = await verify_tokens([(item.slug, item.token) for item in request.tables])
+    authorized = {
+        result[0]["id"]: result[0] for result in verified if not isinstance(result, HTTPException)
+    }
+    # Tables come back in first-request order; payloads of tables requested again are kept
+    remaining = Counter(
+        result[0]["id"] for result in verified if not isinstance(result, HTTPException)
+    )
+
+    async def body() -> AsyncIterator[bytes]:
+        payloads = table_service.iter_tables_payloads(list(authorized.values()))
+        repeated: dict[str, bytes] = {}
+        yield b'{"tables":['
+        for i, (item, result) in enumerate(zip(request.tables, verified, strict=True)):
+            slug = orjson.dumps(item.slug)
+            if isinstance(result, HTTPException):
+                error = {"status": result.status_code, "error": result.detail["error"]}
+                entry = b'{"slug":' + slug + b',"table":null,"error":' + orjson.dumps(error)
+            else:
+                table_id = result[0]["id"]
+                payload = repeated.pop(table_id, None)
+                if payload is None:
+                    _, payload = await anext(payloads)
+                remaining[table_id] -= 1
+                if remaining[table_id]:
+                    repeated[table_id] = payload
+                entry = b'{"slug":' + slug + b',"table":' + payload + b',"error":null'
+            yield (b"," if i else b"") + entry + b"}"
+        yield b"]}"
+
+    return StreamingResponse(body(), media_type="application/json")
+
+
 @router.get("/{slug}", response_model=TableResponse)
 async def get_table(
     slug: str,
+    window: CellWindow = Depends(get_cell_window),
     table_service: TableService = Depends(get_table_service),
     authorization: str = Depends(extract_bearer_token),
 ):
-    """Get table data with admin or editor token."""
-    table, _role = await verify_token(slug, authorization)
-    return await table_service.get_table_with_columns(table["id"])
+    """Get table data with admin or editor token, optionally limited to a cell window.
+
+    While the database is unavailable, the last payload served for the same
+    window is returned with ``X-Data-Stale: true`` and its age, if there is one.
+    """
+    try:
+        table, _role = await verify_token(slug, authorization)
+        if not settings.fast_serialization:
+            return await table_service.get_table_with_columns(table["id"], window)
+        payload = await table_service.get_table_payload(table, window)
+    except DatabaseUnavailableError:
+        stale = stale_tables.get(slug, authorization, window)
+        if stale is None:
+            raise
+        payload, age = stale
+        return RawJSONResponse(payload, headers={"X-Data-Stale": "true", "Age": str(int(age))})
+
+    stale_tables.put(table, window, payload)
+    # Pre-encoded bytes skip response_model validation; the model still documents the schema
+    return RawJSONResponse(payload)
 
 
 @router.put("/{slug}/config", response_model=TableConfigResponse)
@@ -56,7 +157,7 @@ async def update_table_config(
     if role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
 
-    result = await table_service.update_table_config(table["id"], request)
+    result = await table_service.update_table_config(table, request)
     return TableConfigResponse(**result)
 
 
@@ -74,6 +175,9 @@ async def add_rows(
     if role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
 
+    enforce_write_rate_limit(table["id"], authorization, role, cells=request.count * table["cols"])
+    note_batch(request.count)
+
     result = await table_service.add_rows(table["id"], request)
     return RowColumnResponse(**result)
 
@@ -92,6 +196,9 @@ async def remove_rows(
     if role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
 
+    enforce_write_rate_limit(table["id"], authorization, role, cells=request.count * table["cols"])
+    note_batch(request.count)
+
     result = await table_service.remove_rows(table["id"], request)
     return RowColumnResponse(**result)
 
@@ -110,6 +217,9 @@ async def add_columns(
     if role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
 
+    enforce_write_rate_limit(table["id"], authorization, role, cells=request.count * table["rows"])
+    note_batch(request.count)
+
     result = await table_service.add_columns(table["id"], request)
     return RowColumnResponse(**result)
 
@@ -128,5 +238,48 @@ async def remove_columns(
     if role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
 
+    enforce_write_rate_limit(table["id"], authorization, role, cells=request.count * table["rows"])
+    note_batch(request.count)
+
     result = await table_service.remove_columns(table["id"], request)
     return RowColumnResponse(**result)
+
+
+@router.put("/{slug}/storage", response_model=StorageModeResponse)
+async def migrate_storage(
+    slug: str,
+    request: StorageModeRequest,
+    table_service: TableService = Depends(get_table_service),
+    authorization: str = Depends(extract_bearer_token),
+):
+    """Migrate table cells between per-cell rows and row blocks (admin only)."""
+    table, role = await verify_token(slug, authorization)
+
+    # Only admin can change storage
+    if role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    enforce_write_rate_limit(table["id"], authorization, role, cells=table["rows"] * table["cols"])
+
+    result = await table_service.migrate_storage(table, request.storage_mode)
+    return StorageModeResponse(**result)
+
+
+@router.post("/{slug}/clone", response_model=CreateTableResponse)
+async def clone_table(
+    slug: str,
+    request: CloneTableRequest,
+    table_service: TableService = Depends(get_table_service),
+    authorization: str = Depends(extract_bearer_token),
+):
+    """Copy a table's settings, columns and optionally cells into a new table (admin only)."""
+    table, role = await verify_token(slug, authorization)
+
+    # Only admin can clone
+    if role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    cells = table["rows"] * table["cols"] if request.include_cells else 0
+    enforce_write_rate_limit(table["id"], authorization, role, cells=cells)
+
+    return await table_service.clone_table(table, request)
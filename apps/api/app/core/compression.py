@@ -0,0 +1,111 @@
+"""Content-negotiated response compression."""
+
+import gzip
+import time
+
+import anyio
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import Response
+
+from app.core.metrics import metrics
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional, gzip is always available
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript")
+
+# Bodies above this size are compressed in a worker thread to keep the event loop free
+THREAD_OFFLOAD_SIZE = 256 * 1024
+
+
+def select_encoding(accept_encoding: str) -> str | None:
+    """Pick the best supported encoding from an Accept-Encoding header."""
+    weights: dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            weights[name] = quality
+
+    wildcard = weights.get("*", 0.0)
+    candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best = max(candidates, key=lambda name: weights.get(name, wildcard))
+    return best if weights.get(best, wildcard) > 0 else None
+
+
+class CompressionMiddleware(BaseHTTPMiddleware):
+    """Compress large responses with brotli or gzip based on Accept-Encoding.
+
+    Only responses with a known Content-Length at or above ``minimum_size`` are
+    compressed, so tiny bodies go out as-is and streaming responses are never
+    buffered.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        super().__init__(app)
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def dispatch(self, request: Request, call_next):
+        response: Response = await call_next(request)
+
+        encoding = select_encoding(request.headers.get("accept-encoding", ""))
+        if encoding is None or not self._should_compress(response):
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        if len(body) >= THREAD_OFFLOAD_SIZE:
+            compressed, cpu_seconds = await anyio.to_thread.run_sync(self._compress, body, encoding)
+        else:
+            compressed, cpu_seconds = self._compress(body, encoding)
+
+        metrics.incr(f"compression.responses.{encoding}")
+        metrics.incr("compression.bytes_in", len(body))
+        metrics.incr("compression.bytes_out", len(compressed))
+        metrics.incr("compression.bytes_saved", len(body) - len(compressed))
+        metrics.observe("compression.cpu_ms", cpu_seconds * 1000)
+
+        headers = [
+            (key, value)
+            for key, value in response.raw_headers
+            if key not in (b"content-length", b"content-encoding")
+        ]
+        compressed_response = Response(content=compressed, status_code=response.status_code)
+        compressed_response.raw_headers = [
+            *headers,
+            (b"content-encoding", encoding.encode("latin-1")),
+            (b"content-length", str(len(compressed)).encode("latin-1")),
+        ]
+        compressed_response.headers.add_vary_header("Accept-Encoding")
+        return compressed_response
+
+    def _should_compress(self, response: Response) -> bool:
+        """Check size, content type and existing encoding of a response."""
+        if "content-encoding" in response.headers:
+            return False
+
+        content_length = response.headers.get("content-length")
+        if content_length is None or int(content_length) < self.minimum_size:
+            return False
+
+        content_type = response.headers.get("content-type", "")
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    def _compress(self, body: bytes, encoding: str) -> tuple[bytes, float]:
+        """Compress a body and return it with the CPU time spent."""
+        start = time.thread_time()
+        if encoding == "br":
+            compressed = brotli.compress(body, quality=self.brotli_quality)
+        else:
+            compressed = gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+        return compressed, time.thread_time() - start
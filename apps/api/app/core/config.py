@@ -11,7 +11,9 @@ load_dotenv()
 class Settings(BaseModel):
     """Application settings."""
 
-    # Database
+    # Database backend: "supabase", or "sqlite" for an embedded file on single-node installs
+    db_backend: str = os.getenv("DB_BACKEND", "supabase").lower()
+    sqlite_path: str = os.getenv("SQLITE_PATH", "data/online-tables.db")
     supabase_url: str = os.getenv("SUPABASE_URL", "")
     supabase_service_role_key: str = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "")
 
@@ -58,6 +60,10 @@ class Settings(BaseModel):
     # Table limits
     table_row_limit: int = int(os.getenv("TABLE_ROW_LIMIT", "500"))
     table_col_limit: int = int(os.getenv("TABLE_COL_LIMIT", "64"))
+    # Row limit for tables stored as row blocks (storage_mode = "blocks")
+    block_table_row_limit: int = int(os.getenv("BLOCK_TABLE_ROW_LIMIT", "50000"))
+    # Tables per batch create or batch get request
+    table_batch_limit: int = int(os.getenv("TABLE_BATCH_LIMIT", "50"))
 
     # CSV settings
     csv_delimiter: str = os.getenv("CSV_DELIMITER", ";")
@@ -65,8 +71,139 @@ class Settings(BaseModel):
     allow_editor_export: bool = os.getenv("ALLOW_EDITOR_EXPORT", "false").lower() == "true"
     allow_editor_import: bool = os.getenv("ALLOW_EDITOR_IMPORT", "false").lower() == "true"
 
+    # Performance
+    fast_serialization: bool = os.getenv("FAST_SERIALIZATION", "true").lower() == "true"
+    cell_page_max_size: int = int(os.getenv("CELL_PAGE_MAX_SIZE", "5000"))
+    query_page_max_size: int = int(os.getenv("QUERY_PAGE_MAX_SIZE", "500"))
+    query_max_predicates: int = int(os.getenv("QUERY_MAX_PREDICATES", "8"))
+
+    # Compression
+    compression_min_size: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    compression_gzip_level: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    compression_brotli_quality: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+    socketio_http_compression: bool = (
+        os.getenv("SOCKETIO_HTTP_COMPRESSION", "true").lower() == "true"
+    )
+    socketio_compression_threshold: int = int(os.getenv("SOCKETIO_COMPRESSION_THRESHOLD", "1024"))
+    # Socket.IO packet serializer: "json" (default) or "msgpack" (binary, needs the web app
+    # built with NEXT_PUBLIC_SOCKETIO_MSGPACK=true)
+    socketio_serializer: str = os.getenv("SOCKETIO_SERIALIZER", "json")
+    # Send cell_update cells as rows/cols/values arrays instead of one object per cell; enable
+    # once every served web bundle reads both shapes
+    socketio_columnar_updates: bool = (
+        os.getenv("SOCKETIO_COLUMNAR_UPDATES", "false").lower() == "true"
+    )
+    # Recent cell_update events kept per table room for replay after reconnects
+    socketio_replay_buffer: int = int(os.getenv("SOCKETIO_REPLAY_BUFFER", "256"))
+    socketio_replay_max_rooms: int = int(os.getenv("SOCKETIO_REPLAY_MAX_ROOMS", "1000"))
+
+    # Health probe
+    health_probe_interval: float = float(os.getenv("HEALTH_PROBE_INTERVAL", "10"))
+    health_probe_timeout: float = float(os.getenv("HEALTH_PROBE_TIMEOUT", "5"))
+
+    # Write rate limits per role (requests and cells per second, with burst sizes); a rate of
+    # 0 disables that limit
+    rate_limit_enabled: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    rate_limit_admin_rps: float = float(os.getenv("RATE_LIMIT_ADMIN_RPS", "20"))
+    rate_limit_admin_burst: float = float(os.getenv("RATE_LIMIT_ADMIN_BURST", "40"))
+    rate_limit_admin_cells_per_sec: float = float(
+        os.getenv("RATE_LIMIT_ADMIN_CELLS_PER_SEC", "5000")
+    )
+    rate_limit_admin_cell_burst: float = float(os.getenv("RATE_LIMIT_ADMIN_CELL_BURST", "20000"))
+    rate_limit_editor_rps: float = float(os.getenv("RATE_LIMIT_EDITOR_RPS", "10"))
+    rate_limit_editor_burst: float = float(os.getenv("RATE_LIMIT_EDITOR_BURST", "20"))
+    rate_limit_editor_cells_per_sec: float = float(
+        os.getenv("RATE_LIMIT_EDITOR_CELLS_PER_SEC", "2000")
+    )
+    rate_limit_editor_cell_burst: float = float(os.getenv("RATE_LIMIT_EDITOR_CELL_BURST", "5000"))
+    # Table creation per client IP (requests and tables per second, with burst sizes); behind
+    # a proxy, CLIENT_IP_HEADER names the header carrying the client address
+    rate_limit_create_rps: float = float(os.getenv("RATE_LIMIT_CREATE_RPS", "1"))
+    rate_limit_create_burst: float = float(os.getenv("RATE_LIMIT_CREATE_BURST", "10"))
+    rate_limit_create_tables_per_sec: float = float(
+        os.getenv("RATE_LIMIT_CREATE_TABLES_PER_SEC", "2")
+    )
+    rate_limit_create_table_burst: float = float(os.getenv("RATE_LIMIT_CREATE_TABLE_BURST", "100"))
+    client_ip_header: str | None = os.getenv("CLIENT_IP_HEADER") or None
+
+    # Database concurrency per lane; queries waiting longer than the timeout get 503
+    db_read_concurrency: int = int(os.getenv("DB_READ_CONCURRENCY", "8"))
+    db_write_concurrency: int = int(os.getenv("DB_WRITE_CONCURRENCY", "4"))
+    db_admin_concurrency: int = int(os.getenv("DB_ADMIN_CONCURRENCY", "2"))
+    db_queue_timeout: float = float(os.getenv("DB_QUEUE_TIMEOUT", "2.0"))
+
+    # Supabase HTTP client: request and connect timeouts (seconds), pooled connections (at
+    # least the sum of the lane limits), idle keep-alive (seconds) and HTTP/2
+    db_timeout: float = float(os.getenv("DB_TIMEOUT", "10"))
+    db_connect_timeout: float = float(os.getenv("DB_CONNECT_TIMEOUT", "3"))
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", "16"))
+    db_keepalive: float = float(os.getenv("DB_KEEPALIVE", "30"))
+    db_http2: bool = os.getenv("DB_HTTP2", "true").lower() == "true"
+
+    # Reads failing with a transient error are retried with jittered backoff (base delay in
+    # seconds); after THRESHOLD consecutive transient failures (0 disables) queries fail fast
+    # with 503 for RESET_TIMEOUT seconds, then a single probe query decides whether to recover
+    db_read_retries: int = int(os.getenv("DB_READ_RETRIES", "2"))
+    db_retry_backoff: float = float(os.getenv("DB_RETRY_BACKOFF", "0.1"))
+    db_breaker_threshold: int = int(os.getenv("DB_BREAKER_THRESHOLD", "5"))
+    db_breaker_reset_timeout: float = float(os.getenv("DB_BREAKER_RESET_TIMEOUT", "15"))
+
+    # While the database is unavailable, GET /tables/{slug} serves the last payload sent for
+    # the same table and window, marked stale; memory budget in bytes (0 disables)
+    stale_cache_max_bytes: int = int(os.getenv("STALE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+    # Column stats are maintained incrementally; every interval (seconds, 0 disables) up to a
+    # batch of tables is re-aggregated, one per transaction: those with negative counts and
+    # those changed since a full rebuild older than max age (seconds)
+    stats_rebuild_interval: float = float(os.getenv("STATS_REBUILD_INTERVAL", "600"))
+    stats_rebuild_batch: int = int(os.getenv("STATS_REBUILD_BATCH", "20"))
+    stats_rebuild_max_age: float = float(os.getenv("STATS_REBUILD_MAX_AGE", "86400"))
+
+    # Tables idle longer than ARCHIVE_IDLE_DAYS (0 disables) have their cells archived in
+    # batches every interval (seconds), pausing between batches
+    archive_idle_days: float = float(os.getenv("ARCHIVE_IDLE_DAYS", "90"))
+    archive_interval: float = float(os.getenv("ARCHIVE_INTERVAL", "3600"))
+    archive_batch_size: int = int(os.getenv("ARCHIVE_BATCH_SIZE", "10"))
+    archive_batch_delay: float = float(os.getenv("ARCHIVE_BATCH_DELAY", "1.0"))
+
+    # Purge of soft-deleted tables (scripts/purge_deleted_tables.py): retention in days, cells
+    # deleted per step and seconds between steps
+    purge_retention_days: float = float(os.getenv("PURGE_RETENTION_DAYS", "30"))
+    purge_chunk_size: int = int(os.getenv("PURGE_CHUNK_SIZE", "1000"))
+    purge_step_delay: float = float(os.getenv("PURGE_STEP_DELAY", "0.2"))
+
+    # Sanitized request traces for benchmarks/replay_traffic.py are appended to this file when
+    # set; SAMPLE is the share of tables (with all their requests) that is recorded. SALT keys
+    # the table slug hashes; set the same secret on every machine so traces can be merged
+    traffic_record_path: str | None = os.getenv("TRAFFIC_RECORD_PATH") or None
+    traffic_record_sample: float = float(os.getenv("TRAFFIC_RECORD_SAMPLE", "1.0"))
+    traffic_record_salt: str | None = os.getenv("TRAFFIC_RECORD_SALT") or None
+
+    # Background task queue for work that can finish after the response: capacity (realtime
+    # broadcasts are never dropped and may exceed it), workers, retries with exponential backoff
+    # (base delay in seconds) and the drain deadline at shutdown
+    task_queue_size: int = int(os.getenv("TASK_QUEUE_SIZE", "1000"))
+    task_workers: int = int(os.getenv("TASK_WORKERS", "4"))
+    task_max_retries: int = int(os.getenv("TASK_MAX_RETRIES", "3"))
+    task_retry_backoff: float = float(os.getenv("TASK_RETRY_BACKOFF", "0.5"))
+    task_drain_timeout: float = float(os.getenv("TASK_DRAIN_TIMEOUT", "10"))
+
+    # GET /config is served from memory; app_config is checked for changes every interval
+    # (seconds, 0 disables) and responses may be cached by clients for max-age seconds
+    config_refresh_interval: float = float(os.getenv("CONFIG_REFRESH_INTERVAL", "30"))
+    config_cache_max_age: int = int(os.getenv("CONFIG_CACHE_MAX_AGE", "60"))
+
+    # Operator endpoints (cross-table search); disabled unless JOB_KEY is set
+    job_key: str | None = os.getenv("JOB_KEY") or None
+    # Time budget of one cross-table search (seconds); an exceeded budget is reported as 504
+    search_timeout: float = float(os.getenv("SEARCH_TIMEOUT", "5"))
+
     def validate_required_settings(self) -> None:
         """Validate that required settings are present."""
+        if self.db_backend not in ("supabase", "sqlite"):
+            raise ValueError("DB_BACKEND must be 'supabase' or 'sqlite'")
+        if self.db_backend == "sqlite":
+            return
         if not self.supabase_url:
             raise ValueError("SUPABASE_URL environment variable is required")
         if not self.supabase_service_role_key:
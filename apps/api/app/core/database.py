@@ -1,13 +1,64 @@
 """Database client setup."""
 
-from supabase import Client, create_client
+import threading
+from typing import TYPE_CHECKING
 
 from app.core.config import settings
 
-# Supabase client instance
-supabase: Client = create_client(settings.supabase_url, settings.supabase_service_role_key)
+if TYPE_CHECKING:
+    from supabase import Client
 
+    from app.core.sqlite import SQLiteClient
 
-def get_supabase_client() -> Client:
-    """Get Supabase client instance."""
-    return supabase
+# Supabase client instance, created on first use: importing and building the
+# client is the largest part of startup, and scale-to-zero machines should
+# bind their port before paying for it
+_supabase: "Client | SQLiteClient | None" = None
+_supabase_lock = threading.Lock()
+
+
+def get_supabase_client() -> "Client | SQLiteClient":
+    """Get Supabase client instance, creating it on first call.
+
+    Safe to call from worker threads; the health probe makes the first call
+    off the event loop so requests normally find the client ready. With
+    ``DB_BACKEND=sqlite`` this is an embedded SQLite client with the same
+    query builder interface.
+    """
+    global _supabase
+    if _supabase is None:
+        with _supabase_lock:
+            if _supabase is None and settings.db_backend == "sqlite":
+                from app.core.sqlite import SQLiteClient
+
+                _supabase = SQLiteClient(settings.sqlite_path)
+            elif _supabase is None:
+                _supabase = _create_supabase_client()
+    return _supabase
+
+
+def _create_supabase_client() -> "Client":
+    """Create the Supabase client on an explicitly tuned HTTP connection pool.
+
+    Library defaults wait up to two minutes for a response, so a slow database
+    would hold every lane slot long before the circuit breaker could react.
+    The pool keeps one connection per worker thread alive between queries.
+    """
+    import httpx
+    from supabase import ClientOptions, create_client
+
+    http_client = httpx.Client(
+        timeout=httpx.Timeout(settings.db_timeout, connect=settings.db_connect_timeout),
+        limits=httpx.Limits(
+            max_connections=settings.db_pool_size,
+            max_keepalive_connections=settings.db_pool_size,
+            keepalive_expiry=settings.db_keepalive,
+        ),
+        http2=settings.db_http2,
+        follow_redirects=True,
+    )
+    return create_client(
+        settings.supabase_url,
+        settings.supabase_service_role_key,
+        options=ClientOptions(httpx_client=http_client),
+    )
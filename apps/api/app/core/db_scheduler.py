@@ -0,0 +1,285 @@
+"""Bounded database concurrency with priority lanes, read retries and a circuit breaker."""
+
+import asyncio
+import contextvars
+import logging
+import math
+import random
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from enum import StrEnum
+from typing import Any, TypeVar
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.logging import request_id_context
+from app.core.metrics import metrics
+
+logger = logging.getLogger("api.db")
+
+T = TypeVar("T")
+
+# PostgREST codes for a database it cannot reach; like transport errors they say nothing
+# about the query itself, only about the database's health. A canceled statement (57014) is
+# not one of them: statement timeouts and search deadlines cancel queries that are too
+# expensive, and retrying those or counting them against the breaker would let one heavy
+# client slow itself down threefold and open the breaker for everyone.
+TRANSIENT_DB_CODES = frozenset({"PGRST000", "PGRST001", "PGRST002", "PGRST003"})
+
+
+class DBLane(StrEnum):
+    """Database access lanes, each with its own concurrency limit."""
+
+    READ = "read"  # Interactive reads and auth lookups
+    WRITE = "write"  # Cell writes
+    ADMIN = "admin"  # Table creation and structural changes
+
+
+class DatabaseBusyError(HTTPException):
+    """Raised when a query waited longer than the queue timeout for its lane."""
+
+    def __init__(self, lane: DBLane):
+        super().__init__(
+            status_code=503,
+            detail={
+                "error": "Database busy, please retry",
+                "lane": lane.value,
+                "request_id": request_id_context.get(""),
+            },
+            headers={"Retry-After": "1"},
+        )
+
+
+class DatabaseUnavailableError(HTTPException):
+    """Raised without querying while the circuit breaker considers the database down."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(
+            status_code=503,
+            detail={
+                "error": "Database unavailable, please retry",
+                "request_id": request_id_context.get(""),
+            },
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+
+class BreakerState(StrEnum):
+    """Circuit breaker states."""
+
+    CLOSED = "closed"  # Queries run normally
+    HALF_OPEN = "half_open"  # One probe query decides whether to close again
+    OPEN = "open"  # Queries fail fast until the reset timeout passes
+
+
+# Gauge values for ``db.breaker.state``
+_BREAKER_GAUGE = {BreakerState.CLOSED: 0, BreakerState.HALF_OPEN: 1, BreakerState.OPEN: 2}
+
+
+def is_transient_error(error: Exception) -> bool:
+    """Whether a failed query points at an unreachable or overloaded database."""
+    import httpx
+
+    return (
+        isinstance(error, httpx.TransportError)
+        or getattr(error, "code", None) in TRANSIENT_DB_CODES
+    )
+
+
+class CircuitBreaker:
+    """Fail fast while the database is unhealthy instead of letting every request hang.
+
+    After ``threshold`` consecutive transient failures the breaker opens and
+    queries raise ``DatabaseUnavailableError`` (503) without touching the
+    database. Once ``reset_timeout`` seconds have passed, a single query is let
+    through as a probe: success closes the breaker, failure opens it again,
+    and a probe that ends without an answer (cancelled, or never run) lets the
+    next query probe instead. A threshold of 0 disables the breaker.
+    """
+
+    def __init__(self, threshold: int, reset_timeout: float):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = BreakerState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    def before_call(self) -> bool:
+        """Admit a query or raise ``DatabaseUnavailableError``; return whether it is the probe."""
+        if self.state == BreakerState.CLOSED:
+            return False
+
+        remaining = self._opened_at + self.reset_timeout - time.monotonic()
+        if self.state == BreakerState.OPEN and remaining <= 0:
+            self._set_state(BreakerState.HALF_OPEN)
+        if self.state == BreakerState.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+
+        metrics.incr("db.breaker.rejected")
+        raise DatabaseUnavailableError(max(remaining, 1.0))
+
+    def release(self, probe: bool) -> None:
+        """Give up an admitted query that got no answer, freeing the probe slot if it held it."""
+        if probe:
+            self._probing = False
+
+    def record_success(self) -> None:
+        """The database answered, even if with an error for the query itself."""
+        self._failures = 0
+        self._probing = False
+        if self.state != BreakerState.CLOSED:
+            logger.info("Database recovered, circuit breaker closed")
+            self._set_state(BreakerState.CLOSED)
+
+    def record_failure(self) -> None:
+        """Count a transient failure and open the breaker at the threshold."""
+        self._failures += 1
+        self._probing = False
+        if self.threshold <= 0:
+            return
+        if self.state == BreakerState.HALF_OPEN or self._failures >= self.threshold:
+            if self.state != BreakerState.OPEN:
+                metrics.incr("db.breaker.opened")
+                logger.warning(
+                    "Database unhealthy, circuit breaker opened",
+                    extra={
+                        "extra_fields": {
+                            "failures": self._failures,
+                            "reset_timeout": self.reset_timeout,
+                        }
+                    },
+                )
+            self._opened_at = time.monotonic()
+            self._set_state(BreakerState.OPEN)
+
+    def _set_state(self, state: BreakerState) -> None:
+        self.state = state
+        metrics.set_gauge("db.breaker.state", _BREAKER_GAUGE[state])
+
+    def stats(self) -> dict[str, Any]:
+        """Current state and consecutive transient failures."""
+        return {"state": self.state.value, "consecutive_failures": self._failures}
+
+
+class DBScheduler:
+    """Run blocking Supabase calls in worker threads with per-lane limits.
+
+    Each lane has its own semaphore, so a burst of heavy structural operations
+    can only occupy the admin lane and never delays interactive reads. Calls
+    that cannot get a slot within ``queue_timeout`` fail fast with 503.
+    """
+
+    def __init__(self, limits: dict[DBLane, int], queue_timeout: float):
+        self.limits = limits
+        self.queue_timeout = queue_timeout
+        self._semaphores = {lane: asyncio.Semaphore(limit) for lane, limit in limits.items()}
+        self._waiting = dict.fromkeys(limits, 0)
+        self._in_flight = dict.fromkeys(limits, 0)
+        # Sized to the sum of lane limits so lanes never compete for threads
+        self._executor = ThreadPoolExecutor(
+            max_workers=sum(limits.values()), thread_name_prefix="db"
+        )
+
+    async def run(self, lane: DBLane, fn: Callable[..., T], *args: Any) -> T:
+        """Run ``fn(*args)`` in a worker thread once a slot in ``lane`` is free."""
+        semaphore = self._semaphores[lane]
+        start = time.perf_counter()
+        self._waiting[lane] += 1
+        metrics.set_gauge(f"db.queue_depth.{lane}", self._waiting[lane])
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=self.queue_timeout)
+        except TimeoutError:
+            metrics.incr(f"db.queue_timeouts.{lane}")
+            raise DatabaseBusyError(lane)
+        finally:
+            self._waiting[lane] -= 1
+            metrics.set_gauge(f"db.queue_depth.{lane}", self._waiting[lane])
+
+        metrics.observe(f"db.wait_ms.{lane}", (time.perf_counter() - start) * 1000)
+        self._in_flight[lane] += 1
+        try:
+            loop = asyncio.get_running_loop()
+            context = contextvars.copy_context()
+            return await loop.run_in_executor(self._executor, context.run, fn, *args)
+        finally:
+            self._in_flight[lane] -= 1
+            semaphore.release()
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Current limit, queue depth and in-flight count per lane."""
+        return {
+            lane.value: {
+                "limit": self.limits[lane],
+                "waiting": self._waiting[lane],
+                "in_flight": self._in_flight[lane],
+            }
+            for lane in self.limits
+        }
+
+
+db_scheduler = DBScheduler(
+    limits={
+        DBLane.READ: settings.db_read_concurrency,
+        DBLane.WRITE: settings.db_write_concurrency,
+        DBLane.ADMIN: settings.db_admin_concurrency,
+    },
+    queue_timeout=settings.db_queue_timeout,
+)
+
+
+db_breaker = CircuitBreaker(
+    threshold=settings.db_breaker_threshold, reset_timeout=settings.db_breaker_reset_timeout
+)
+
+
+async def run_query(query: Any, lane: DBLane = DBLane.READ) -> Any:
+    """Execute a Supabase query builder through the scheduler and circuit breaker.
+
+    Reads are idempotent, so a read failing with a transient error is retried
+    up to ``DB_READ_RETRIES`` times with full-jitter exponential backoff,
+    which keeps retries from many requests from arriving in lockstep.
+    """
+    retries = settings.db_read_retries if lane == DBLane.READ else 0
+    for attempt in range(retries + 1):
+        probe = db_breaker.before_call()
+        try:
+            result = await db_scheduler.run(lane, query.execute)
+        except DatabaseBusyError:
+            db_breaker.release(probe)
+            raise
+        except Exception as e:
+            if not is_transient_error(e):
+                db_breaker.record_success()
+                raise
+            db_breaker.record_failure()
+            if attempt == retries:
+                if retries:
+                    metrics.incr("db.retries_exhausted")
+                raise
+
+            delay = random.uniform(0, settings.db_retry_backoff * 2**attempt)  # noqa: S311
+            metrics.incr(f"db.retries.{lane}")
+            logger.warning(
+                "Transient database error, retrying read",
+                extra={
+                    "extra_fields": {
+                        "attempt": attempt + 1,
+                        "delay": round(delay, 3),
+                        "error": str(e),
+                        "request_id": request_id_context.get(""),
+                    }
+                },
+            )
+            await asyncio.sleep(delay)
+        except BaseException:
+            # Cancelled (e.g. the client went away) before the database answered; a probe
+            # left marked in flight would keep the breaker half-open and rejecting forever
+            db_breaker.release(probe)
+            raise
+        else:
+            db_breaker.record_success()
+            return result
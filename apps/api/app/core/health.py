@@ -0,0 +1,156 @@
+"""Background health probe for readiness checks."""
+
+import asyncio
+import contextlib
+import logging
+import time
+from importlib import metadata
+from typing import Any
+
+from app.core.config import settings
+from app.core.db_scheduler import db_breaker, db_scheduler
+from app.core.metrics import metrics
+
+logger = logging.getLogger("api.health")
+
+
+def _package_versions() -> dict[str, str]:
+    """Collect framework versions once for health reports."""
+    versions = {"api": "1.0.0"}
+    for package in ("fastapi", "pydantic", "uvicorn"):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = "unknown"
+    return versions
+
+
+class HealthProbe:
+    """Periodically probe the database, event loop and Socket.IO server.
+
+    Health endpoints serve the latest probe result, so they never touch the
+    database inline and stay cheap under frequent platform checks.
+    """
+
+    def __init__(self, interval: float, timeout: float):
+        self.interval = interval
+        self.timeout = timeout
+        self._sio: Any = None
+        self._task: asyncio.Task[None] | None = None
+        self._versions: dict[str, str] | None = None
+        self._loop_lag_ms = 0.0
+        self._result: dict[str, Any] = {
+            "status": "starting",
+            "checked_at": None,
+            "environment": settings.environment,
+        }
+
+    def start(self, sio: Any = None) -> None:
+        """Start the probe loop on the running event loop."""
+        self._sio = sio
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="health-probe")
+
+    async def stop(self) -> None:
+        """Cancel the probe loop."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    @property
+    def is_ready(self) -> bool:
+        """Whether the latest probe is fresh and the database answered."""
+        checked_at = self._result.get("checked_at")
+        if checked_at is None:
+            return False
+        is_fresh = time.time() - checked_at <= self.interval * 3 + self.timeout
+        return is_fresh and self._result.get("database", {}).get("status") == "connected"
+
+    def snapshot(self) -> dict[str, Any]:
+        """Get the latest probe result."""
+        return {**self._result, "ready": self.is_ready}
+
+    async def _run(self) -> None:
+        """Probe on a fixed interval, measuring event-loop lag from sleep overshoot."""
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await self.probe_once()
+            except Exception as e:
+                logger.error("Health probe failed", exc_info=e)
+
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self._loop_lag_ms = max(0.0, (loop.time() - expected) * 1000)
+
+    async def probe_once(self) -> dict[str, Any]:
+        """Run all checks and store the result."""
+        if self._versions is None:
+            self._versions = await asyncio.to_thread(_package_versions)
+
+        database = await self._check_database()
+        result = {
+            "status": "healthy" if database["status"] == "connected" else "degraded",
+            "checked_at": time.time(),
+            "environment": settings.environment,
+            "version": self._versions,
+            "database": database,
+            "event_loop": {"lag_ms": round(self._loop_lag_ms, 2)},
+            "socketio": self._check_socketio(),
+            "db_lanes": db_scheduler.stats(),
+            "db_breaker": db_breaker.stats(),
+        }
+
+        metrics.set_gauge("health.event_loop_lag_ms", self._loop_lag_ms)
+        if database["status"] == "connected":
+            metrics.set_gauge("health.db_latency_ms", database["response_time_ms"])
+
+        self._result = result
+        return result
+
+    async def _check_database(self) -> dict[str, Any]:
+        """Time a minimal query in a worker thread."""
+        from app.core.database import get_supabase_client
+
+        try:
+            # The first probe creates the client, off the event loop
+            client = await asyncio.to_thread(get_supabase_client)
+            query = client.table("tables").select("id").limit(1)
+            start = time.perf_counter()
+            await asyncio.wait_for(asyncio.to_thread(query.execute), timeout=self.timeout)
+        except TimeoutError:
+            logger.warning("Health probe - database query timed out")
+            return {"status": "timeout", "timeout_ms": self.timeout * 1000}
+        except Exception as e:
+            logger.error("Health probe - database connection failed", exc_info=e)
+            return {"status": "error", "error": str(e)}
+
+        return {
+            "status": "connected",
+            "response_time_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+
+    def _check_socketio(self) -> dict[str, Any]:
+        """Count connected clients and table rooms."""
+        if self._sio is None or not hasattr(self._sio, "manager"):
+            return {"status": "not_initialized"}
+
+        try:
+            rooms = self._sio.manager.rooms.get("/", {})
+            table_rooms = [
+                room for room in rooms if isinstance(room, str) and room.startswith("table:")
+            ]
+            return {
+                "status": "running",
+                "connected_clients": len(rooms.get(None, {})),
+                "table_rooms": len(table_rooms),
+            }
+        except Exception as e:
+            return {"status": "error", "error": str(e)}
+
+
+health_probe = HealthProbe(
+    interval=settings.health_probe_interval, timeout=settings.health_probe_timeout
+)
@@ -10,6 +10,8 @@ from typing import Any
 from fastapi import Request
 from starlette.middleware.base import BaseHTTPMiddleware
 
+from app.core.traffic import traffic_recorder
+
 # Context variable to store request ID
 request_id_context: ContextVar[str] = ContextVar("request_id", default="")
 
@@ -66,10 +68,12 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
         )
 
         # Process request
+        trace = traffic_recorder.begin()
         response = await call_next(request)
 
         # Calculate duration
         duration = time.time() - start_time
+        traffic_recorder.record(trace, request, response.status_code, duration)
 
         # Log response
         logger.info(
@@ -0,0 +1,59 @@
+"""In-process metrics registry."""
+
+import threading
+from collections import defaultdict
+from typing import Any
+
+
+class Metrics:
+    """Thread-safe counters, gauges and summaries exported as a JSON snapshot.
+
+    Names are dotted strings (``compression.bytes_saved``); labels are folded
+    into the name (``compression.responses.br``) to keep the registry flat.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[str, float] = defaultdict(float)
+        self._gauges: dict[str, float] = {}
+        self._summaries: dict[str, dict[str, float]] = {}
+
+    def incr(self, name: str, value: float = 1.0) -> None:
+        """Increase a counter."""
+        with self._lock:
+            self._counters[name] += value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """Set a gauge to its current value."""
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, value: float) -> None:
+        """Record a sample in a count/sum/max summary."""
+        with self._lock:
+            summary = self._summaries.get(name)
+            if summary is None:
+                self._summaries[name] = {"count": 1, "sum": value, "max": value}
+            else:
+                summary["count"] += 1
+                summary["sum"] += value
+                summary["max"] = max(summary["max"], value)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Get a copy of all metrics."""
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "summaries": {name: dict(summary) for name, summary in self._summaries.items()},
+            }
+
+    def reset(self) -> None:
+        """Clear all metrics (for testing)."""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._summaries.clear()
+
+
+metrics = Metrics()
@@ -0,0 +1,187 @@
+"""In-process token-bucket admission control for write and table creation endpoints."""
+
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from fastapi import HTTPException, Request
+
+from app.core.config import settings
+from app.core.logging import request_id_context
+from app.core.metrics import metrics
+from app.core.security import hash_token
+
+
+@dataclass(frozen=True)
+class RateBudget:
+    """Sustained rates and burst sizes for one role."""
+
+    requests_per_second: float
+    request_burst: float
+    cells_per_second: float
+    cell_burst: float
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``rate`` tokens per second.
+
+    A ``rate`` of 0 (or less) disables the bucket: every cost is admitted.
+    """
+
+    __slots__ = ("capacity", "rate", "tokens", "updated_at")
+
+    def __init__(self, capacity: float, rate: float, now: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated_at = now
+
+    def refill(self, now: float) -> None:
+        """Add the tokens accrued since the last refill."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, cost: float) -> float:
+        """Seconds until ``cost`` can be paid (0 if it can be paid now).
+
+        A cost larger than the bucket only needs a full bucket and leaves the
+        bucket in debt, so oversized batches are admitted but slow the caller.
+        """
+        if self.rate <= 0:
+            return 0.0
+        needed = min(cost, self.capacity)
+        if self.tokens >= needed:
+            return 0.0
+        return (needed - self.tokens) / self.rate
+
+    def consume(self, cost: float) -> None:
+        """Pay ``cost`` tokens."""
+        self.tokens -= cost
+
+
+class WriteRateLimiter:
+    """Request and cell budgets keyed by table id and token hash.
+
+    Each key has a requests-per-second bucket and a cells-per-second bucket, so
+    a single 300-cell batch is priced like 300 single-cell writes. Buckets are
+    kept in LRU order and the least recently used are dropped past ``max_keys``.
+    """
+
+    def __init__(self, budgets: dict[str, RateBudget], max_keys: int = 10_000):
+        self.budgets = budgets
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[tuple[str, str], tuple[TokenBucket, TokenBucket]] = OrderedDict()
+
+    def _get_buckets(
+        self, key: tuple[str, str], budget: RateBudget, now: float
+    ) -> tuple[TokenBucket, TokenBucket]:
+        buckets = self._buckets.get(key)
+        if buckets is None:
+            buckets = (
+                TokenBucket(budget.request_burst, budget.requests_per_second, now),
+                TokenBucket(budget.cell_burst, budget.cells_per_second, now),
+            )
+            self._buckets[key] = buckets
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return buckets
+
+    def acquire(self, table_id: str, token_hash: str, role: str, cells: int = 0) -> float:
+        """Admit one request writing ``cells`` cells.
+
+        Returns 0 when admitted, otherwise the seconds to wait before retrying.
+        Nothing is consumed from either bucket when the request is rejected.
+        """
+        budget = self.budgets.get(role)
+        if budget is None:
+            return 0.0
+
+        now = time.monotonic()
+        requests_bucket, cells_bucket = self._get_buckets((table_id, token_hash), budget, now)
+        requests_bucket.refill(now)
+        cells_bucket.refill(now)
+
+        requests_wait = requests_bucket.wait_time(1)
+        cells_wait = cells_bucket.wait_time(cells) if cells else 0.0
+        if requests_wait or cells_wait:
+            reason = "requests" if requests_wait >= cells_wait else "cells"
+            metrics.incr(f"rate_limit.rejected.{role}.{reason}")
+            return max(requests_wait, cells_wait)
+
+        requests_bucket.consume(1)
+        if cells:
+            cells_bucket.consume(cells)
+        metrics.incr(f"rate_limit.admitted.{role}")
+        return 0.0
+
+
+write_rate_limiter = WriteRateLimiter(
+    budgets={
+        "admin": RateBudget(
+            requests_per_second=settings.rate_limit_admin_rps,
+            request_burst=settings.rate_limit_admin_burst,
+            cells_per_second=settings.rate_limit_admin_cells_per_sec,
+            cell_burst=settings.rate_limit_admin_cell_burst,
+        ),
+        "editor": RateBudget(
+            requests_per_second=settings.rate_limit_editor_rps,
+            request_burst=settings.rate_limit_editor_burst,
+            cells_per_second=settings.rate_limit_editor_cells_per_sec,
+            cell_burst=settings.rate_limit_editor_cell_burst,
+        ),
+    }
+)
+
+
+# Table creation needs no token, so its budget is per client IP; the cells bucket counts tables
+create_rate_limiter = WriteRateLimiter(
+    budgets={
+        "create": RateBudget(
+            requests_per_second=settings.rate_limit_create_rps,
+            request_burst=settings.rate_limit_create_burst,
+            cells_per_second=settings.rate_limit_create_tables_per_sec,
+            cell_burst=settings.rate_limit_create_table_burst,
+        ),
+    }
+)
+
+
+def client_ip(request: Request) -> str:
+    """Get the client address, from ``CLIENT_IP_HEADER`` when behind a proxy that sets it."""
+    if settings.client_ip_header:
+        forwarded = request.headers.get(settings.client_ip_header)
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def enforce_write_rate_limit(table_id: str, token: str, role: str, cells: int = 0) -> None:
+    """Reject a write with 429 and Retry-After when its budget is exhausted."""
+    if not settings.rate_limit_enabled:
+        return
+
+    _reject_if_limited(write_rate_limiter.acquire(table_id, hash_token(token), role, cells))
+
+
+def enforce_create_rate_limit(request: Request, tables: int = 1) -> None:
+    """Reject creating ``tables`` tables with 429 when the client IP's budget is exhausted."""
+    if not settings.rate_limit_enabled:
+        return
+
+    _reject_if_limited(create_rate_limiter.acquire("create", client_ip(request), "create", tables))
+
+
+def _reject_if_limited(retry_after: float) -> None:
+    if retry_after:
+        raise HTTPException(
+            status_code=429,
+            detail={
+                "error": "Rate limit exceeded",
+                "request_id": request_id_context.get(""),
+                "retry_after": round(retry_after, 3),
+            },
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
@@ -0,0 +1,96 @@
+"""Per-room replay buffers for Socket.IO broadcasts."""
+
+import secrets
+from collections import OrderedDict, deque
+from typing import Any
+
+from app.core.config import settings
+
+
+def columnar_cells(cells: list[Any]) -> dict[str, list[Any]]:
+    """Encode cell updates as parallel ``rows``/``cols``/``values`` arrays.
+
+    Broadcast payloads then repeat no per-cell keys, which shrinks them for
+    both the JSON and the msgpack serializer.
+    """
+    return {
+        "rows": [cell.row for cell in cells],
+        "cols": [cell.col for cell in cells],
+        "values": [cell.value for cell in cells],
+    }
+
+
+def cell_update_body(cells: list[Any]) -> dict[str, list[Any]]:
+    """Encode cell updates for ``cell_update``: columnar when
+    ``SOCKETIO_COLUMNAR_UPDATES`` is set, otherwise a ``cells`` list of
+    ``{row, col, value}`` objects, the shape every web bundle reads.
+    """
+    if settings.socketio_columnar_updates:
+        return columnar_cells(cells)
+    return {"cells": [{"row": cell.row, "col": cell.col, "value": cell.value} for cell in cells]}
+
+
+class _RoomLog:
+    """Recent events of one room and the newest sequence number it no longer holds."""
+
+    def __init__(self, size: int, known_from: int):
+        self.events: deque[tuple[int, dict[str, Any]]] = deque(maxlen=size)
+        self.dropped_seq = known_from
+
+
+class RoomEventLog:
+    """Bounded, sequence-numbered history of recent events per room.
+
+    Every broadcast gets the next number of one process-wide sequence, so a
+    client that reconnects with the last sequence it saw can be sent exactly
+    the events it missed, and numbers never repeat when a room's history is
+    evicted. Sequences restart with the process, which is why each log carries
+    a random ``epoch``: a client holding another epoch must resync. Rooms are
+    evicted least recently used beyond ``max_rooms``.
+    """
+
+    def __init__(self, size: int, max_rooms: int):
+        self.size = size
+        self.max_rooms = max_rooms
+        self.epoch = secrets.token_hex(4)
+        self.seq = 0
+        self._rooms: OrderedDict[str, _RoomLog] = OrderedDict()
+        # Newest sequence number held by any evicted room
+        self._evicted_seq = 0
+
+    def append(self, room: str, event: dict[str, Any]) -> int:
+        """Record an event and return its sequence number."""
+        log = self._rooms.pop(room, None) or _RoomLog(self.size, self._evicted_seq)
+        if len(log.events) == self.size:
+            log.dropped_seq = log.events[0][0]
+
+        self.seq += 1
+        log.events.append((self.seq, event))
+        self._rooms[room] = log
+        if len(self._rooms) > self.max_rooms:
+            _, evicted = self._rooms.popitem(last=False)
+            self._evicted_seq = max(self._evicted_seq, evicted.events[-1][0])
+        return self.seq
+
+    def since(
+        self, room: str, seq: int, epoch: str | None
+    ) -> list[tuple[int, dict[str, Any]]] | None:
+        """Events of a room after ``seq``, or None if they are not all available.
+
+        ``epoch`` is the epoch the client's ``seq`` belongs to.
+        """
+        if epoch != self.epoch or seq > self.seq:
+            return None
+
+        log = self._rooms.get(room)
+        if log is None:
+            # No events since ``seq`` unless they went out with an evicted room
+            return [] if seq >= self._evicted_seq else None
+        if seq < log.dropped_seq:
+            return None
+        return [(event_seq, event) for event_seq, event in log.events if event_seq > seq]
+
+
+room_events = RoomEventLog(
+    size=settings.socketio_replay_buffer, max_rooms=settings.socketio_replay_max_rooms
+)
@@ -1,12 +1,15 @@
 """Security utilities for token handling."""
 
 import hashlib
+import hmac
 import secrets
 from typing import Any
 
 from fastapi import Depends, Header, HTTPException
 
+from app.core.config import settings
 from app.core.database import get_supabase_client
+from app.core.db_scheduler import DBLane, run_query
 from app.core.logging import request_id_context
 
 
@@ -62,12 +65,9 @@ async def verify_token(table_slug: str, token: str) -> tuple[dict[str, Any], str
     try:
         # Get table from Supabase
         supabase = get_supabase_client()
-        result = (
-            supabase.table("tables")
-            .select("*")
-            .eq("slug", table_slug)
-            .is_("deleted_at", "null")
-            .execute()
+        result = await run_query(
+            supabase.table("tables").select("*").eq("slug", table_slug).is_("deleted_at", "null"),
+            DBLane.READ,
         )
 
         if not result.data:
@@ -83,9 +83,9 @@ async def verify_token(table_slug: str, token: str) -> tuple[dict[str, Any], str
         table = result.data[0]
 
         if table["admin_token_hash"] == token_hash:
-            return table, "admin"
+            role = "admin"
         elif table["edit_token_hash"] == token_hash:
-            return table, "editor"
+            role = "editor"
         else:
             raise HTTPException(
                 status_code=403,
@@ -95,6 +95,15 @@ async def verify_token(table_slug: str, token: str) -> tuple[dict[str, Any], str
                     "table_slug": table_slug,
                 },
             )
+
+        # Idle tables have their cells archived; restore them before first use
+        if table.get("archived_at"):
+            await run_query(
+                supabase.rpc("rehydrate_table", {"p_table_id": table["id"]}), DBLane.WRITE
+            )
+            table["archived_at"] = None
+
+        return table, role
     except HTTPException:
         # Re-raise HTTP exceptions as-is
         raise
@@ -114,6 +123,74 @@ async def verify_token(table_slug: str, token: str) -> tuple[dict[str, Any], str
         )
 
 
+async def verify_tokens(
+    credentials: list[tuple[str, str]],
+) -> list[tuple[dict[str, Any], str] | HTTPException]:
+    """Verify several ``(slug, token)`` pairs with one query.
+
+    Returns, in request order, ``(table, role)`` for each valid pair and the
+    ``HTTPException`` ``verify_token`` would raise for each invalid one.
+    """
+    request_id = request_id_context.get("")
+    slugs = sorted({slug for slug, _ in credentials})
+
+    try:
+        supabase = get_supabase_client()
+        result = await run_query(
+            supabase.table("tables").select("*").in_("slug", slugs).is_("deleted_at", "null"),
+            DBLane.READ,
+        )
+    except Exception as e:
+        import logging
+
+        logger = logging.getLogger("api.auth")
+        logger.error(
+            "Database error during token verification",
+            exc_info=e,
+            extra={"extra_fields": {"tables": len(slugs), "request_id": request_id}},
+        )
+        raise HTTPException(
+            status_code=500,
+            detail={"error": "Authentication service unavailable", "request_id": request_id},
+        )
+
+    tables = {table["slug"]: table for table in result.data}
+    verified: list[tuple[dict[str, Any], str] | HTTPException] = []
+    for slug, token in credentials:
+        table = tables.get(slug)
+        token_hash = hash_token(token) if token else None
+        if table is None:
+            error = "Table not found"
+            status_code = 404
+        elif token_hash and table["admin_token_hash"] == token_hash:
+            verified.append((table, "admin"))
+            continue
+        elif token_hash and table["edit_token_hash"] == token_hash:
+            verified.append((table, "editor"))
+            continue
+        else:
+            error = "Invalid token"
+            status_code = 403
+        verified.append(
+            HTTPException(
+                status_code=status_code,
+                detail={"error": error, "request_id": request_id, "table_slug": slug},
+            )
+        )
+
+    # Idle tables have their cells archived; restore authorized ones before first use
+    archived = {
+        item[0]["id"]: item[0]
+        for item in verified
+        if not isinstance(item, HTTPException) and item[0].get("archived_at")
+    }
+    for table_id, table in archived.items():
+        await run_query(supabase.rpc("rehydrate_table", {"p_table_id": table_id}), DBLane.WRITE)
+        table["archived_at"] = None
+
+    return verified
+
+
 async def verify_bearer_token(
     table_slug: str, authorization: str = Depends(extract_bearer_token)
 ) -> tuple[dict[str, Any], str]:
@@ -130,3 +207,19 @@ def get_bearer_auth(slug: str):
         return await verify_token(slug, authorization)
 
     return _verify_auth
+
+
+def require_operator(authorization: str = Depends(extract_bearer_token)) -> None:
+    """Allow only callers presenting the operator ``JOB_KEY``."""
+    request_id = request_id_context.get("")
+
+    if not settings.job_key:
+        raise HTTPException(
+            status_code=403,
+            detail={"error": "Operator access is not configured", "request_id": request_id},
+        )
+
+    if not hmac.compare_digest(authorization.encode(), settings.job_key.encode()):
+        raise HTTPException(
+            status_code=403, detail={"error": "Invalid operator key", "request_id": request_id}
+        )
@@ -0,0 +1,58 @@
+"""Fast JSON serialization for large responses."""
+
+from typing import Any
+
+import orjson
+from starlette.responses import Response
+
+
+class RawJSONResponse(Response):
+    """JSON response that sends pre-encoded bytes as-is.
+
+    Returning an instance from a route skips ``response_model`` validation, so
+    routes can keep their declared models for the OpenAPI schema while the
+    payload is encoded straight from database rows.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        """Pass bytes through untouched and encode anything else with orjson."""
+        if isinstance(content, bytes):
+            return content
+        return orjson.dumps(content)
+
+
+def encode_table_payload(
+    table: dict[str, Any], columns: list[dict[str, Any]], cells: list[dict[str, Any]]
+) -> bytes:
+    """Encode a table in the ``TableResponse`` shape without building models.
+
+    ``columns`` and ``cells`` must already use the response field names
+    (``idx``/``header``/``width``/``format`` and ``row``/``col``/``value``).
+    """
+    return orjson.dumps(
+        {
+            "id": table["id"],
+            "slug": table["slug"],
+            "title": table["title"],
+            "description": table["description"],
+            "cols": table["cols"],
+            "rows": table["rows"],
+            "fixed_rows": table.get("fixed_rows", False),  # Handle migration
+            "columns": columns,
+            "cells": cells,
+        }
+    )
+
+
+def encode_cells_payload(
+    cells: list[dict[str, Any]], next_cursor: str | None = None, paginated: bool = False
+) -> bytes:
+    """Encode the ``GET /cells`` response body.
+
+    Paginated responses carry ``next_cursor``, which is null on the last page.
+    """
+    if paginated:
+        return orjson.dumps({"cells": cells, "next_cursor": next_cursor})
+    return orjson.dumps({"cells": cells})
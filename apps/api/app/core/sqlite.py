@@ -0,0 +1,565 @@
+"""Embedded SQLite backend with the query builder interface of the Supabase client.
+
+Selected with ``DB_BACKEND=sqlite``. ``get_supabase_client()`` then returns a
+``SQLiteClient``, so services keep building queries with ``table()`` and
+``rpc()`` and running them through ``run_query``. Only the builder methods
+and database functions used by table, cell, config and auth code are
+implemented; stats, query, archival, purge and search stay Postgres-only
+(their endpoints answer 501, see ``require_postgres``).
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import uuid
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+SCHEMA_PATH = Path(__file__).parent / "sqlite_schema.sql"
+
+# Grid rows per block; must match CELL_BLOCK_ROWS in app/services/cell_store.py
+CELL_BLOCK_ROWS = 64
+
+# Columns returned as Python values instead of their SQLite storage type
+BOOL_COLUMNS = {"fixed_rows"}
+JSON_COLUMNS = {"data"}
+
+IDENTIFIER = re.compile(r"^[a-z_][a-z0-9_]*$")
+OPERATORS = {"eq": "=", "neq": "!=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+
+class SQLiteError(Exception):
+    """Raised for queries or database functions the SQLite backend does not support."""
+
+
+def _identifier(name: str) -> str:
+    """Quote a table or column name after checking it is a plain identifier."""
+    if not IDENTIFIER.match(name):
+        raise SQLiteError(f"Invalid identifier: {name!r}")
+    return f'"{name}"'
+
+
+def _to_db(value: Any) -> Any:
+    """Convert a parameter to a SQLite value (JSON objects are stored as text)."""
+    if isinstance(value, dict | list):
+        return json.dumps(value, separators=(",", ":"))
+    return value
+
+
+def _from_db(row: sqlite3.Row) -> dict[str, Any]:
+    """Convert a result row to the dict PostgREST would return."""
+    record = dict(row)
+    for key in BOOL_COLUMNS & record.keys():
+        if record[key] is not None:
+            record[key] = bool(record[key])
+    for key in JSON_COLUMNS & record.keys():
+        if isinstance(record[key], str):
+            record[key] = json.loads(record[key])
+    return record
+
+
+class SQLiteResult:
+    """Query result with the ``data`` and ``count`` attributes of a PostgREST response."""
+
+    def __init__(self, data: Any, count: int | None = None):
+        self.data = data
+        self.count = count
+
+
+class SQLiteQuery:
+    """Subset of the PostgREST query builder, compiled to one SQL statement."""
+
+    def __init__(self, client: "SQLiteClient", table: str):
+        self.client = client
+        self.table = _identifier(table)
+        self._action = "select"
+        self._columns = "*"
+        self._count = False
+        self._values: list[dict[str, Any]] = []
+        self._where: list[str] = []
+        self._params: list[Any] = []
+        self._order: list[str] = []
+        self._limit: int | None = None
+        self._offset = 0
+
+    def select(self, columns: str = "*", count: str | None = None) -> "SQLiteQuery":
+        """Select columns; ``alias:column`` renames like PostgREST."""
+        if columns.strip() != "*":
+            selected = []
+            for column in columns.split(","):
+                alias, _, name = column.strip().rpartition(":")
+                selected.append(
+                    f"{_identifier(name)} AS {_identifier(alias)}" if alias else _identifier(name)
+                )
+            self._columns = ", ".join(selected)
+        self._count = count == "exact"
+        return self
+
+    def insert(self, values: dict[str, Any] | list[dict[str, Any]]) -> "SQLiteQuery":
+        self._action = "insert"
+        self._values = values if isinstance(values, list) else [values]
+        return self
+
+    def update(self, values: dict[str, Any]) -> "SQLiteQuery":
+        self._action = "update"
+        self._values = [values]
+        return self
+
+    def delete(self) -> "SQLiteQuery":
+        self._action = "delete"
+        return self
+
+    def _filter(self, column: str, operator: str, value: Any) -> "SQLiteQuery":
+        self._where.append(f"{_identifier(column)} {OPERATORS[operator]} ?")
+        self._params.append(_to_db(value))
+        return self
+
+    def eq(self, column: str, value: Any) -> "SQLiteQuery":
+        return self._filter(column, "eq", value)
+
+    def neq(self, column: str, value: Any) -> "SQLiteQuery":
+        return self._filter(column, "neq", value)
+
+    def gt(self, column: str, value: Any) -> "SQLiteQuery":
+        return self._filter(column, "gt", value)
+
+    def gte(self, column: str, value: Any) -> "SQLiteQuery":
+        return self._filter(column, "gte", value)
+
+    def lt(self, column: str, value: Any) -> "SQLiteQuery":
+        return self._filter(column, "lt", value)
+
+    def lte(self, column: str, value: Any) -> "SQLiteQuery":
+        return self._filter(column, "lte", value)
+
+    def is_(self, column: str, value: str) -> "SQLiteQuery":
+        if value != "null":
+            raise SQLiteError(f"Unsupported is_ value: {value!r}")
+        self._where.append(f"{_identifier(column)} IS NULL")
+        return self
+
+    def in_(self, column: str, values: list[Any]) -> "SQLiteQuery":
+        self._where.append(f"{_identifier(column)} IN ({', '.join('?' * len(values))})")
+        self._params.extend(_to_db(value) for value in values)
+        return self
+
+    def or_(self, filters: str) -> "SQLiteQuery":
+        """PostgREST logic tree, e.g. ``r.gt.1,and(r.eq.1,c.gt.2)``."""
+        sql, params = _logic_tree("or", filters)
+        self._where.append(sql)
+        self._params.extend(params)
+        return self
+
+    def order(self, column: str, desc: bool = False) -> "SQLiteQuery":
+        self._order.append(f"{_identifier(column)} {'DESC' if desc else 'ASC'}")
+        return self
+
+    def limit(self, count: int) -> "SQLiteQuery":
+        self._limit = count
+        return self
+
+    def range(self, start: int, end: int) -> "SQLiteQuery":
+        """Rows ``start`` to ``end`` inclusive, like PostgREST."""
+        self._offset = start
+        self._limit = end - start + 1
+        return self
+
+    def execute(self) -> SQLiteResult:
+        """Run the statement on this thread's connection."""
+        where = f" WHERE {' AND '.join(self._where)}" if self._where else ""
+        conn = self.client.connection()
+
+        if self._action == "select":
+            sql = f"SELECT {self._columns} FROM {self.table}{where}"
+            if self._order:
+                sql += f" ORDER BY {', '.join(self._order)}"
+            if self._limit is not None or self._offset:
+                sql += f" LIMIT {int(self._limit if self._limit is not None else -1)}"
+                sql += f" OFFSET {int(self._offset)}"
+            data = [_from_db(row) for row in conn.execute(sql, self._params)]
+            count = None
+            if self._count:
+                count_sql = f"SELECT COUNT(*) FROM {self.table}{where}"
+                count = conn.execute(count_sql, self._params).fetchone()[0]
+            return SQLiteResult(data, count)
+
+        with self.client.transaction() as conn:
+            if self._action == "insert":
+                data = [self._insert(conn, values) for values in self._values]
+            elif self._action == "update":
+                values = self._values[0]
+                assignments = ", ".join(f"{_identifier(key)} = ?" for key in values)
+                sql = f"UPDATE {self.table} SET {assignments}{where} RETURNING *"
+                params = [_to_db(value) for value in values.values()] + self._params
+                data = [_from_db(row) for row in conn.execute(sql, params).fetchall()]
+            else:
+                sql = f"DELETE FROM {self.table}{where} RETURNING *"
+                data = [_from_db(row) for row in conn.execute(sql, self._params).fetchall()]
+        return SQLiteResult(data)
+
+    def _insert(self, conn: sqlite3.Connection, values: dict[str, Any]) -> dict[str, Any]:
+        if self.table == '"tables"' and "id" not in values:
+            values = {"id": str(uuid.uuid4()), **values}
+        columns = ", ".join(_identifier(key) for key in values)
+        placeholders = ", ".join("?" * len(values))
+        sql = f"INSERT INTO {self.table} ({columns}) VALUES ({placeholders}) RETURNING *"
+        return _from_db(conn.execute(sql, [_to_db(value) for value in values.values()]).fetchone())
+
+
+def _split_top_level(filters: str) -> list[str]:
+    """Split a logic tree on commas outside parentheses."""
+    parts, depth, start = [], 0, 0
+    for i, char in enumerate(filters):
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            parts.append(filters[start:i])
+            start = i + 1
+    parts.append(filters[start:])
+    return parts
+
+
+def _logic_tree(operator: str, filters: str) -> tuple[str, list[Any]]:
+    """Compile ``column.op.value`` conditions joined by ``and(...)``/``or(...)``."""
+    clauses, params = [], []
+    for part in _split_top_level(filters):
+        nested = re.match(r"^(and|or)\((.*)\)$", part)
+        if nested:
+            sql, nested_params = _logic_tree(nested.group(1), nested.group(2))
+        else:
+            column, op, value = part.split(".", 2)
+            sql, nested_params = f"{_identifier(column)} {OPERATORS[op]} ?", [value]
+        clauses.append(sql)
+        params.extend(nested_params)
+    return f"({f' {operator.upper()} '.join(clauses)})", params
+
+
+class SQLiteRPC:
+    """A database function call, run in Python inside one transaction."""
+
+    def __init__(self, client: "SQLiteClient", function: Callable[..., Any], params: dict):
+        self.client = client
+        self.function = function
+        self.params = params
+
+    def execute(self) -> SQLiteResult:
+        with self.client.transaction() as conn:
+            return SQLiteResult(self.function(conn, **self.params))
+
+
+class SQLiteClient:
+    """Database client for an SQLite file in WAL mode, one connection per thread.
+
+    WAL lets readers in the DB scheduler threads run alongside the single
+    writer. Write transactions queue on an in-process lock before taking the
+    database write lock (``BEGIN IMMEDIATE``), so they never fall into
+    SQLite's sleeping busy handler or fail on lock upgrades.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.connection().executescript(SCHEMA_PATH.read_text())
+        self._functions: dict[str, Callable[..., Any]] = {
+            "create_table_with_columns": _create_table_with_columns,
+            "create_tables_with_columns": _create_tables_with_columns,
+            "clone_table": _clone_table,
+            "write_cells": _write_cells,
+            "write_cell_blocks": _write_cell_blocks,
+            "truncate_cell_block_rows": _truncate_cell_block_rows,
+            "truncate_cell_block_cols": _truncate_cell_block_cols,
+            "migrate_table_to_blocks": _migrate_table_to_blocks,
+            "migrate_table_to_cells": _migrate_table_to_cells,
+            "remove_table_rows": _remove_table_rows,
+            "remove_table_columns": _remove_table_columns,
+            "add_table_columns": _add_table_columns,
+            "rehydrate_table": _rehydrate_table,
+        }
+
+    def connection(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute("PRAGMA foreign_keys = ON")
+            conn.execute("PRAGMA busy_timeout = 5000")
+            self._local.conn = conn
+        return conn
+
+    def transaction(self) -> "_Transaction":
+        return _Transaction(self.connection(), self._write_lock)
+
+    def table(self, name: str) -> SQLiteQuery:
+        return SQLiteQuery(self, name)
+
+    def rpc(self, name: str, params: dict[str, Any] | None = None) -> SQLiteRPC:
+        if name not in self._functions:
+            raise SQLiteError(f"{name} is not available with the SQLite backend")
+        return SQLiteRPC(self, self._functions[name], params or {})
+
+
+class _Transaction:
+    """``BEGIN IMMEDIATE`` ... ``COMMIT`` under the client's write lock, rolled back on error."""
+
+    def __init__(self, conn: sqlite3.Connection, lock: threading.Lock):
+        self.conn = conn
+        self.lock = lock
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.lock.acquire()
+        try:
+            self.conn.execute("BEGIN IMMEDIATE")
+        except BaseException:
+            self.lock.release()
+            raise
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.lock.release()
+
+
+# Database functions, mirroring those in supabase/database-schema.sql
+
+
+def _create_table_with_columns(
+    conn: sqlite3.Connection, p_table: dict[str, Any], p_columns: list[dict[str, Any]]
+) -> str:
+    table_id = str(uuid.uuid4())
+    conn.execute(
+        "INSERT INTO tables (id, slug, title, description, cols, rows, fixed_rows, "
+        "storage_mode, admin_token_hash, edit_token_hash) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            table_id,
+            p_table["slug"],
+            p_table.get("title"),
+            p_table.get("description"),
+            p_table["cols"],
+            p_table["rows"],
+            bool(p_table.get("fixed_rows", False)),
+            p_table.get("storage_mode") or "cells",
+            p_table["admin_token_hash"],
+            p_table["edit_token_hash"],
+        ),
+    )
+    conn.executemany(
+        "INSERT INTO columns (table_id, idx, header, width, format) VALUES (?, ?, ?, ?, ?)",
+        [
+            (table_id, col["idx"], col.get("header"), col.get("width"), col.get("format") or "text")
+            for col in p_columns
+        ],
+    )
+    return table_id
+
+
+def _create_tables_with_columns(
+    conn: sqlite3.Connection, p_tables: list[dict[str, Any]]
+) -> list[str]:
+    return [
+        _create_table_with_columns(conn, entry["table"], entry["columns"]) for entry in p_tables
+    ]
+
+
+def _clone_table(
+    conn: sqlite3.Connection,
+    p_source_id: str,
+    p_table: dict[str, Any],
+    p_include_cells: bool,
+) -> str:
+    table_id = str(uuid.uuid4())
+    inserted = conn.execute(
+        "INSERT INTO tables (id, slug, title, description, cols, rows, fixed_rows, "
+        "storage_mode, admin_token_hash, edit_token_hash) "
+        "SELECT ?, ?, COALESCE(?, title), COALESCE(?, description), cols, rows, fixed_rows, "
+        "storage_mode, ?, ? FROM tables WHERE id = ? AND deleted_at IS NULL",
+        (
+            table_id,
+            p_table["slug"],
+            p_table.get("title"),
+            p_table.get("description"),
+            p_table["admin_token_hash"],
+            p_table["edit_token_hash"],
+            p_source_id,
+        ),
+    )
+    if inserted.rowcount == 0:
+        raise SQLiteError(f"Table {p_source_id} not found")
+
+    conn.execute(
+        "INSERT INTO columns (table_id, idx, header, width, format) "
+        "SELECT ?, idx, header, width, format FROM columns WHERE table_id = ?",
+        (table_id, p_source_id),
+    )
+    if p_include_cells:
+        conn.execute(
+            "INSERT INTO cells (table_id, r, c, value) "
+            "SELECT ?, r, c, value FROM cells WHERE table_id = ?",
+            (table_id, p_source_id),
+        )
+        conn.execute(
+            "INSERT INTO cell_blocks (table_id, block_idx, data) "
+            "SELECT ?, block_idx, data FROM cell_blocks WHERE table_id = ?",
+            (table_id, p_source_id),
+        )
+    return table_id
+
+
+def _write_cells(conn: sqlite3.Connection, p_table_id: str, p_cells: list[dict[str, Any]]) -> None:
+    # Rows are upserted in order, so later entries for the same cell win
+    conn.executemany(
+        "INSERT INTO cells (table_id, r, c, value) VALUES (?, ?, ?, ?) "
+        "ON CONFLICT (table_id, r, c) DO UPDATE SET value = excluded.value",
+        [(p_table_id, cell["row"], cell["col"], cell.get("value")) for cell in p_cells],
+    )
+
+
+def _load_blocks(
+    conn: sqlite3.Connection, table_id: str, where: str = "", params: tuple = ()
+) -> dict[int, dict[str, Any]]:
+    rows = conn.execute(
+        f"SELECT block_idx, data FROM cell_blocks WHERE table_id = ?{where}",
+        (table_id, *params),
+    )
+    return {row["block_idx"]: json.loads(row["data"]) for row in rows}
+
+
+def _save_blocks(conn: sqlite3.Connection, table_id: str, blocks: dict[int, dict]) -> None:
+    conn.executemany(
+        "INSERT INTO cell_blocks (table_id, block_idx, data) VALUES (?, ?, ?) "
+        "ON CONFLICT (table_id, block_idx) DO UPDATE SET data = excluded.data, "
+        "updated_at = strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')",
+        [(table_id, block_idx, _to_db(data)) for block_idx, data in blocks.items()],
+    )
+
+
+def _write_cell_blocks(
+    conn: sqlite3.Connection, p_table_id: str, p_cells: list[dict[str, Any]]
+) -> None:
+    block_ids = sorted({cell["row"] // CELL_BLOCK_ROWS for cell in p_cells})
+    blocks = _load_blocks(
+        conn,
+        p_table_id,
+        f" AND block_idx IN ({', '.join('?' * len(block_ids))})",
+        tuple(block_ids),
+    )
+    for cell in p_cells:
+        block = blocks.setdefault(cell["row"] // CELL_BLOCK_ROWS, {})
+        key = f"{cell['row']}:{cell['col']}"
+        # Empty values are stripped from the block
+        if cell.get("value"):
+            block[key] = cell["value"]
+        else:
+            block.pop(key, None)
+    _save_blocks(conn, p_table_id, blocks)
+
+
+def _truncate_cell_block_rows(conn: sqlite3.Connection, p_table_id: str, p_row_count: int) -> None:
+    conn.execute(
+        "DELETE FROM cell_blocks WHERE table_id = ? AND block_idx * ? >= ?",
+        (p_table_id, CELL_BLOCK_ROWS, p_row_count),
+    )
+    blocks = _load_blocks(conn, p_table_id, " AND block_idx = ?", (p_row_count // CELL_BLOCK_ROWS,))
+    for data in blocks.values():
+        for key in [key for key in data if int(key.split(":")[0]) >= p_row_count]:
+            del data[key]
+    _save_blocks(conn, p_table_id, blocks)
+
+
+def _truncate_cell_block_cols(conn: sqlite3.Connection, p_table_id: str, p_col_count: int) -> None:
+    changed = {}
+    for block_idx, data in _load_blocks(conn, p_table_id).items():
+        kept = {key: value for key, value in data.items() if int(key.split(":")[1]) < p_col_count}
+        if len(kept) < len(data):
+            changed[block_idx] = kept
+    _save_blocks(conn, p_table_id, changed)
+
+
+def _migrate_table_to_blocks(conn: sqlite3.Connection, p_table_id: str) -> None:
+    found = conn.execute(
+        "SELECT 1 FROM tables WHERE id = ? AND storage_mode = 'cells'", (p_table_id,)
+    ).fetchone()
+    if found is None:
+        return
+
+    blocks: dict[int, dict[str, Any]] = {}
+    rows = conn.execute(
+        "SELECT r, c, value FROM cells WHERE table_id = ? AND COALESCE(value, '') <> ''",
+        (p_table_id,),
+    )
+    for row in rows:
+        blocks.setdefault(row["r"] // CELL_BLOCK_ROWS, {})[f"{row['r']}:{row['c']}"] = row["value"]
+    _save_blocks(conn, p_table_id, blocks)
+
+    conn.execute("DELETE FROM cells WHERE table_id = ?", (p_table_id,))
+    conn.execute("UPDATE tables SET storage_mode = 'blocks' WHERE id = ?", (p_table_id,))
+
+
+def _migrate_table_to_cells(conn: sqlite3.Connection, p_table_id: str) -> None:
+    found = conn.execute(
+        "SELECT 1 FROM tables WHERE id = ? AND storage_mode = 'blocks'", (p_table_id,)
+    ).fetchone()
+    if found is None:
+        return
+
+    conn.executemany(
+        "INSERT INTO cells (table_id, r, c, value) VALUES (?, ?, ?, ?) "
+        "ON CONFLICT (table_id, r, c) DO UPDATE SET value = excluded.value",
+        [
+            (p_table_id, *(int(part) for part in key.split(":")), value)
+            for data in _load_blocks(conn, p_table_id).values()
+            for key, value in data.items()
+        ],
+    )
+    conn.execute("DELETE FROM cell_blocks WHERE table_id = ?", (p_table_id,))
+    conn.execute("UPDATE tables SET storage_mode = 'cells' WHERE id = ?", (p_table_id,))
+
+
+def _remove_table_rows(conn: sqlite3.Connection, p_table_id: str, p_row_count: int) -> None:
+    conn.execute("DELETE FROM cells WHERE table_id = ? AND r >= ?", (p_table_id, p_row_count))
+    _truncate_cell_block_rows(conn, p_table_id, p_row_count)
+    conn.execute("UPDATE tables SET rows = ? WHERE id = ?", (p_row_count, p_table_id))
+
+
+def _remove_table_columns(conn: sqlite3.Connection, p_table_id: str, p_col_count: int) -> None:
+    conn.execute("DELETE FROM columns WHERE table_id = ? AND idx >= ?", (p_table_id, p_col_count))
+    conn.execute("DELETE FROM cells WHERE table_id = ? AND c >= ?", (p_table_id, p_col_count))
+    _truncate_cell_block_cols(conn, p_table_id, p_col_count)
+    conn.execute("UPDATE tables SET cols = ? WHERE id = ?", (p_col_count, p_table_id))
+
+
+def _add_table_columns(
+    conn: sqlite3.Connection, p_table_id: str, p_columns: list[dict[str, Any]]
+) -> None:
+    conn.executemany(
+        "INSERT INTO columns (table_id, idx, header, width, format) VALUES (?, ?, ?, ?, ?)",
+        [
+            (
+                p_table_id,
+                col["idx"],
+                col.get("header"),
+                col.get("width"),
+                col.get("format") or "text",
+            )
+            for col in p_columns
+        ],
+    )
+    conn.execute(
+        "UPDATE tables SET cols = (SELECT count(*) FROM columns WHERE table_id = ?) WHERE id = ?",
+        (p_table_id, p_table_id),
+    )
+
+
+def _rehydrate_table(conn: sqlite3.Connection, p_table_id: str) -> None:
+    # Cells are never archived in SQLite; only clear a flag copied from elsewhere
+    conn.execute("UPDATE tables SET archived_at = NULL WHERE id = ?", (p_table_id,))
@@ -0,0 +1,131 @@
+-- Online Table Lite - SQLite schema for single-node deployments (DB_BACKEND=sqlite)
+-- Mirrors the core tables of supabase/database-schema.sql; stats, archives and search
+-- are Postgres-only. Applied on every start, so statements must be idempotent.
+
+-- Tables table - stores table metadata
+CREATE TABLE IF NOT EXISTS tables (
+    id TEXT PRIMARY KEY,
+    slug TEXT NOT NULL UNIQUE,
+    title TEXT,
+    description TEXT,
+    cols INTEGER NOT NULL DEFAULT 4,
+    rows INTEGER NOT NULL DEFAULT 10,
+    edit_token_hash TEXT NOT NULL,
+    admin_token_hash TEXT NOT NULL,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+    updated_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+    last_activity_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+    deleted_at TEXT,
+    fixed_rows INTEGER NOT NULL DEFAULT 0,
+    storage_mode TEXT NOT NULL DEFAULT 'cells' CHECK (storage_mode IN ('cells', 'blocks')),
+    archived_at TEXT
+);
+
+-- Slug lookups use the UNIQUE(slug) index
+DROP INDEX IF EXISTS idx_tables_slug_live;
+CREATE INDEX IF NOT EXISTS idx_tables_deleted_at ON tables(deleted_at)
+    WHERE deleted_at IS NOT NULL;
+
+-- Columns table - stores column configuration
+CREATE TABLE IF NOT EXISTS columns (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_id TEXT NOT NULL REFERENCES tables(id) ON DELETE CASCADE,
+    idx INTEGER NOT NULL,
+    header TEXT,
+    width INTEGER,
+    format TEXT NOT NULL DEFAULT 'text' CHECK (format IN ('text', 'date', 'timerange'))
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_columns_table_id_idx ON columns(table_id, idx);
+
+-- Cells table - stores cell data
+CREATE TABLE IF NOT EXISTS cells (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_id TEXT NOT NULL REFERENCES tables(id) ON DELETE CASCADE,
+    r INTEGER NOT NULL,
+    c INTEGER NOT NULL,
+    value TEXT,
+    updated_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+    updated_by TEXT
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_cells_table_id_r_c ON cells(table_id, r, c);
+
+-- Cell blocks table - row-block storage for tables with storage_mode = 'blocks'
+-- Each row holds 64 grid rows as one JSON object keyed by "r:c"; empty cells are absent
+CREATE TABLE IF NOT EXISTS cell_blocks (
+    table_id TEXT NOT NULL REFERENCES tables(id) ON DELETE CASCADE,
+    block_idx INTEGER NOT NULL,
+    data TEXT NOT NULL DEFAULT '{}',
+    updated_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+    PRIMARY KEY (table_id, block_idx)
+);
+
+-- App config table - stores application configuration
+CREATE TABLE IF NOT EXISTS app_config (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL UNIQUE,
+    value_en TEXT,
+    value_de TEXT,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+    updated_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+
+-- Triggers keeping updated_at and last_activity_at current (activity at most every 5 seconds)
+CREATE TRIGGER IF NOT EXISTS update_tables_updated_at
+AFTER UPDATE ON tables FOR EACH ROW WHEN NEW.updated_at = OLD.updated_at
+BEGIN
+    UPDATE tables SET updated_at = strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')
+    WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS update_app_config_updated_at
+AFTER UPDATE ON app_config FOR EACH ROW WHEN NEW.updated_at = OLD.updated_at
+BEGIN
+    UPDATE app_config SET updated_at = strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')
+    WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS update_cells_updated_at
+AFTER UPDATE OF value ON cells FOR EACH ROW
+BEGIN
+    UPDATE cells SET updated_at = strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now') WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS update_table_activity_on_cell_inserts
+AFTER INSERT ON cells FOR EACH ROW
+BEGIN
+    UPDATE tables SET last_activity_at = strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')
+    WHERE id = NEW.table_id
+      AND last_activity_at < strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now', '-5 seconds');
+END;
+
+CREATE TRIGGER IF NOT EXISTS update_table_activity_on_cell_updates
+AFTER UPDATE OF value ON cells FOR EACH ROW
+BEGIN
+    UPDATE tables SET last_activity_at = strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')
+    WHERE id = NEW.table_id
+      AND last_activity_at < strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now', '-5 seconds');
+END;
+
+CREATE TRIGGER IF NOT EXISTS update_table_activity_on_cell_block_inserts
+AFTER INSERT ON cell_blocks FOR EACH ROW
+BEGIN
+    UPDATE tables SET last_activity_at = strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')
+    WHERE id = NEW.table_id
+      AND last_activity_at < strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now', '-5 seconds');
+END;
+
+CREATE TRIGGER IF NOT EXISTS update_table_activity_on_cell_blocks
+AFTER UPDATE OF data ON cell_blocks FOR EACH ROW
+BEGIN
+    UPDATE tables SET last_activity_at = strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')
+    WHERE id = NEW.table_id
+      AND last_activity_at < strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now', '-5 seconds');
+END;
+
+-- Default configuration values
+INSERT INTO app_config (key, value_en, value_de) VALUES
+    ('app.title', 'Online Tables Lite', 'Online Tabellen Lite'),
+    ('app.description', 'Collaborative table editing application', 'App um gemeinsam Tabellen zu erstellen und zu bearbeiten')
+ON CONFLICT (key) DO NOTHING;
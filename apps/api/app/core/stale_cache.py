@@ -0,0 +1,68 @@
+"""Last served table payloads, for reads while the database is unavailable."""
+
+import time
+from collections import OrderedDict
+from typing import Any
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.security import hash_token
+from app.models.table import CellWindow
+
+
+class _Entry:
+    """A cached payload with the token hashes that may read it."""
+
+    def __init__(self, payload: bytes, admin_token_hash: str, edit_token_hash: str):
+        self.payload = payload
+        self.admin_token_hash = admin_token_hash
+        self.edit_token_hash = edit_token_hash
+        self.stored_at = time.monotonic()
+
+
+class StaleTableCache:
+    """LRU of table payloads by slug and cell window, bounded by total payload bytes.
+
+    Every successful table read replaces its entry, so an entry is as fresh as
+    the last read. Entries are only served while the circuit breaker rejects
+    queries, and only to a token whose hash matches the table's at that time.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple[str, str], _Entry] = OrderedDict()
+        self._bytes = 0
+
+    @staticmethod
+    def _key(slug: str, window: CellWindow | None) -> tuple[str, str]:
+        return slug, window.model_dump_json() if window is not None else ""
+
+    def put(self, table: dict[str, Any], window: CellWindow | None, payload: bytes) -> None:
+        """Remember the payload just served for a table and window."""
+        if len(payload) > self.max_bytes:
+            return
+        key = self._key(table["slug"], window)
+        self._discard(key)
+        self._entries[key] = _Entry(payload, table["admin_token_hash"], table["edit_token_hash"])
+        self._bytes += len(payload)
+        while self._bytes > self.max_bytes:
+            self._discard(next(iter(self._entries)))
+
+    def get(self, slug: str, token: str, window: CellWindow | None) -> tuple[bytes, float] | None:
+        """Get a cached payload and its age in seconds, if the token may read it."""
+        entry = self._entries.get(self._key(slug, window))
+        token_hash = hash_token(token)
+        if entry is None or token_hash not in (entry.admin_token_hash, entry.edit_token_hash):
+            metrics.incr("stale_cache.misses")
+            return None
+        self._entries.move_to_end(self._key(slug, window))
+        metrics.incr("stale_cache.hits")
+        return entry.payload, time.monotonic() - entry.stored_at
+
+    def _discard(self, key: tuple[str, str]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry.payload)
+
+
+stale_tables = StaleTableCache(max_bytes=settings.stale_cache_max_bytes)
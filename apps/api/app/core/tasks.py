@@ -0,0 +1,232 @@
+"""Bounded in-process queue for work that can finish after the response."""
+
+import asyncio
+import contextvars
+import itertools
+import logging
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from enum import IntEnum
+from typing import Any
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger("api.tasks")
+
+
+class TaskPriority(IntEnum):
+    """Task priorities; lower values run first."""
+
+    HIGH = 0  # Realtime broadcasts other clients are waiting for
+    NORMAL = 1  # Bookkeeping such as activity tracking
+    LOW = 2  # Anything that may lag behind, e.g. snapshots
+
+
+class _Task:
+    """A queued call with its retry state and the context it was submitted from."""
+
+    def __init__(
+        self,
+        fn: Callable[..., Awaitable[Any]],
+        args: tuple[Any, ...],
+        name: str,
+        priority: TaskPriority,
+        key: str | None,
+        retries: int,
+    ):
+        self.fn = fn
+        self.args = args
+        self.name = name
+        self.priority = priority
+        self.key = key
+        self.retries = retries
+        self.attempts = 0
+        self.enqueued_at = time.perf_counter()
+        # Keeps the request ID in logs written by the task
+        self.context = contextvars.copy_context()
+
+
+class TaskQueue:
+    """Priority queue of coroutine functions run by a fixed set of worker tasks.
+
+    ``submit`` never blocks: when the queue is full the task is dropped and
+    counted, so a backlog can only cost side work, never request latency.
+    Keyed HIGH tasks are the exception and are queued beyond ``maxsize``:
+    they are realtime broadcasts already given a sequence number, and a
+    dropped one would leave a gap clients cannot notice. Each comes from a
+    finished request, so request admission already bounds them.
+    Failed tasks are retried with exponential backoff. Tasks sharing a ``key``
+    run one at a time in submission order (a retried task goes to the back).
+    On shutdown the queue stops accepting work and drains until a deadline.
+    """
+
+    def __init__(self, maxsize: int, workers: int, max_retries: int, retry_backoff: float):
+        self.maxsize = maxsize
+        self.workers = workers
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        # Unbounded so keyed HIGH tasks always fit; _put enforces maxsize for the rest
+        self._queue: asyncio.PriorityQueue[tuple[int, int, _Task]] = asyncio.PriorityQueue()
+        self._order = itertools.count()
+        # Keys with a running task, mapped to tasks of the same key waiting behind it
+        self._busy_keys: dict[str, deque[_Task]] = {}
+        self._retries: set[asyncio.TimerHandle] = set()
+        self._workers: list[asyncio.Task[None]] = []
+        self._closed = False
+
+    def submit(
+        self,
+        fn: Callable[..., Awaitable[Any]],
+        *args: Any,
+        priority: TaskPriority = TaskPriority.NORMAL,
+        key: str | None = None,
+        retries: int | None = None,
+        name: str | None = None,
+    ) -> bool:
+        """Queue ``fn(*args)``; return False if the task was dropped."""
+        task = _Task(
+            fn,
+            args,
+            name or fn.__name__,
+            priority,
+            key,
+            self.max_retries if retries is None else retries,
+        )
+        if self._closed:
+            metrics.incr("tasks.rejected")
+            logger.warning(
+                "Task rejected during shutdown", extra={"extra_fields": {"task": task.name}}
+            )
+            return False
+        return self._put(task)
+
+    def start(self) -> None:
+        """Start the workers on the running event loop."""
+        if not self._workers:
+            self._closed = False
+            self._workers = [
+                asyncio.create_task(self._work(), name=f"task-worker-{i}")
+                for i in range(self.workers)
+            ]
+
+    async def stop(self, timeout: float) -> None:
+        """Stop accepting tasks, wait up to ``timeout`` seconds for the rest, then cancel."""
+        self._closed = True
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except TimeoutError:
+            abandoned = self._queue.qsize() + len(self._retries)
+            abandoned += sum(len(waiting) for waiting in self._busy_keys.values())
+            metrics.incr("tasks.abandoned", abandoned)
+            logger.warning(
+                "Task queue not drained before deadline",
+                extra={"extra_fields": {"abandoned": abandoned, "timeout": timeout}},
+            )
+
+        for handle in self._retries:
+            handle.cancel()
+        self._retries.clear()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def _put(self, task: _Task) -> bool:
+        """Enqueue a task, dropping it if the queue is full unless it is keyed and HIGH."""
+        if self._queue.qsize() >= self.maxsize:
+            if task.priority != TaskPriority.HIGH or task.key is None:
+                metrics.incr(f"tasks.dropped.{task.priority.name.lower()}")
+                logger.warning(
+                    "Task queue full, task dropped",
+                    extra={"extra_fields": {"task": task.name, "queue_size": self.maxsize}},
+                )
+                return False
+            metrics.incr("tasks.over_capacity")
+
+        self._queue.put_nowait((task.priority, next(self._order), task))
+        metrics.incr("tasks.submitted")
+        metrics.set_gauge("tasks.queue_depth", self._queue.qsize())
+        return True
+
+    async def _work(self) -> None:
+        """Take tasks in priority order; run tasks of a busy key after the running one."""
+        while True:
+            _, _, task = await self._queue.get()
+            metrics.set_gauge("tasks.queue_depth", self._queue.qsize())
+
+            if task.key is not None:
+                if task.key in self._busy_keys:
+                    self._busy_keys[task.key].append(task)
+                    continue
+                self._busy_keys[task.key] = deque()
+
+            while task is not None:
+                if await self._run(task):
+                    self._queue.task_done()
+                task = self._next_for_key(task.key)
+
+    def _next_for_key(self, key: str | None) -> _Task | None:
+        """Get the next waiting task of a key, releasing the key when there is none."""
+        if key is None:
+            return None
+        waiting = self._busy_keys[key]
+        if waiting:
+            return waiting.popleft()
+        del self._busy_keys[key]
+        return None
+
+    async def _run(self, task: _Task) -> bool:
+        """Run a task once; return False if it was scheduled for a retry instead."""
+        metrics.observe("tasks.wait_ms", (time.perf_counter() - task.enqueued_at) * 1000)
+        start = time.perf_counter()
+        try:
+            await asyncio.create_task(task.fn(*task.args), context=task.context)
+        except Exception as e:
+            if task.attempts < task.retries:
+                task.attempts += 1
+                delay = self.retry_backoff * 2 ** (task.attempts - 1)
+                metrics.incr("tasks.retried")
+                logger.warning(
+                    "Task failed, retrying",
+                    extra={
+                        "extra_fields": {
+                            "task": task.name,
+                            "attempt": task.attempts,
+                            "delay": delay,
+                            "error": str(e),
+                        }
+                    },
+                )
+                self._schedule_retry(task, delay)
+                return False
+
+            metrics.incr("tasks.failed")
+            logger.error("Task failed", exc_info=e, extra={"extra_fields": {"task": task.name}})
+        else:
+            metrics.incr("tasks.completed")
+        finally:
+            metrics.observe("tasks.run_ms", (time.perf_counter() - start) * 1000)
+        return True
+
+    def _schedule_retry(self, task: _Task, delay: float) -> None:
+        """Re-enqueue a task after ``delay``; it counts as unfinished until then."""
+
+        def requeue() -> None:
+            self._retries.discard(handle)
+            task.enqueued_at = time.perf_counter()
+            self._put(task)
+            # The retry replaces the original entry, which is finished now
+            self._queue.task_done()
+
+        handle = asyncio.get_running_loop().call_later(delay, requeue)
+        self._retries.add(handle)
+
+
+task_queue = TaskQueue(
+    maxsize=settings.task_queue_size,
+    workers=settings.task_workers,
+    max_retries=settings.task_max_retries,
+    retry_backoff=settings.task_retry_backoff,
+)
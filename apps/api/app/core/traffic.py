@@ -0,0 +1,156 @@
+"""Opt-in recording of sanitized request traces for load replay."""
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import logging
+import random
+import secrets
+import time
+from contextvars import ContextVar
+from typing import Any
+
+from fastapi import Request
+
+from app.core.config import settings
+
+logger = logging.getLogger("api.traffic")
+
+# Query parameters whose values are recorded; of all others only the name is kept
+RECORDED_PARAMS = ("row_start", "row_end", "col_start", "col_end", "limit", "offset")
+
+# Trace of the current request, filled in by handlers through ``note_batch``
+_current_trace: ContextVar[dict[str, Any] | None] = ContextVar("traffic_trace", default=None)
+
+
+def note_batch(size: int) -> None:
+    """Record the batch size (cells, rows, columns or tables) of the current request."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace["batch"] = size
+
+
+def _route_template(request: Request) -> str | None:
+    """Path of a matched request with path parameter values replaced by their names."""
+    if "route" not in request.scope:
+        return None
+    names = {str(value): name for name, value in request.path_params.items()}
+    segments = request.url.path.split("/")
+    return "/".join(
+        f"{{{names[segment]}}}" if segment in names else segment for segment in segments
+    )
+
+
+class TrafficRecorder:
+    """Append one JSON line per request to a local file for ``benchmarks/replay_traffic.py``.
+
+    A trace holds the method, route template, a salted hash of the table slug,
+    the batch size, status and duration; never tokens, cell values or other
+    request data. Hashes group requests by table without being reversible to
+    slugs. The salt comes from configuration, so every machine and restart
+    hashes (and samples) a table the same way and their traces can be merged;
+    without one it is random per process. ``sample`` keeps a fraction of
+    tables (all of their requests) to preserve the per-table access shape.
+    Lines are buffered and written by a background loop every ``flush_interval``.
+    """
+
+    def __init__(
+        self, path: str | None, sample: float, salt: str | None = None, flush_interval: float = 1.0
+    ):
+        self.path = path
+        self.sample = sample
+        self.flush_interval = flush_interval
+        self._salt = salt.encode() if salt else secrets.token_bytes(16)
+        self._buffer: list[str] = []
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def begin(self) -> dict[str, Any] | None:
+        """Start a trace for the current request; None when recording is disabled."""
+        if not self.enabled:
+            return None
+        trace: dict[str, Any] = {"t": round(time.time(), 3)}
+        _current_trace.set(trace)
+        return trace
+
+    def record(
+        self, trace: dict[str, Any] | None, request: Request, status: int, duration: float
+    ) -> None:
+        """Complete a trace once the response is ready and buffer it if sampled."""
+        if trace is None:
+            return
+
+        slug = request.path_params.get("slug")
+        table = hashlib.sha256(self._salt + slug.encode()).hexdigest()[:12] if slug else None
+        if not self._sampled(table):
+            return
+
+        trace.update(
+            method=request.method,
+            route=_route_template(request),
+            table=table,
+            params={
+                name: request.query_params[name] if name in RECORDED_PARAMS else None
+                for name in sorted(request.query_params)
+            },
+            status=status,
+            ms=round(duration * 1000, 2),
+        )
+        self._buffer.append(json.dumps(trace, separators=(",", ":")))
+
+    def _sampled(self, table: str | None) -> bool:
+        """Keep all requests of a sampled table, and a random share of the rest."""
+        if self.sample >= 1:
+            return True
+        if table is None:
+            return random.random() < self.sample  # noqa: S311 - sampling, not security
+        return int(table, 16) / 16**12 < self.sample
+
+    def start(self) -> None:
+        """Start the flush loop on the running event loop, if recording is enabled."""
+        if self._task is None and self.enabled:
+            logger.info("Recording traffic", extra={"extra_fields": {"path": self.path}})
+            if not settings.traffic_record_salt:
+                logger.warning(
+                    "TRAFFIC_RECORD_SALT is not set; table hashes will differ between processes"
+                )
+            self._task = asyncio.create_task(self._run(), name="traffic-recorder")
+
+    async def stop(self) -> None:
+        """Cancel the flush loop and write out buffered traces."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Append buffered traces to the file."""
+        if not self._buffer:
+            return
+        lines, self._buffer = self._buffer, []
+        await asyncio.to_thread(self._write, lines)
+
+    def _write(self, lines: list[str]) -> None:
+        with open(self.path, "a") as f:
+            f.write("\n".join(lines) + "\n")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error("Writing traffic traces failed", exc_info=e)
+
+
+traffic_recorder = TrafficRecorder(
+    path=settings.traffic_record_path,
+    sample=settings.traffic_record_sample,
+    salt=settings.traffic_record_salt,
+)
@@ -1,6 +1,6 @@
 """Table-related Pydantic models."""
 
-from enum import Enum
+from enum import Enum, StrEnum
 
 from pydantic import BaseModel
 
@@ -13,6 +13,13 @@ class ColumnFormat(str, Enum):
     TIMERANGE = "timerange"
 
 
+class StorageMode(StrEnum):
+    """How a table's cells are stored."""
+
+    CELLS = "cells"  # One row per cell
+    BLOCKS = "blocks"  # Fixed-size row blocks, one JSONB document per block
+
+
 class CreateTableRequest(BaseModel):
     """Request model for creating a new table."""
 
@@ -20,6 +27,7 @@ class CreateTableRequest(BaseModel):
     description: str | None = None
     cols: int | None = None  # Will use config defaults if None
     rows: int | None = None  # Will use config defaults if None
+    storage_mode: StorageMode = StorageMode.CELLS
 
 
 class CreateTableResponse(BaseModel):
@@ -30,6 +38,26 @@ class CreateTableResponse(BaseModel):
     edit_token: str
 
 
+class BatchCreateTableRequest(BaseModel):
+    """Request model for creating several tables at once."""
+
+    tables: list[CreateTableRequest]
+
+
+class BatchCreateTableResponse(BaseModel):
+    """Response model for batch table creation, in request order."""
+
+    tables: list[CreateTableResponse]
+
+
+class CloneTableRequest(BaseModel):
+    """Request model for cloning a table."""
+
+    title: str | None = None  # Defaults to the source title
+    description: str | None = None  # Defaults to the source description
+    include_cells: bool = True
+
+
 class TableColumn(BaseModel):
     """Table column model."""
 
@@ -47,6 +75,15 @@ class CellData(BaseModel):
     value: str | None
 
 
+class CellWindow(BaseModel):
+    """Row and column range for windowed cell reads (start inclusive, end exclusive)."""
+
+    row_start: int = 0
+    row_end: int | None = None
+    col_start: int = 0
+    col_end: int | None = None
+
+
 class TableResponse(BaseModel):
     """Response model for table data."""
 
@@ -61,6 +98,40 @@ class TableResponse(BaseModel):
     cells: list[CellData] = []
 
 
+class TableCredentials(BaseModel):
+    """A table slug with an admin or editor token for it."""
+
+    slug: str
+    token: str
+
+
+class BatchGetTablesRequest(BaseModel):
+    """Request model for loading several tables at once."""
+
+    tables: list[TableCredentials]
+
+
+class BatchGetTableError(BaseModel):
+    """Why one table of a batch get could not be loaded."""
+
+    status: int
+    error: str
+
+
+class BatchGetTableResult(BaseModel):
+    """One entry of a batch get: the table, or the error for its slug and token."""
+
+    slug: str
+    table: TableResponse | None = None
+    error: BatchGetTableError | None = None
+
+
+class BatchGetTablesResponse(BaseModel):
+    """Response model for batch table loads, in request order."""
+
+    tables: list[BatchGetTableResult]
+
+
 class CellUpdateRequest(BaseModel):
     """Request model for updating cells."""
 
@@ -134,3 +205,123 @@ class RowColumnResponse(BaseModel):
     message: str
     new_rows: int | None = None
     new_cols: int | None = None
+
+
+class StorageModeRequest(BaseModel):
+    """Request model for migrating a table to another storage mode."""
+
+    storage_mode: StorageMode
+
+
+class StorageModeResponse(BaseModel):
+    """Response model for storage mode migration."""
+
+    success: bool
+    message: str
+    storage_mode: StorageMode
+
+
+class QueryOperator(StrEnum):
+    """Column predicates for table queries."""
+
+    EQ = "eq"  # Exact match; date columns compare as dates
+    CONTAINS = "contains"  # Case-insensitive substring
+    PREFIX = "prefix"  # Case-sensitive prefix
+    BEFORE = "before"  # Date before, or time range ending at or before an instant
+    AFTER = "after"  # Date after, or time range starting at or after an instant
+    OVERLAPS = "overlaps"  # Time range overlapping "start|end"
+    INCLUDES = "includes"  # Time range including an instant
+
+
+class QueryFilter(BaseModel):
+    """One column predicate, written as ``col:op:value`` in the query string."""
+
+    col: int
+    op: QueryOperator
+    value: str
+
+
+class QuerySort(BaseModel):
+    """One sort key, written as ``col`` or ``-col`` (descending) in the query string."""
+
+    col: int
+    desc: bool = False
+
+
+class TableQuery(BaseModel):
+    """Filters, sort keys and row page for a table query."""
+
+    filters: list[QueryFilter] = []
+    sort: list[QuerySort] = []
+    limit: int = 100
+    offset: int = 0
+
+
+class TableQueryResponse(BaseModel):
+    """Response model for table queries."""
+
+    total: int
+    rows: list[int]
+    cells: list[CellData]
+
+
+class RangeOverlapResponse(BaseModel):
+    """Response model for time range overlap detection."""
+
+    col: int
+    pairs: list[tuple[int, int]]  # Row pairs whose ranges overlap, lower row first
+
+
+class TableSearchResult(BaseModel):
+    """One table matching an operator search."""
+
+    slug: str
+    title: str | None
+    description: str | None
+    last_activity_at: str
+    rank: float
+    matches: int  # Matching cells
+    samples: list[CellData]  # Best-ranked matching cells
+
+
+class TableSearchResponse(BaseModel):
+    """Response model for operator search."""
+
+    total: int
+    results: list[TableSearchResult]
+
+
+class DateCount(BaseModel):
+    """Filled cells on one date in a date column."""
+
+    date: str
+    count: int
+
+
+class ColumnStats(BaseModel):
+    """Aggregates for one column."""
+
+    col: int
+    format: ColumnFormat
+    non_empty: int
+    empty: int
+    distinct: int
+    min_date: str | None = None  # Date columns only
+    max_date: str | None = None
+    dates: list[DateCount] = []  # Per-date occupancy, date columns only
+
+
+class TableStatsResponse(BaseModel):
+    """Response model for table stats."""
+
+    rows: int
+    cols: int
+    columns: list[ColumnStats]
+    rebuilt_at: str | None  # Last full rebuild; null until the first one runs
+
+
+class StatsRebuildResponse(BaseModel):
+    """Response model for a forced stats rebuild."""
+
+    success: bool
+    message: str
@@ -0,0 +1,85 @@
+"""Background archival of idle tables."""
+
+import asyncio
+import contextlib
+import logging
+
+from app.core.config import settings
+from app.core.database import get_supabase_client
+from app.core.db_scheduler import DBLane, run_query
+
+logger = logging.getLogger("api.archive")
+
+
+class TableArchiver:
+    """Periodically move the cells of idle tables into ``table_archives``.
+
+    Each batch is one ``archive_idle_tables`` call (one transaction) followed by
+    a pause, so archival never holds more than ``batch_size`` table locks and
+    leaves lane capacity for interactive traffic. Progress lives in
+    ``tables.archived_at``, so a restarted archiver simply continues with the
+    tables that are still unarchived. Archived tables are restored by
+    ``verify_token`` on their next use.
+    """
+
+    def __init__(self, idle_days: float, interval: float, batch_size: int, batch_delay: float):
+        self.idle_days = idle_days
+        self.interval = interval
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        """Start the archive loop on the running event loop, unless disabled."""
+        if self._task is None and self.idle_days > 0 and self.interval > 0:
+            self._task = asyncio.create_task(self._run(), name="table-archiver")
+
+    async def stop(self) -> None:
+        """Cancel the archive loop."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def archive_batch(self) -> int:
+        """Archive up to one batch of idle tables and return how many were archived."""
+        result = await run_query(
+            get_supabase_client().rpc(
+                "archive_idle_tables",
+                {"p_idle": f"{self.idle_days} days", "p_limit": self.batch_size},
+            ),
+            DBLane.ADMIN,
+        )
+        return result.data or 0
+
+    async def run_once(self) -> int:
+        """Archive batches until no full batch remains, pausing between batches."""
+        total = 0
+        while True:
+            archived = await self.archive_batch()
+            total += archived
+            if archived < self.batch_size:
+                return total
+            await asyncio.sleep(self.batch_delay)
+
+    async def _run(self) -> None:
+        """Run one archival pass per interval."""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                archived = await self.run_once()
+                if archived:
+                    logger.info(
+                        "Archived idle tables", extra={"extra_fields": {"tables": archived}}
+                    )
+            except Exception as e:
+                logger.error("Table archival failed", exc_info=e)
+
+
+table_archiver = TableArchiver(
+    idle_days=settings.archive_idle_days,
+    interval=settings.archive_interval,
+    batch_size=settings.archive_batch_size,
+    batch_delay=settings.archive_batch_delay,
+)
@@ -0,0 +1,220 @@
+"""Cell storage backends: one row per cell, or fixed-size row blocks."""
+
+from collections.abc import Callable
+from typing import Any
+
+from app.core.db_scheduler import DBLane, run_query
+from app.models.table import CellUpdateRequest, CellWindow
+
+# Grid rows per block; must match the block size used by the SQL functions
+CELL_BLOCK_ROWS = 64
+
+# Blocks fetched per round trip while filling a page
+BLOCK_PAGE_SIZE = 8
+
+# Rows per request for reads that can exceed PostgREST's max-rows (1000 by default);
+# must not be larger, or pages come back cut short without an error
+PAGE_ROWS = 1000
+
+
+async def fetch_all(build_query: Callable[[], Any]) -> list[dict[str, Any]]:
+    """Run a select page by page with ``range()`` until a short page; return all rows.
+
+    ``build_query`` returns a fresh builder with a deterministic order for each
+    page, since builders accumulate parameters and cannot be reused.
+    """
+    rows: list[dict[str, Any]] = []
+    while True:
+        result = await run_query(
+            build_query().range(len(rows), len(rows) + PAGE_ROWS - 1), DBLane.READ
+        )
+        rows.extend(result.data)
+        if len(result.data) < PAGE_ROWS:
+            return rows
+
+
+class RowCellStore:
+    """Cells stored one row each in ``cells``, indexed by ``(table_id, r, c)``."""
+
+    def __init__(self, supabase: Any):
+        self.supabase = supabase
+
+    def _query(self, table_id: str, window: CellWindow | None = None):
+        """Build a cells select limited to a window.
+
+        Range filters on ``r``/``c`` are served by the ``(table_id, r, c)`` index,
+        and PostgREST renames the columns to the response field names.
+        """
+        query = self.supabase.table("cells").select("row:r, col:c, value").eq("table_id", table_id)
+        if window is None:
+            return query
+
+        if window.row_start > 0:
+            query = query.gte("r", window.row_start)
+        if window.row_end is not None:
+            query = query.lt("r", window.row_end)
+        if window.col_start > 0:
+            query = query.gte("c", window.col_start)
+        if window.col_end is not None:
+            query = query.lt("c", window.col_end)
+        return query
+
+    async def fetch(self, table_id: str, window: CellWindow | None = None) -> list[dict[str, Any]]:
+        """Get cells as ``row``/``col``/``value`` dicts."""
+        result = await run_query(self._query(table_id, window), DBLane.READ)
+        return result.data
+
+    async def fetch_many(self, table_ids: list[str]) -> dict[str, list[dict[str, Any]]]:
+        """Get the cells of several tables, keyed by table ID, a page of rows per query."""
+        rows = await fetch_all(
+            lambda: (
+                self.supabase.table("cells")
+                .select("table_id, row:r, col:c, value")
+                .in_("table_id", table_ids)
+                .order("table_id")
+                .order("r")
+                .order("c")
+            )
+        )
+        cells: dict[str, list[dict[str, Any]]] = {table_id: [] for table_id in table_ids}
+        for cell in rows:
+            cells[cell.pop("table_id")].append(cell)
+        return cells
+
+    async def fetch_page(
+        self,
+        table_id: str,
+        window: CellWindow | None,
+        after: tuple[int, int] | None,
+        limit: int,
+    ) -> list[dict[str, Any]]:
+        """Get up to ``limit`` cells ordered by ``(row, col)`` after a keyset cursor."""
+        query = self._query(table_id, window)
+        if after is not None:
+            row, col = after
+            query = query.or_(f"r.gt.{row},and(r.eq.{row},c.gt.{col})")
+
+        result = await run_query(query.order("r").order("c").limit(limit), DBLane.READ)
+        return result.data
+
+    async def write(self, table_id: str, cells: list[CellUpdateRequest]) -> None:
+        """Upsert the whole batch in one call; later writes to the same cell win."""
+        await run_query(
+            self.supabase.rpc(
+                "write_cells",
+                {"p_table_id": table_id, "p_cells": [cell.model_dump() for cell in cells]},
+            ),
+            DBLane.WRITE,
+        )
+
+
+class BlockCellStore:
+    """Cells stored in ``cell_blocks``, one JSONB document per block of rows.
+
+    Each block maps ``"r:c"`` keys to values for ``CELL_BLOCK_ROWS`` consecutive
+    rows, so reads and writes touch one row per block and structural changes
+    rewrite blocks instead of individual cells. Writes and truncation run in
+    SQL functions so each call is a single atomic statement.
+    """
+
+    def __init__(self, supabase: Any):
+        self.supabase = supabase
+
+    def _query(self, table_id: str, window: CellWindow | None = None, first_block: int = 0):
+        """Build a select for the blocks covering a window, in block order."""
+        last_block = None
+        if window is not None:
+            first_block = max(first_block, window.row_start // CELL_BLOCK_ROWS)
+            if window.row_end is not None:
+                last_block = (window.row_end - 1) // CELL_BLOCK_ROWS
+
+        query = (
+            self.supabase.table("cell_blocks").select("block_idx, data").eq("table_id", table_id)
+        )
+        if first_block > 0:
+            query = query.gte("block_idx", first_block)
+        if last_block is not None:
+            query = query.lte("block_idx", last_block)
+        return query.order("block_idx")
+
+    @staticmethod
+    def expand_blocks(
+        blocks: list[dict[str, Any]], window: CellWindow | None = None
+    ) -> list[dict[str, Any]]:
+        """Flatten blocks into ``row``/``col``/``value`` dicts ordered by ``(row, col)``."""
+        cells = []
+        for block in blocks:
+            block_cells = []
+            for key, value in block["data"].items():
+                row, col = (int(part) for part in key.split(":"))
+                if window is not None and not (
+                    window.row_start <= row
+                    and (window.row_end is None or row < window.row_end)
+                    and window.col_start <= col
+                    and (window.col_end is None or col < window.col_end)
+                ):
+                    continue
+                block_cells.append({"row": row, "col": col, "value": value})
+            # JSONB orders keys by length, not numerically
+            block_cells.sort(key=lambda cell: (cell["row"], cell["col"]))
+            cells.extend(block_cells)
+        return cells
+
+    async def fetch(self, table_id: str, window: CellWindow | None = None) -> list[dict[str, Any]]:
+        """Get cells as ``row``/``col``/``value`` dicts."""
+        result = await run_query(self._query(table_id, window), DBLane.READ)
+        return self.expand_blocks(result.data, window)
+
+    async def fetch_many(self, table_ids: list[str]) -> dict[str, list[dict[str, Any]]]:
+        """Get the cells of several tables, keyed by table ID, a page of blocks per query."""
+        rows = await fetch_all(
+            lambda: (
+                self.supabase.table("cell_blocks")
+                .select("table_id, block_idx, data")
+                .in_("table_id", table_ids)
+                .order("table_id")
+                .order("block_idx")
+            )
+        )
+        blocks: dict[str, list[dict[str, Any]]] = {table_id: [] for table_id in table_ids}
+        for block in rows:
+            blocks[block["table_id"]].append(block)
+        return {table_id: self.expand_blocks(blocks[table_id]) for table_id in table_ids}
+
+    async def fetch_page(
+        self,
+        table_id: str,
+        window: CellWindow | None,
+        after: tuple[int, int] | None,
+        limit: int,
+    ) -> list[dict[str, Any]]:
+        """Get up to ``limit`` cells ordered by ``(row, col)`` after a keyset cursor.
+
+        Blocks are read ``BLOCK_PAGE_SIZE`` at a time, starting at the block that
+        holds the cursor, until the page is full or the blocks run out.
+        """
+        next_block = after[0] // CELL_BLOCK_ROWS if after is not None else 0
+        cells: list[dict[str, Any]] = []
+        while len(cells) < limit:
+            result = await run_query(
+                self._query(table_id, window, next_block).limit(BLOCK_PAGE_SIZE), DBLane.READ
+            )
+            for cell in self.expand_blocks(result.data, window):
+                if after is None or (cell["row"], cell["col"]) > after:
+                    cells.append(cell)
+
+            if len(result.data) < BLOCK_PAGE_SIZE:
+                break
+            next_block = result.data[-1]["block_idx"] + 1
+
+        return cells[:limit]
+
+    async def write(self, table_id: str, cells: list[CellUpdateRequest]) -> None:
+        """Apply the whole batch in one call; later writes to the same cell win."""
+        await run_query(
+            self.supabase.rpc(
+                "write_cell_blocks",
+                {"p_table_id": table_id, "p_cells": [cell.model_dump() for cell in cells]},
+            ),
+            DBLane.WRITE,
+        )
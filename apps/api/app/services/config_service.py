@@ -1,52 +1,296 @@
 """Configuration service for app-wide settings."""
 
+import asyncio
+import contextlib
+import gzip
+import hashlib
 import json
+import logging
+from functools import cache
 from pathlib import Path
 from typing import Any
 
+from app.core.compression import brotli
+from app.core.config import settings
 from app.core.database import get_supabase_client
+from app.core.db_scheduler import DBLane, run_query
 
+logger = logging.getLogger("api.config")
 
-class ConfigService:
-    """Service for managing application configuration."""
+APP_CONFIG_PATH = Path(__file__).parent.parent.parent / "config" / "app.json"
 
-    def __init__(self):
-        self.supabase = get_supabase_client()
-        self._config_cache: dict[str, dict[str, str]] | None = None
-        self._app_config: dict[str, Any] | None = None
+# Locales column templates are always compiled for, besides those in app.json
+DEFAULT_LOCALES = ("en", "de")
 
-    async def load_all_config(self) -> dict[str, dict[str, str]]:
-        """Load all configuration from database and cache it."""
-        if self._config_cache is not None:
-            return self._config_cache
 
-        try:
-            result = self.supabase.table("app_config").select("key, value_en, value_de").execute()
+def _load_app_config() -> dict[str, Any]:
+    """Load app configuration from JSON file."""
+    try:
+        with open(APP_CONFIG_PATH) as f:
+            return json.load(f)
+    except Exception as e:
+        logger.warning("Failed to load app config from JSON: %s", e)
+        # Return default config
+        return {"table": {"defaultRows": 10, "defaultCols": 5, "defaultColumns": []}}
 
-            config = {}
-            for row in result.data:
-                config[row["key"]] = {"value_en": row["value_en"], "value_de": row["value_de"]}
 
-            self._config_cache = config
-            return config
-        except Exception as e:
-            print(f"Warning: Failed to load configuration from database: {e}")
-            return {}
+def _fallback_columns(locale: str = "en") -> list[dict[str, Any]]:
+    """Hardcoded fallback column configuration."""
+    date_header = "Date" if locale == "en" else "Datum"
+
+    columns = [{"index": 0, "header": date_header, "format": "date"}]
+
+    for i in range(1, 5):
+        columns.append({"index": i, "header": f"No {i}", "format": "text"})
+
+    return columns
 
-    async def get_config_value(self, key: str, locale: str = "en") -> str | None:
-        """Get a configuration value by key and locale."""
-        config = await self.load_all_config()
 
-        if key not in config:
+def _localize_columns(columns: list[dict[str, Any]], locale: str) -> list[dict[str, Any]]:
+    """Resolve configured column headers for a locale, falling back to English."""
+    localized_columns = []
+    for col in columns:
+        header = col.get("header", {})
+        localized_header = header.get(locale, header.get("en", f"Column {col.get('index', 0) + 1}"))
+        localized_columns.append(
+            {
+                "index": col.get("index", 0),
+                "header": localized_header,
+                "format": col.get("format", "text"),
+            }
+        )
+    return localized_columns
+
+
+class TableTemplates:
+    """Default table size and per-locale column templates for new tables.
+
+    Compiled once from ``config/app.json``: every locale gets a full list of
+    ``table_col_limit`` column definitions, so creating a table only slices a
+    list instead of reading and localizing the config file.
+    """
+
+    def __init__(self, config: dict[str, Any], max_cols: int):
+        table_config = config.get("table", {})
+        self.default_rows: int = table_config.get("defaultRows", 10)
+        self.default_cols: int = table_config.get("defaultCols", 5)
+
+        columns = table_config.get("defaultColumns", [])
+        locales = set(DEFAULT_LOCALES)
+        for col in columns:
+            locales.update(col.get("header", {}).keys())
+
+        self._localized: dict[str, list[dict[str, Any]]] = {}
+        self._columns: dict[str, list[dict[str, Any]]] = {}
+        for locale in sorted(locales):
+            try:
+                localized = _localize_columns(columns, locale) if columns else []
+            except Exception as e:
+                logger.warning("Invalid column config: %s", e)
+                localized = []
+            if not localized:
+                localized = _fallback_columns(locale)
+            self._localized[locale] = localized
+
+            # Configured columns by position, then generic headers up to the column limit
+            templates = []
+            for i in range(max(max_cols, len(localized))):
+                col = localized[i] if i < len(localized) else {}
+                templates.append(
+                    {
+                        "idx": i,
+                        "header": col.get("header", f"Column {i + 1}"),
+                        "width": None,
+                        "format": col.get("format", "text"),
+                    }
+                )
+            self._columns[locale] = templates
+
+    def localized_columns(self, locale: str) -> list[dict[str, Any]]:
+        """Get the configured default columns for a locale."""
+        return self._localized.get(locale, self._localized["en"])
+
+    def columns(self, locale: str, count: int) -> list[dict[str, Any]]:
+        """Get ``idx``/``header``/``width``/``format`` rows for the first ``count`` columns."""
+        return self._columns.get(locale, self._columns["en"])[:count]
+
+
+@cache
+def get_table_templates() -> TableTemplates:
+    """Get the compiled table templates, compiling them on first use."""
+    return TableTemplates(_load_app_config(), settings.table_col_limit)
+
+
+class ConfigPayload:
+    """A serialized JSON response body with its strong ETag.
+
+    Compressed variants are built on first request and kept, so serving the
+    payload never serializes or compresses anything again.
+    """
+
+    def __init__(self, data: Any):
+        self.body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+        self._encoded: dict[str, bytes] = {}
+
+    def encoded(self, encoding: str | None) -> tuple[bytes, str]:
+        """Get the body and ETag for a content encoding (None for identity)."""
+        if encoding is None:
+            return self.body, self.etag
+        if encoding not in self._encoded:
+            if encoding == "br":
+                self._encoded[encoding] = brotli.compress(self.body, quality=11)
+            else:
+                self._encoded[encoding] = gzip.compress(self.body, compresslevel=9, mtime=0)
+        # Each encoding is a different representation and needs its own strong ETag
+        return self._encoded[encoding], f'{self.etag[:-1]}-{encoding}"'
+
+
+class ConfigSnapshot:
+    """All ``app_config`` rows at one version, with every response precomputed.
+
+    A ``fallback`` snapshot stands in (empty) while the database cannot be
+    read; it must not be served as a cacheable configuration.
+    """
+
+    def __init__(
+        self, rows: list[dict[str, Any]], version: tuple[int, str | None], fallback: bool = False
+    ):
+        self.version = version
+        self.fallback = fallback
+        self.values: dict[str, dict[str, str]] = {
+            row["key"]: {"value_en": row["value_en"], "value_de": row["value_de"]} for row in rows
+        }
+        self.for_frontend: dict[str, dict[str, str | None]] = {
+            key: {"en": values.get("value_en"), "de": values.get("value_de")}
+            for key, values in self.values.items()
+        }
+        self.frontend = ConfigPayload(self.for_frontend)
+        self._value_payloads: dict[tuple[str, str], ConfigPayload] = {}
+
+    def value(self, key: str, locale: str = "en") -> str | None:
+        """Get a value by key and locale, falling back to English."""
+        if key not in self.values:
             return None
 
-        # Try to get locale-specific value, fallback to English
-        value = config[key].get(f"value_{locale}")
+        value = self.values[key].get(f"value_{locale}")
         if value is None:
-            value = config[key].get("value_en")
-
+            value = self.values[key].get("value_en")
         return value
 
+    def value_payload(self, key: str, locale: str) -> ConfigPayload | None:
+        """Get the ``/config/{key}`` response for a key and locale, None if the key is unknown."""
+        if key not in self.values:
+            return None
+        payload = self._value_payloads.get((key, locale))
+        if payload is None:
+            payload = ConfigPayload(
+                {"key": key, "value": self.value(key, locale), "locale": locale}
+            )
+            # Only known locales are kept, so arbitrary query strings cannot grow the cache
+            if locale in DEFAULT_LOCALES:
+                self._value_payloads[(key, locale)] = payload
+        return payload
+
+
+class ConfigCache:
+    """Process-wide ``app_config`` snapshot, reloaded only when the table changes.
+
+    A background loop polls the row count and newest ``updated_at`` every
+    ``interval`` seconds and rebuilds the snapshot when either differs, so
+    requests are served from memory. Until the first load succeeds, requests
+    load the snapshot themselves (one at a time) and get an empty ``fallback``
+    snapshot when that fails.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._snapshot: ConfigSnapshot | None = None
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task[None] | None = None
+
+    async def get(self) -> ConfigSnapshot:
+        """Get the current snapshot, loading it if none has been loaded yet."""
+        if self._snapshot is not None:
+            return self._snapshot
+
+        async with self._lock:
+            if self._snapshot is None:
+                try:
+                    await self.refresh()
+                except Exception as e:
+                    logger.warning("Failed to load configuration from database: %s", e)
+                    return ConfigSnapshot([], (0, None), fallback=True)
+        return self._snapshot
+
+    async def refresh(self) -> bool:
+        """Reload the snapshot if ``app_config`` changed; return whether it was reloaded."""
+        supabase = get_supabase_client()
+        result = await run_query(
+            supabase.table("app_config")
+            .select("updated_at", count="exact")
+            .order("updated_at", desc=True)
+            .limit(1),
+            DBLane.READ,
+        )
+        version = (result.count or 0, result.data[0]["updated_at"] if result.data else None)
+        if self._snapshot is not None and self._snapshot.version == version:
+            return False
+
+        result = await run_query(
+            supabase.table("app_config").select("key, value_en, value_de"), DBLane.READ
+        )
+        self._snapshot = ConfigSnapshot(result.data, version)
+        return True
+
+    def invalidate(self) -> None:
+        """Drop the snapshot so the next request reloads it."""
+        self._snapshot = None
+
+    def start(self) -> None:
+        """Start the refresh loop on the running event loop, unless disabled."""
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run(), name="config-cache")
+
+    async def stop(self) -> None:
+        """Cancel the refresh loop."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _run(self) -> None:
+        """Load the snapshot right away, then check for changes every interval."""
+        while True:
+            try:
+                if await self.refresh():
+                    logger.info(
+                        "Loaded app config",
+                        extra={"extra_fields": {"keys": len(self._snapshot.values)}},
+                    )
+            except Exception as e:
+                logger.error("App config refresh failed", exc_info=e)
+            await asyncio.sleep(self.interval)
+
+
+config_cache = ConfigCache(interval=settings.config_refresh_interval)
+
+
+class ConfigService:
+    """Service for managing application configuration."""
+
+    def __init__(self):
+        self.supabase = get_supabase_client()
+
+    async def load_all_config(self) -> dict[str, dict[str, str]]:
+        """Get all configuration from the process-wide cache."""
+        return (await config_cache.get()).values
+
+    async def get_config_value(self, key: str, locale: str = "en") -> str | None:
+        """Get a configuration value by key and locale."""
+        return (await config_cache.get()).value(key, locale)
+
     async def get_app_title(self, locale: str = "en") -> str | None:
         """Get the application title."""
         return await self.get_config_value("app.title", locale)
@@ -55,83 +299,22 @@ class ConfigService:
         """Get the application description."""
         return await self.get_config_value("app.description", locale)
 
-    def _load_app_config(self) -> dict[str, Any]:
-        """Load app configuration from JSON file."""
-        if self._app_config is not None:
-            return self._app_config
-
-        try:
-            config_path = Path(__file__).parent.parent / "config" / "app.json"
-            with open(config_path) as f:
-                self._app_config = json.load(f)
-                return self._app_config
-        except Exception as e:
-            print(f"Warning: Failed to load app config from JSON: {e}")
-            # Return default config
-            self._app_config = {
-                "table": {"defaultRows": 10, "defaultCols": 5, "defaultColumns": []}
-            }
-            return self._app_config
-
     async def get_default_column_config(self, locale: str = "en") -> list[dict[str, Any]]:
-        """Get default column configuration from JSON file."""
-        config = self._load_app_config()
-
-        try:
-            columns = config.get("table", {}).get("defaultColumns", [])
-            if not columns:
-                return self._get_fallback_columns(locale)
-
-            localized_columns = []
-            for col in columns:
-                header = col.get("header", {})
-                localized_header = header.get(
-                    locale, header.get("en", f"Column {col.get('index', 0) + 1}")
-                )
-                localized_columns.append(
-                    {
-                        "index": col.get("index", 0),
-                        "header": localized_header,
-                        "format": col.get("format", "text"),
-                    }
-                )
-            return localized_columns
-        except Exception as e:
-            print(f"Warning: Invalid column config: {e}")
-            return self._get_fallback_columns(locale)
+        """Get default column configuration for a locale."""
+        return get_table_templates().localized_columns(locale)
 
     async def get_default_table_rows(self) -> int:
         """Get default number of rows for new tables."""
-        config = self._load_app_config()
-        return config.get("table", {}).get("defaultRows", 10)
+        return get_table_templates().default_rows
 
     async def get_default_table_cols(self) -> int:
         """Get default number of columns for new tables."""
-        config = self._load_app_config()
-        return config.get("table", {}).get("defaultCols", 5)
-
-    def _get_fallback_columns(self, locale: str = "en") -> list[dict[str, Any]]:
-        """Hardcoded fallback column configuration."""
-        date_header = "Date" if locale == "en" else "Datum"
-
-        columns = [{"index": 0, "header": date_header, "format": "date"}]
-
-        for i in range(1, 5):
-            columns.append({"index": i, "header": f"No {i}", "format": "text"})
-
-        return columns
+        return get_table_templates().default_cols
 
     def clear_cache(self) -> None:
         """Clear the configuration cache (for testing or after updates)."""
-        self._config_cache = None
+        config_cache.invalidate()
 
     async def get_all_config_for_frontend(self) -> dict[str, Any]:
         """Get all configuration formatted for frontend consumption."""
-        config = await self.load_all_config()
-
-        # Transform for frontend
-        result = {}
-        for key, values in config.items():
-            result[key] = {"en": values.get("value_en"), "de": values.get("value_de")}
-
-        return result
+        return (await config_cache.get()).for_frontend
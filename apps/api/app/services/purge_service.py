@@ -0,0 +1,77 @@
+"""Hard deletion of soft-deleted tables past their retention window."""
+
+import asyncio
+import logging
+from collections.abc import Callable
+from typing import Any
+
+from app.core.database import get_supabase_client
+from app.core.db_scheduler import DBLane, run_query
+
+logger = logging.getLogger("api.purge")
+
+
+class TablePurger:
+    """Purge soft-deleted tables in small, paced steps.
+
+    Each ``purge_deleted_tables_step`` call deletes at most ``chunk_size`` cells
+    of one table, or the table row once its cells are gone, so no single
+    statement cascades through a whole table or holds locks for long. Steps
+    are separated by ``delay`` seconds to leave room for interactive writes.
+    """
+
+    def __init__(self, retention_days: float, chunk_size: int, delay: float):
+        self.retention_days = retention_days
+        self.chunk_size = chunk_size
+        self.delay = delay
+        self.supabase = get_supabase_client()
+
+    async def count_pending(self) -> int:
+        """Count soft-deleted tables past the retention window."""
+        result = await run_query(
+            self.supabase.rpc(
+                "count_purgeable_tables", {"p_retention": f"{self.retention_days} days"}
+            ),
+            DBLane.ADMIN,
+        )
+        return result.data or 0
+
+    async def step(self) -> dict[str, Any] | None:
+        """Run one purge step; returns None when no purgeable table is left."""
+        result = await run_query(
+            self.supabase.rpc(
+                "purge_deleted_tables_step",
+                {"p_retention": f"{self.retention_days} days", "p_chunk": self.chunk_size},
+            ),
+            DBLane.ADMIN,
+        )
+        return result.data
+
+    async def run(
+        self,
+        max_tables: int | None = None,
+        on_progress: Callable[[dict[str, Any]], None] | None = None,
+    ) -> dict[str, int]:
+        """Purge until nothing is left or ``max_tables`` tables were removed.
+
+        ``on_progress`` receives running totals after every step.
+        """
+        totals = {"tables": 0, "cells": 0, "blocks": 0}
+        while max_tables is None or totals["tables"] < max_tables:
+            step = await self.step()
+            if step is None:
+                break
+
+            totals["cells"] += step["cells"]
+            totals["blocks"] += step["blocks"]
+            if step["purged"]:
+                totals["tables"] += 1
+                logger.info(
+                    "Purged deleted table", extra={"extra_fields": {"table_id": step["table_id"]}}
+                )
+            if on_progress is not None:
+                on_progress({**totals, "table_id": step["table_id"]})
+
+            await asyncio.sleep(self.delay)
+
+        return totals
@@ -0,0 +1,167 @@
+"""Server-side filtering, sorting and pagination of table rows."""
+
+from datetime import date, datetime
+from typing import Any
+
+from app.core.config import settings
+from app.core.database import get_supabase_client
+from app.core.db_scheduler import DBLane, run_query
+from app.models.table import ColumnFormat, QueryFilter, QueryOperator, QuerySort, TableQuery
+
+# Operators allowed per column format, mapped to the SQL operator of query_table_rows
+_SQL_OPERATORS: dict[ColumnFormat, dict[QueryOperator, str]] = {
+    ColumnFormat.TEXT: {
+        QueryOperator.EQ: "eq",
+        QueryOperator.CONTAINS: "ilike",
+        QueryOperator.PREFIX: "like",
+    },
+    ColumnFormat.DATE: {
+        QueryOperator.EQ: "date_eq",
+        QueryOperator.CONTAINS: "ilike",
+        QueryOperator.PREFIX: "like",
+        QueryOperator.BEFORE: "date_lt",
+        QueryOperator.AFTER: "date_gt",
+    },
+    ColumnFormat.TIMERANGE: {
+        QueryOperator.EQ: "eq",
+        QueryOperator.CONTAINS: "ilike",
+        QueryOperator.PREFIX: "like",
+        QueryOperator.BEFORE: "range_before",
+        QueryOperator.AFTER: "range_after",
+        QueryOperator.OVERLAPS: "range_overlaps",
+        QueryOperator.INCLUDES: "range_contains",
+    },
+}
+
+
+def _escape_like(value: str) -> str:
+    """Escape LIKE wildcards so the value matches literally."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _parse_instant(value: str) -> str:
+    """Validate an ISO timestamp and return it normalized."""
+    try:
+        return datetime.fromisoformat(value).isoformat()
+    except ValueError:
+        raise ValueError(f"Invalid timestamp '{value}', expected ISO 8601")
+
+
+class QueryService:
+    """Service for querying table rows by column predicates."""
+
+    def __init__(self):
+        self.supabase = get_supabase_client()
+
+    @staticmethod
+    def parse_filter(raw: str) -> QueryFilter:
+        """Parse a ``col:op:value`` filter; the value may itself contain colons."""
+        parts = raw.split(":", 2)
+        if len(parts) != 3:
+            raise ValueError(f"Invalid filter '{raw}', expected 'col:op:value'")
+        col, op, value = parts
+        try:
+            return QueryFilter(col=int(col), op=QueryOperator(op), value=value)
+        except ValueError:
+            raise ValueError(f"Invalid filter '{raw}', expected 'col:op:value'")
+
+    @staticmethod
+    def parse_sort(raw: str) -> QuerySort:
+        """Parse a ``col`` or ``-col`` sort key."""
+        try:
+            return QuerySort(col=int(raw.removeprefix("-")), desc=raw.startswith("-"))
+        except ValueError:
+            raise ValueError(f"Invalid sort key '{raw}', expected 'col' or '-col'")
+
+    @staticmethod
+    def build_sql_filter(query_filter: QueryFilter, column_format: ColumnFormat) -> dict[str, Any]:
+        """Translate a filter into the operator and literal used by ``query_table_rows``."""
+        sql_op = _SQL_OPERATORS[column_format].get(query_filter.op)
+        if sql_op is None:
+            raise ValueError(
+                f"Operator '{query_filter.op}' is not supported for {column_format.value} column "
+                f"{query_filter.col}"
+            )
+
+        value = query_filter.value
+        if sql_op == "ilike":
+            value = f"%{_escape_like(value)}%"
+        elif sql_op == "like":
+            value = f"{_escape_like(value)}%"
+        elif sql_op.startswith("date_"):
+            try:
+                value = date.fromisoformat(value[:10]).isoformat()
+            except ValueError:
+                raise ValueError(f"Invalid date '{query_filter.value}', expected YYYY-MM-DD")
+        elif sql_op == "range_overlaps":
+            start, _, end = value.partition("|")
+            if not end:
+                raise ValueError(f"Invalid time range '{value}', expected 'start|end'")
+            value = f"[{_parse_instant(start)},{_parse_instant(end)})"
+        elif sql_op.startswith("range_"):
+            value = _parse_instant(value)
+
+        return {"col": query_filter.col, "op": sql_op, "value": value}
+
+    async def _column_formats(self, table_id: str) -> dict[int, ColumnFormat]:
+        """Get the format of each column by index."""
+        result = await run_query(
+            self.supabase.table("columns").select("idx, format").eq("table_id", table_id),
+            DBLane.READ,
+        )
+        return {col["idx"]: ColumnFormat(col.get("format", "text")) for col in result.data}
+
+    async def query_rows(self, table: dict[str, Any], query: TableQuery) -> dict[str, Any]:
+        """Get one page of rows matching all filters, with their cells.
+
+        Filters and sort keys are validated against the column formats here and
+        evaluated by the ``query_table_rows`` database function, so only the
+        requested rows leave the database.
+        """
+        if len(query.filters) + len(query.sort) > settings.query_max_predicates:
+            raise ValueError(
+                f"Queries are limited to {settings.query_max_predicates} filters and sort keys"
+            )
+
+        formats = await self._column_formats(table["id"])
+        for col in [f.col for f in query.filters] + [s.col for s in query.sort]:
+            if col not in formats:
+                raise ValueError(f"Column {col} does not exist")
+
+        sql_filters = [self.build_sql_filter(f, formats[f.col]) for f in query.filters]
+        sql_sort = [
+            {"col": s.col, "format": formats[s.col].value, "desc": s.desc} for s in query.sort
+        ]
+
+        result = await run_query(
+            self.supabase.rpc(
+                "query_table_rows",
+                {
+                    "p_table_id": table["id"],
+                    "p_filters": sql_filters,
+                    "p_sort": sql_sort,
+                    "p_limit": query.limit,
+                    "p_offset": query.offset,
+                },
+            ),
+            DBLane.READ,
+        )
+        return result.data
+
+    async def find_overlaps(self, table: dict[str, Any], col: int, limit: int) -> dict[str, Any]:
+        """Get pairs of rows whose time ranges in ``col`` overlap.
+
+        Per-cell tables probe the GiST index on the typed ``value_range``
+        column, so booking-style conflict checks do not parse cell text.
+        """
+        formats = await self._column_formats(table["id"])
+        if formats.get(col) != ColumnFormat.TIMERANGE:
+            raise ValueError(f"Column {col} is not a timerange column")
+
+        result = await run_query(
+            self.supabase.rpc(
+                "find_overlapping_rows", {"p_table_id": table["id"], "p_col": col, "p_limit": limit}
+            ),
+            DBLane.READ,
+        )
+        return {"col": col, "pairs": result.data}
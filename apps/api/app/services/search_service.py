@@ -0,0 +1,59 @@
+"""Cross-table full-text search for operators."""
+
+from typing import Any
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.database import get_supabase_client
+from app.core.db_scheduler import DBLane, run_query
+from app.core.logging import request_id_context
+
+# Postgres error raised when a query is cancelled for exceeding its time budget
+QUERY_CANCELED = "57014"
+
+
+class SearchService:
+    """Service for searching cell values, titles and descriptions across tables."""
+
+    def __init__(self):
+        self.supabase = get_supabase_client()
+
+    async def search(self, query: str, limit: int, offset: int) -> dict[str, Any]:
+        """Get one page of live tables matching ``query``, best ranked first.
+
+        Archived tables are included: their cells are searched in the
+        ``table_archives`` document without restoring the table.
+
+        ``query`` uses web search syntax (quoted phrases, ``or``, ``-term``).
+        The ``search_tables`` database function runs only on the full-text
+        indexes and within ``settings.search_timeout``; a timed-out search is
+        reported as 504 so the operator can narrow the query.
+        """
+        # Loaded with the Supabase client, not at import time
+        from postgrest.exceptions import APIError
+
+        try:
+            result = await run_query(
+                self.supabase.rpc(
+                    "search_tables",
+                    {
+                        "p_query": query,
+                        "p_limit": limit,
+                        "p_offset": offset,
+                        "p_timeout_ms": int(settings.search_timeout * 1000),
+                    },
+                ),
+                DBLane.READ,
+            )
+        except APIError as e:
+            if e.code == QUERY_CANCELED:
+                raise HTTPException(
+                    status_code=504,
+                    detail={
+                        "error": "Search exceeded its time budget, narrow the query",
+                        "request_id": request_id_context.get(""),
+                    },
+                )
+            raise
+        return result.data
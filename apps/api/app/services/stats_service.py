@@ -0,0 +1,171 @@
+"""Per-column table stats backed by incrementally maintained aggregates."""
+
+import asyncio
+import contextlib
+import logging
+from typing import Any
+
+from app.core.config import settings
+from app.core.database import get_supabase_client
+from app.core.db_scheduler import DBLane, run_query
+from app.models.table import ColumnFormat
+
+logger = logging.getLogger("api.stats")
+
+
+class StatsService:
+    """Service for reading and rebuilding column stats.
+
+    Triggers on ``cells`` and ``cell_blocks`` fold every write, truncation and
+    migration into ``column_stats``, ``column_value_counts`` and
+    ``column_date_counts``, so reading stats costs one row per column (plus one
+    per occupied date) regardless of the number of cells.
+    """
+
+    def __init__(self):
+        self.supabase = get_supabase_client()
+
+    async def get_stats(self, table: dict[str, Any]) -> dict[str, Any]:
+        """Get aggregates for every column of a table."""
+        table_id = table["id"]
+        columns, stats, dates, rebuilt = await asyncio.gather(
+            run_query(
+                self.supabase.table("columns")
+                .select("idx, format")
+                .eq("table_id", table_id)
+                .order("idx"),
+                DBLane.READ,
+            ),
+            run_query(
+                self.supabase.table("column_stats")
+                .select("c, non_empty, distinct_values")
+                .eq("table_id", table_id),
+                DBLane.READ,
+            ),
+            run_query(
+                self.supabase.table("column_date_counts")
+                .select("c, day, count")
+                .eq("table_id", table_id)
+                .gt("count", 0)
+                .order("c")
+                .order("day"),
+                DBLane.READ,
+            ),
+            run_query(
+                self.supabase.table("table_stats").select("rebuilt_at").eq("table_id", table_id),
+                DBLane.READ,
+            ),
+        )
+
+        stats_by_col = {row["c"]: row for row in stats.data}
+        dates_by_col: dict[int, list[dict[str, Any]]] = {}
+        for row in dates.data:
+            dates_by_col.setdefault(row["c"], []).append(
+                {"date": row["day"], "count": row["count"]}
+            )
+
+        column_stats = []
+        for column in columns.data:
+            col = column["idx"]
+            column_format = ColumnFormat(column.get("format", "text"))
+            # Counts can dip below zero for tables written before stats existed,
+            # until their first rebuild
+            non_empty = max(0, stats_by_col.get(col, {}).get("non_empty", 0))
+            entry = {
+                "col": col,
+                "format": column_format,
+                "non_empty": non_empty,
+                "empty": max(0, table["rows"] - non_empty),
+                "distinct": max(0, stats_by_col.get(col, {}).get("distinct_values", 0)),
+            }
+            if column_format == ColumnFormat.DATE:
+                col_dates = dates_by_col.get(col, [])
+                entry["dates"] = col_dates
+                if col_dates:
+                    entry["min_date"] = col_dates[0]["date"]
+                    entry["max_date"] = col_dates[-1]["date"]
+            column_stats.append(entry)
+
+        return {
+            "rows": table["rows"],
+            "cols": table["cols"],
+            "columns": column_stats,
+            "rebuilt_at": rebuilt.data[0]["rebuilt_at"] if rebuilt.data else None,
+        }
+
+    async def rebuild(self, table: dict[str, Any]) -> dict[str, Any]:
+        """Recompute a table's stats from its cells."""
+        await run_query(
+            self.supabase.rpc("rebuild_table_stats", {"p_table_id": table["id"]}), DBLane.ADMIN
+        )
+        return {"success": True, "message": "Stats rebuilt"}
+
+    async def rebuild_stale(self, limit: int) -> int:
+        """Rebuild up to ``limit`` tables whose stats drifted or are overdue.
+
+        Each table is rebuilt by its own call, so a rebuild locks one table row
+        at a time and a failure leaves the tables already rebuilt in place.
+        """
+        result = await run_query(
+            self.supabase.rpc(
+                "stale_table_stats",
+                {"p_max_age": f"{settings.stats_rebuild_max_age} seconds", "p_limit": limit},
+            ),
+            DBLane.ADMIN,
+        )
+        table_ids = result.data or []
+        for table_id in table_ids:
+            await run_query(
+                self.supabase.rpc("rebuild_table_stats", {"p_table_id": table_id}), DBLane.ADMIN
+            )
+        return len(table_ids)
+
+
+class StatsRebuilder:
+    """Periodically rebuild stats of tables with drift or an overdue rebuild.
+
+    Incremental maintenance keeps stats exact in normal operation; the rebuild
+    covers tables written before stats existed and anything an aborted or
+    out-of-band change left inconsistent. A table is rebuilt when its counts
+    went negative, or when it changed since a rebuild older than
+    ``STATS_REBUILD_MAX_AGE``, so an active table is re-aggregated at most
+    once per max age rather than every interval.
+    """
+
+    def __init__(self, interval: float, batch_size: int):
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        """Start the rebuild loop on the running event loop, unless disabled."""
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run(), name="stats-rebuilder")
+
+    async def stop(self) -> None:
+        """Cancel the rebuild loop."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _run(self) -> None:
+        """Rebuild one batch per interval, continuing at once while batches are full."""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                rebuilt = self.batch_size
+                while rebuilt >= self.batch_size:
+                    rebuilt = await StatsService().rebuild_stale(self.batch_size)
+                    if rebuilt:
+                        logger.info(
+                            "Rebuilt table stats", extra={"extra_fields": {"tables": rebuilt}}
+                        )
+            except Exception as e:
+                logger.error("Stats rebuild failed", exc_info=e)
+
+
+stats_rebuilder = StatsRebuilder(
+    interval=settings.stats_rebuild_interval, batch_size=settings.stats_rebuild_batch
+)
@@ -1,5 +1,7 @@
 """Table business logic service."""
 
+import asyncio
+from collections.abc import AsyncIterator, Iterator
 from typing import TYPE_CHECKING, Any, Optional
 
 if TYPE_CHECKING:
@@ -7,21 +9,31 @@ if TYPE_CHECKING:
 
 from app.core.config import settings
 from app.core.database import get_supabase_client
+from app.core.db_scheduler import DBLane, run_query
 from app.core.security import generate_slug, generate_token, hash_token
+from app.core.serialization import encode_cells_payload, encode_table_payload
 from app.models.table import (
     AddColumnRequest,
     AddRowRequest,
     CellData,
     CellUpdateRequest,
+    CellWindow,
+    CloneTableRequest,
     ColumnFormat,
     CreateTableRequest,
     CreateTableResponse,
     RemoveColumnRequest,
     RemoveRowRequest,
+    StorageMode,
     TableColumn,
     TableConfigRequest,
     TableResponse,
 )
+from app.services.cell_store import BlockCellStore, RowCellStore, fetch_all
+from app.services.config_service import get_table_templates
+
+# Cell capacity (rows x cols) of the tables a batch-get loads together while streaming
+BATCH_GET_CHUNK_CELLS = 50_000
 
 
 class TableService:
@@ -32,11 +44,30 @@ class TableService:
 
         self.supabase = get_supabase_client()
         self.config_service = config_service or ConfigService()
+        self.cell_stores = {
+            StorageMode.CELLS: RowCellStore(self.supabase),
+            StorageMode.BLOCKS: BlockCellStore(self.supabase),
+        }
 
-    async def create_table(
-        self, request: CreateTableRequest, locale: str = "en"
-    ) -> CreateTableResponse:
-        """Create a new table with tokens."""
+    def cell_store(self, table: dict[str, Any]) -> RowCellStore | BlockCellStore:
+        """Get the cell store for a table row."""
+        return self.cell_stores[StorageMode(table.get("storage_mode", "cells"))]  # Handle migration
+
+    @staticmethod
+    def row_limit(storage_mode: str) -> int:
+        """Row limit for a storage mode."""
+        if storage_mode == StorageMode.BLOCKS:
+            return settings.block_table_row_limit
+        return settings.table_row_limit
+
+    async def _prepare_table(
+        self, request: CreateTableRequest, locale: str
+    ) -> tuple[dict[str, Any], list[dict[str, Any]], CreateTableResponse]:
+        """Validate a create request and build its table row, columns and tokens.
+
+        Returns the ``create_table_with_columns`` arguments and the response to
+        send once they are stored; nothing touches the database here.
+        """
         # Use config defaults if values not provided
         if request.cols is None:
             request.cols = await self.config_service.get_default_table_cols()
@@ -44,10 +75,11 @@ class TableService:
             request.rows = await self.config_service.get_default_table_rows()
 
         # Validate limits upfront
+        row_limit = self.row_limit(request.storage_mode)
         if request.cols > settings.table_col_limit:
             raise ValueError(f"Columns cannot exceed {settings.table_col_limit}")
-        if request.rows > settings.table_row_limit:
-            raise ValueError(f"Rows cannot exceed {settings.table_row_limit}")
+        if request.rows > row_limit:
+            raise ValueError(f"Rows cannot exceed {row_limit}")
         if request.cols < 1:
             raise ValueError("Columns must be at least 1")
         if request.rows < 1:
@@ -59,10 +91,6 @@ class TableService:
         edit_token = generate_token()
 
         # Hash tokens for storage
-        admin_token_hash = hash_token(admin_token)
-        edit_token_hash = hash_token(edit_token)
-
-        # Create table in Supabase
         table_data = {
             "slug": slug,
             "title": request.title,
@@ -70,69 +98,118 @@ class TableService:
             "cols": request.cols,
             "rows": request.rows,
             "fixed_rows": False,  # Default to auto rows
-            "admin_token_hash": admin_token_hash,
-            "edit_token_hash": edit_token_hash,
+            "storage_mode": request.storage_mode.value,
+            "admin_token_hash": hash_token(admin_token),
+            "edit_token_hash": hash_token(edit_token),
         }
+        columns_data = get_table_templates().columns(locale, request.cols)
+        response = CreateTableResponse(slug=slug, admin_token=admin_token, edit_token=edit_token)
+        return table_data, columns_data, response
 
+    async def create_table(
+        self, request: CreateTableRequest, locale: str = "en"
+    ) -> CreateTableResponse:
+        """Create a new table with tokens."""
+        table_data, columns_data, response = await self._prepare_table(request, locale)
+
+        # Create the table and its default columns in one transaction
         try:
-            table_result = self.supabase.table("tables").insert(table_data).execute()
-            if not table_result.data:
-                raise Exception("Failed to create table - no data returned")
-            table_id = table_result.data[0]["id"]
+            await run_query(
+                self.supabase.rpc(
+                    "create_table_with_columns", {"p_table": table_data, "p_columns": columns_data}
+                ),
+                DBLane.ADMIN,
+            )
         except Exception as e:
             print(f"Database error creating table: {e}")
             print(f"Table data: {table_data}")
             raise
 
-        # Create default columns using configuration
-        try:
-            default_columns = await self.config_service.get_default_column_config(locale)
-        except Exception as e:
-            print(f"Warning: Failed to load column config, using fallbacks: {e}")
-            default_columns = []
-
-        columns_data = []
-        for i in range(request.cols):
-            # Use config if available for this column index
-            if i < len(default_columns):
-                config_col = default_columns[i]
-                column_data = {
-                    "table_id": table_id,
-                    "idx": i,
-                    "header": config_col.get("header", f"Column {i + 1}"),
-                    "width": None,
-                    "format": config_col.get("format", "text"),
-                }
-            else:
-                # Fallback for columns beyond configured defaults
-                column_data = {
-                    "table_id": table_id,
-                    "idx": i,
-                    "header": f"Column {i + 1}",
-                    "width": None,
-                    "format": "text",
-                }
-            columns_data.append(column_data)
+        return response
 
-        self.supabase.table("columns").insert(columns_data).execute()
+    async def create_tables(
+        self, requests: list[CreateTableRequest], locale: str = "en"
+    ) -> list[CreateTableResponse]:
+        """Create several tables in one transaction; either all are created or none."""
+        if not 1 <= len(requests) <= settings.table_batch_limit:
+            raise ValueError(f"Batches must contain 1 to {settings.table_batch_limit} tables")
 
+        prepared = [await self._prepare_table(request, locale) for request in requests]
+
+        await run_query(
+            self.supabase.rpc(
+                "create_tables_with_columns",
+                {
+                    "p_tables": [
+                        {"table": table_data, "columns": columns_data}
+                        for table_data, columns_data, _ in prepared
+                    ]
+                },
+            ),
+            DBLane.ADMIN,
+        )
+        return [response for _, _, response in prepared]
+
+    async def clone_table(
+        self, table: dict[str, Any], request: CloneTableRequest
+    ) -> CreateTableResponse:
+        """Copy a table's settings, columns and optionally cells into a new table.
+
+        The copy runs as set-based ``INSERT ... SELECT`` statements in the
+        ``clone_table`` database function, so no cell data passes through the API.
+        """
+        slug = generate_slug()
+        admin_token = generate_token()
+        edit_token = generate_token()
+
+        await run_query(
+            self.supabase.rpc(
+                "clone_table",
+                {
+                    "p_source_id": table["id"],
+                    "p_table": {
+                        "slug": slug,
+                        "title": request.title,
+                        "description": request.description,
+                        "admin_token_hash": hash_token(admin_token),
+                        "edit_token_hash": hash_token(edit_token),
+                    },
+                    "p_include_cells": request.include_cells,
+                },
+            ),
+            DBLane.ADMIN,
+        )
         return CreateTableResponse(slug=slug, admin_token=admin_token, edit_token=edit_token)
 
-    async def get_table_with_columns(self, table_id: str) -> dict[str, Any]:
-        """Get table data with columns."""
+    async def get_table_with_columns(
+        self, table_id: str, window: CellWindow | None = None
+    ) -> dict[str, Any]:
+        """Get table data with columns, optionally limited to a cell window."""
         # Get table
-        table_result = self.supabase.table("tables").select("*").eq("id", table_id).execute()
+        table_result = await run_query(
+            self.supabase.table("tables").select("*").eq("id", table_id), DBLane.READ
+        )
         table = table_result.data[0]
 
         # Get columns
-        columns_result = (
-            self.supabase.table("columns")
-            .select("*")
-            .eq("table_id", table_id)
-            .order("idx")
-            .execute()
+        columns_result = await run_query(
+            self.supabase.table("columns").select("*").eq("table_id", table_id).order("idx"),
+            DBLane.READ,
         )
 
+        # Get cells data
+        cells = await self.cell_store(table).fetch(table_id, window)
+
+        return self.build_table_response(table, columns_result.data, cells)
+
+    @staticmethod
+    def build_table_response(
+        table: dict[str, Any], columns: list[dict[str, Any]], cells: list[dict[str, Any]]
+    ) -> TableResponse:
+        """Build the validated response model from raw table and column rows.
+
+        ``cells`` are ``row``/``col``/``value`` dicts as returned by the cell stores.
+        """
         columns_data = [
             TableColumn(
                 idx=col["idx"],
@@ -140,17 +217,11 @@ class TableService:
                 width=col["width"],
                 format=ColumnFormat(col.get("format", "text")),  # Handle migration
             )
-            for col in columns_result.data
+            for col in columns
         ]
 
-        # Get cells data
-        cells_result = (
-            self.supabase.table("cells").select("r, c, value").eq("table_id", table_id).execute()
-        )
-
         cells_data = [
-            CellData(row=cell["r"], col=cell["c"], value=cell["value"])
-            for cell in cells_result.data
+            CellData(row=cell["row"], col=cell["col"], value=cell["value"]) for cell in cells
         ]
 
         return TableResponse(
@@ -165,65 +236,165 @@ class TableService:
             cells=cells_data,
         )
 
-    async def update_cells(self, table_id: str, cells: list[CellUpdateRequest]) -> None:
-        """Batch update cells in a table."""
-        for cell in cells:
-            # Upsert cell data
-            cell_data = {
-                "table_id": table_id,
-                "r": cell.row,
-                "c": cell.col,
-                "value": cell.value,
-            }
+    async def get_table_payload(
+        self, table: dict[str, Any], window: CellWindow | None = None
+    ) -> bytes:
+        """Get table data as pre-encoded JSON, skipping per-cell models.
 
-            # Try to update existing cell first
-            existing = (
-                self.supabase.table("cells")
-                .select("id")
-                .eq("table_id", table_id)
-                .eq("r", cell.row)
-                .eq("c", cell.col)
-                .execute()
+        ``table`` is the row already loaded by ``verify_token``, so only columns
+        and cells are queried. PostgREST renames the columns to the response
+        field names, which lets the rows go to the encoder unchanged.
+        """
+        columns_result = await run_query(
+            self.supabase.table("columns")
+            .select("idx, header, width, format")
+            .eq("table_id", table["id"])
+            .order("idx"),
+            DBLane.READ,
+        )
+
+        cells = await self.cell_store(table).fetch(table["id"], window)
+
+        return encode_table_payload(table, columns_result.data, cells)
+
+    @staticmethod
+    def _batch_chunks(tables: list[dict[str, Any]]) -> Iterator[list[dict[str, Any]]]:
+        """Split tables, in order, into runs of at most ``BATCH_GET_CHUNK_CELLS`` capacity.
+
+        A table larger than the budget is a chunk of its own.
+        """
+        chunk: list[dict[str, Any]] = []
+        capacity = 0
+        for table in tables:
+            size = table["rows"] * table["cols"]
+            if chunk and capacity + size > BATCH_GET_CHUNK_CELLS:
+                yield chunk
+                chunk, capacity = [], 0
+            chunk.append(table)
+            capacity += size
+        if chunk:
+            yield chunk
+
+    async def iter_tables_payloads(
+        self, tables: list[dict[str, Any]]
+    ) -> AsyncIterator[tuple[str, bytes]]:
+        """Fetch and encode verified tables in order, yielding ``(table_id, payload)``.
+
+        Tables are loaded a chunk at a time (see ``_batch_chunks``) with
+        set-based queries and encoded one by one, so a streamed response holds
+        one chunk in memory and sends its first table before later ones are read.
+        """
+        for chunk in self._batch_chunks(tables):
+            columns, cells = await self._load_tables(chunk)
+            for table in chunk:
+                table_id = table["id"]
+                yield (
+                    table_id,
+                    encode_table_payload(table, columns.pop(table_id), cells.pop(table_id)),
+                )
+
+    async def _load_tables(
+        self, tables: list[dict[str, Any]]
+    ) -> tuple[dict[str, list[dict[str, Any]]], dict[str, list[dict[str, Any]]]]:
+        """Get the columns and cells of several tables, each keyed by table ID.
+
+        Columns come from one paged query for all tables and cells from one
+        paged query per storage mode, so the round trips grow with the data
+        read, not with the number of tables.
+        """
+        table_ids = [table["id"] for table in tables]
+        by_mode: dict[StorageMode, list[str]] = {}
+        for table in tables:
+            by_mode.setdefault(StorageMode(table.get("storage_mode", "cells")), []).append(
+                table["id"]
             )
 
-            if existing.data:
-                # Update existing cell
-                self.supabase.table("cells").update({"value": cell.value}).eq(
-                    "id", existing.data[0]["id"]
-                ).execute()
-            else:
-                # Insert new cell
-                self.supabase.table("cells").insert(cell_data).execute()
-
-    async def get_cells(self, table_id: str) -> list[dict[str, Any]]:
-        """Get all cell data for a table."""
-        result = (
-            self.supabase.table("cells").select("r, c, value").eq("table_id", table_id).execute()
+        column_rows, *cell_maps = await asyncio.gather(
+            fetch_all(
+                lambda: (
+                    self.supabase.table("columns")
+                    .select("table_id, idx, header, width, format")
+                    .in_("table_id", table_ids)
+                    .order("table_id")
+                    .order("idx")
+                )
+            ),
+            *(self.cell_stores[mode].fetch_many(ids) for mode, ids in by_mode.items()),
         )
 
-        return [
-            {"row": cell["r"], "col": cell["c"], "value": cell["value"]} for cell in result.data
-        ]
+        columns: dict[str, list[dict[str, Any]]] = {table_id: [] for table_id in table_ids}
+        for column in column_rows:
+            columns[column.pop("table_id")].append(column)
+        cells = {
+            table_id: mode_cells
+            for cell_map in cell_maps
+            for table_id, mode_cells in cell_map.items()
+        }
+        return columns, cells
+
+    async def update_cells(self, table: dict[str, Any], cells: list[CellUpdateRequest]) -> None:
+        """Batch update cells in a table."""
+        await self.cell_store(table).write(table["id"], cells)
+
+    @staticmethod
+    def parse_cell_cursor(cursor: str) -> tuple[int, int]:
+        """Parse a ``row:col`` keyset cursor."""
+        try:
+            row, col = (int(part) for part in cursor.split(":"))
+        except ValueError:
+            raise ValueError(f"Invalid cursor '{cursor}', expected 'row:col'")
+        return row, col
+
+    async def get_cells(
+        self, table: dict[str, Any], window: CellWindow | None = None
+    ) -> list[dict[str, Any]]:
+        """Get cell data for a table, optionally limited to a window."""
+        return await self.cell_store(table).fetch(table["id"], window)
+
+    async def get_cells_payload(
+        self,
+        table: dict[str, Any],
+        window: CellWindow | None = None,
+        after: str | None = None,
+        limit: int | None = None,
+    ) -> bytes:
+        """Get cell data as pre-encoded JSON, optionally windowed and paginated.
+
+        Pages use keyset pagination over ``(row, col)``: ``after`` is the
+        ``next_cursor`` of the previous page, so each page is an index range
+        scan instead of an ever-growing offset.
+        """
+        store = self.cell_store(table)
+        if limit is None:
+            return encode_cells_payload(await store.fetch(table["id"], window))
+
+        cursor = self.parse_cell_cursor(after) if after is not None else None
+        cells = await store.fetch_page(table["id"], window, cursor, limit)
+        next_cursor = f"{cells[-1]['row']}:{cells[-1]['col']}" if len(cells) == limit else None
+        return encode_cells_payload(cells, next_cursor, paginated=True)
 
     async def update_table_config(
-        self, table_id: str, config: TableConfigRequest
+        self, table: dict[str, Any], config: TableConfigRequest
     ) -> dict[str, Any]:
         """Update table configuration (admin only)."""
+        table_id = table["id"]
+        row_limit = self.row_limit(table.get("storage_mode", "cells"))
+
         # Validate limits
         errors = []
 
         if config.rows is not None:
             if config.rows < 1:
                 errors.append("Rows must be at least 1")
-            elif config.rows > settings.table_row_limit:
-                errors.append(f"Rows cannot exceed {settings.table_row_limit}")
+            elif config.rows > row_limit:
+                errors.append(f"Rows cannot exceed {row_limit}")
 
         if errors:
             return {
                 "success": False,
                 "message": "; ".join(errors),
                 "limits": {
-                    "max_rows": settings.table_row_limit,
+                    "max_rows": row_limit,
                     "max_cols": settings.table_col_limit,
                 },
             }
@@ -240,7 +411,9 @@ class TableService:
             update_data["fixed_rows"] = config.fixed_rows
 
         if update_data:
-            self.supabase.table("tables").update(update_data).eq("id", table_id).execute()
+            await run_query(
+                self.supabase.table("tables").update(update_data).eq("id", table_id), DBLane.ADMIN
+            )
 
         # Update column configurations
         if config.columns:
@@ -254,21 +427,28 @@ class TableService:
                     col_data["format"] = col_update.format.value
 
                 if col_data:
-                    self.supabase.table("columns").update(col_data).eq("table_id", table_id).eq(
-                        "idx", col_update.idx
-                    ).execute()
+                    await run_query(
+                        self.supabase.table("columns")
+                        .update(col_data)
+                        .eq("table_id", table_id)
+                        .eq("idx", col_update.idx),
+                        DBLane.ADMIN,
+                    )
 
         return {
             "success": True,
             "message": "Configuration updated successfully",
-            "limits": {"max_rows": settings.table_row_limit, "max_cols": settings.table_col_limit},
+            "limits": {"max_rows": row_limit, "max_cols": settings.table_col_limit},
         }
 
     async def add_rows(self, table_id: str, request: AddRowRequest) -> dict[str, Any]:
         """Add rows to a table."""
         # Get current table data
-        table_result = (
-            self.supabase.table("tables").select("rows, fixed_rows").eq("id", table_id).execute()
+        table_result = await run_query(
+            self.supabase.table("tables")
+            .select("rows, fixed_rows, storage_mode")
+            .eq("id", table_id),
+            DBLane.ADMIN,
         )
         if not table_result.data:
             return {"success": False, "message": "Table not found", "new_rows": None}
@@ -287,23 +467,28 @@ class TableService:
         new_rows = current_rows + request.count
 
         # Check limits
-        if new_rows > settings.table_row_limit:
+        row_limit = self.row_limit(table.get("storage_mode", "cells"))
+        if new_rows > row_limit:
             return {
                 "success": False,
-                "message": f"Cannot add {request.count} rows. Would exceed limit of {settings.table_row_limit}",
+                "message": f"Cannot add {request.count} rows. Would exceed limit of {row_limit}",
                 "new_rows": current_rows,
             }
 
         # Update table row count
-        self.supabase.table("tables").update({"rows": new_rows}).eq("id", table_id).execute()
+        await run_query(
+            self.supabase.table("tables").update({"rows": new_rows}).eq("id", table_id),
+            DBLane.ADMIN,
+        )
 
         return {"success": True, "message": f"Added {request.count} rows", "new_rows": new_rows}
 
     async def remove_rows(self, table_id: str, request: RemoveRowRequest) -> dict[str, Any]:
         """Remove rows from a table."""
         # Get current table data
-        table_result = (
-            self.supabase.table("tables").select("rows, fixed_rows").eq("id", table_id).execute()
+        table_result = await run_query(
+            self.supabase.table("tables").select("rows, fixed_rows").eq("id", table_id),
+            DBLane.ADMIN,
         )
         if not table_result.data:
             return {"success": False, "message": "Table not found", "new_rows": None}
@@ -329,18 +514,22 @@ class TableService:
                 "new_rows": current_rows,
             }
 
-        # Remove cells from deleted rows
-        self.supabase.table("cells").delete().eq("table_id", table_id).gte("r", new_rows).execute()
-
-        # Update table row count
-        self.supabase.table("tables").update({"rows": new_rows}).eq("id", table_id).execute()
+        # Remove cells from deleted rows and update the row count in one transaction
+        await run_query(
+            self.supabase.rpc(
+                "remove_table_rows", {"p_table_id": table_id, "p_row_count": new_rows}
+            ),
+            DBLane.ADMIN,
+        )
 
         return {"success": True, "message": f"Removed {request.count} rows", "new_rows": new_rows}
 
     async def add_columns(self, table_id: str, request: AddColumnRequest) -> dict[str, Any]:
         """Add columns to a table."""
         # Get current table data
-        table_result = self.supabase.table("tables").select("cols").eq("id", table_id).execute()
+        table_result = await run_query(
+            self.supabase.table("tables").select("cols").eq("id", table_id), DBLane.ADMIN
+        )
         if not table_result.data:
             return {"success": False, "message": "Table not found", "new_cols": None}
 
@@ -361,7 +550,6 @@ class TableService:
             header = request.header if request.header and i == current_cols else f"Column {i + 1}"
             new_columns.append(
                 {
-                    "table_id": table_id,
                     "idx": i,
                     "header": header,
                     "width": None,
@@ -369,21 +557,28 @@ class TableService:
                 }
             )
 
-        self.supabase.table("columns").insert(new_columns).execute()
-
-        # Update table column count
-        self.supabase.table("tables").update({"cols": new_cols}).eq("id", table_id).execute()
+        # Insert the columns and update the column count in one transaction
+        await run_query(
+            self.supabase.rpc(
+                "add_table_columns", {"p_table_id": table_id, "p_columns": new_columns}
+            ),
+            DBLane.ADMIN,
+        )
 
         return {"success": True, "message": f"Added {request.count} columns", "new_cols": new_cols}
 
     async def remove_columns(self, table_id: str, request: RemoveColumnRequest) -> dict[str, Any]:
         """Remove columns from a table."""
         # Get current table data
-        table_result = self.supabase.table("tables").select("cols").eq("id", table_id).execute()
+        table_result = await run_query(
+            self.supabase.table("tables").select("cols").eq("id", table_id),
+            DBLane.ADMIN,
+        )
         if not table_result.data:
             return {"success": False, "message": "Table not found", "new_cols": None}
 
-        current_cols = table_result.data[0]["cols"]
+        table = table_result.data[0]
+        current_cols = table["cols"]
         new_cols = current_cols - request.count
 
         # Check minimum
@@ -394,17 +589,49 @@ class TableService:
                 "new_cols": current_cols,
             }
 
-        # Remove columns and their cells
-        self.supabase.table("columns").delete().eq("table_id", table_id).gte(
-            "idx", new_cols
-        ).execute()
-        self.supabase.table("cells").delete().eq("table_id", table_id).gte("c", new_cols).execute()
-
-        # Update table column count
-        self.supabase.table("tables").update({"cols": new_cols}).eq("id", table_id).execute()
+        # Remove columns and their cells and update the column count in one transaction
+        await run_query(
+            self.supabase.rpc(
+                "remove_table_columns", {"p_table_id": table_id, "p_col_count": new_cols}
+            ),
+            DBLane.ADMIN,
+        )
 
         return {
             "success": True,
             "message": f"Removed {request.count} columns",
             "new_cols": new_cols,
         }
+
+    async def migrate_storage(
+        self, table: dict[str, Any], storage_mode: StorageMode
+    ) -> dict[str, Any]:
+        """Move a table's cells to another storage mode in one transaction."""
+        current_mode = table.get("storage_mode", "cells")
+        if current_mode == storage_mode:
+            return {
+                "success": True,
+                "message": f"Table already uses {storage_mode} storage",
+                "storage_mode": storage_mode,
+            }
+
+        row_limit = self.row_limit(storage_mode)
+        if table["rows"] > row_limit:
+            return {
+                "success": False,
+                "message": f"Cannot migrate {table['rows']} rows. {storage_mode} storage is limited to {row_limit}",
+                "storage_mode": current_mode,
+            }
+
+        function = (
+            "migrate_table_to_blocks"
+            if storage_mode == StorageMode.BLOCKS
+            else "migrate_table_to_cells"
+        )
+        await run_query(self.supabase.rpc(function, {"p_table_id": table["id"]}), DBLane.ADMIN)
+
+        return {
+            "success": True,
+            "message": f"Migrated table to {storage_mode} storage",
+            "storage_mode": storage_mode,
+        }
@@ -0,0 +1,210 @@
+"""Measure cold start of the API and fail when it exceeds a budget.
+
+Every run starts a fresh interpreter on the embedded SQLite backend and times
+the steps a scale-to-zero machine goes through before it can answer its first
+table request:
+
+- import: ``import main`` (settings, routers, Socket.IO server)
+- startup: application lifespan startup
+- first request: first ``GET /api/v1/tables/{slug}`` through the full
+  middleware stack, including opening the database and its schema check
+
+The table is created beforehand in a separate interpreter, so the measured
+process starts with nothing warm. The median total across runs is compared to
+``--max-ms``. Use ``PYTHONPATH`` or a precompiled tree
+(``python -m compileall``) to compare setups. tests/test_cold_start.py runs the
+same measurement in CI.
+
+Measured interpreters run with ``-X importtime``, which splits the import step
+by module: the self time of ``main`` and every ``app.*`` module, and of other
+packages by top-level name (``fastapi``, ``pydantic``, ...). The median import
+time of the API's own modules is compared to ``--max-app-import-ms``, a budget
+far below the total that catches a router or service dragging work into import.
+
+Usage:
+    python benchmarks/cold_start.py [--runs 5] [--max-ms 1500] [--max-app-import-ms 200]
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+API_DIR = Path(__file__).resolve().parent.parent
+STEPS = ("import", "startup", "first_request")
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+\d+ \|( *)(\S+)")
+
+
+def _use_sqlite(db_path: str) -> None:
+    sys.path.insert(0, str(API_DIR))
+    os.environ["DB_BACKEND"] = "sqlite"
+    os.environ["SQLITE_PATH"] = db_path
+
+
+def seed_table() -> None:
+    """Child process: create a table and print its slug and admin token as JSON."""
+    from fastapi.testclient import TestClient
+
+    import main
+
+    with TestClient(main.app) as client:
+        response = client.post(
+            "/api/v1/tables", json={"title": "Cold start", "rows": 50, "cols": 4}
+        )
+        response.raise_for_status()
+        table = response.json()
+        cells = [
+            {"row": row, "col": col, "value": f"{row}:{col}"}
+            for row in range(50)
+            for col in range(4)
+        ]
+        client.post(
+            f"/api/v1/tables/{table['slug']}/cells",
+            json={"cells": cells},
+            headers={"Authorization": f"Bearer {table['admin_token']}"},
+        ).raise_for_status()
+
+    print(json.dumps({"slug": table["slug"], "token": table["admin_token"]}))
+
+
+def measure_once(slug: str, token: str) -> None:
+    """Child process: time each startup step and print them as JSON (ms)."""
+    timings = {}
+    start = time.perf_counter()
+    import main
+
+    timings["import"] = time.perf_counter() - start
+
+    from fastapi.testclient import TestClient
+
+    start = time.perf_counter()
+    with TestClient(main.app) as client:
+        timings["startup"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        response = client.get(
+            f"/api/v1/tables/{slug}", headers={"Authorization": f"Bearer {token}"}
+        )
+        timings["first_request"] = time.perf_counter() - start
+        response.raise_for_status()
+
+    print(json.dumps({step: seconds * 1000 for step, seconds in timings.items()}))
+
+
+def is_app_module(name: str) -> bool:
+    """Whether a module is part of the API itself rather than a dependency."""
+    return name == "main" or name.startswith("app.")
+
+
+def import_split(importtime: str) -> dict[str, float]:
+    """Self time (ms) of ``import main`` by module, from ``-X importtime`` output.
+
+    Only ``main`` and the modules it imported count (the lines right before it
+    and nested deeper); API modules are kept by name, others are summed by
+    top-level package.
+    """
+    lines = [
+        (len(indent), name, int(self_us))
+        for self_us, indent, name in IMPORTTIME_LINE.findall(importtime)
+    ]
+    end = next(i for i in range(len(lines) - 1, -1, -1) if lines[i][1] == "main")
+    start = end
+    while start > 0 and lines[start - 1][0] > lines[end][0]:
+        start -= 1
+
+    split: dict[str, float] = {}
+    for _, name, self_us in lines[start : end + 1]:
+        key = name if is_app_module(name) else name.split(".")[0]
+        split[key] = split.get(key, 0) + self_us / 1000
+    return split
+
+
+def app_import_ms(run: dict) -> float:
+    """Import time spent in the API's own modules during one run."""
+    return sum(ms for name, ms in run["modules"].items() if is_app_module(name))
+
+
+def _child(*args: str, db_path: str, importtime: bool = False) -> dict:
+    flags = ["-X", "importtime"] if importtime else []
+    child = subprocess.run(  # noqa: S603 - runs this script with the current interpreter
+        [sys.executable, *flags, __file__, "--db", db_path, *args],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=API_DIR,
+    )
+    result = json.loads(child.stdout.strip().splitlines()[-1])
+    if importtime:
+        result["modules"] = import_split(child.stderr)
+    return result
+
+
+def measure(runs: int) -> list[dict]:
+    """Cold-start ``runs`` fresh interpreters against one seeded database."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "cold-start.db")
+        table = _child("--seed", db_path=db_path)
+        return [
+            _child(
+                "--slug", table["slug"], "--token", table["token"], db_path=db_path, importtime=True
+            )
+            for _ in range(runs)
+        ]
+
+
+def median_total(runs: list[dict]) -> float:
+    return statistics.median(sum(run[step] for step in STEPS) for run in runs)
+
+
+def median_split(runs: list[dict]) -> dict[str, float]:
+    """Median import time per module across runs, slowest first."""
+    names = {name for run in runs for name in run["modules"]}
+    medians = {
+        name: statistics.median(run["modules"].get(name, 0) for run in runs) for name in names
+    }
+    return dict(sorted(medians.items(), key=lambda item: item[1], reverse=True))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=1500)
+    parser.add_argument("--max-app-import-ms", type=float, default=200)
+    parser.add_argument("--top", type=int, default=15, help="modules shown in the import split")
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    parser.add_argument("--seed", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--slug", help=argparse.SUPPRESS)
+    parser.add_argument("--token", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.db:
+        _use_sqlite(args.db)
+        if args.seed:
+            seed_table()
+        else:
+            measure_once(args.slug, args.token)
+        return 0
+
+    runs = measure(args.runs)
+    for step in STEPS:
+        print(f"{step:<14} {statistics.median(run[step] for run in runs):8.1f} ms")
+    total = median_total(runs)
+    print(f"{'total':<14} {total:8.1f} ms (budget {args.max_ms:.0f} ms, {args.runs} runs)")
+
+    print("\nimport split (self time, median)")
+    for name, ms in list(median_split(runs).items())[: args.top]:
+        print(f"  {name:<28} {ms:8.1f} ms")
+    app_import = statistics.median(app_import_ms(run) for run in runs)
+    print(f"{'app modules':<14} {app_import:8.1f} ms (budget {args.max_app_import_ms:.0f} ms)")
+
+    return 0 if total <= args.max_ms and app_import <= args.max_app_import_ms else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,274 @@
+"""Replay recorded request traces against a local API and report latency distributions.
+
+Traces come from ``TRAFFIC_RECORD_PATH`` (see ``app/core/traffic.py``). Every
+recorded table hash gets its own freshly created local table, so the replay
+keeps the recorded mix of hot and idle tables. Request bodies are synthesized
+from the recorded batch sizes. Requests are sent at their recorded offsets,
+divided by ``--speed``, and compared per route with the recorded durations.
+
+With ``--hermetic`` the replay starts its own API on a throwaway SQLite
+database (``DB_BACKEND=sqlite``) instead of using ``--base-url``, so it runs
+offline and every run starts from the same empty state.
+
+Usage:
+    python benchmarks/replay_traffic.py traffic.jsonl [--base-url http://localhost:8000]
+        [--speed 1] [--limit N] [--concurrency 256] [--job-key KEY] [--hermetic]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+API_DIR = Path(__file__).resolve().parent.parent
+TABLE_ROUTE = "/api/v1/tables/{slug}"
+HERMETIC_PORT = 8765
+
+
+class LocalTable:
+    """A table created for one recorded table hash."""
+
+    def __init__(self, slug: str, token: str, rows: int, cols: int):
+        self.slug = slug
+        self.token = token
+        self.rows = rows
+        self.cols = cols
+
+
+@contextlib.contextmanager
+def hermetic_server() -> Iterator[str]:
+    """Run the API on an empty SQLite database in a temporary directory; yield its URL."""
+    with tempfile.TemporaryDirectory() as data_dir:
+        env = {
+            **os.environ,
+            "DB_BACKEND": "sqlite",
+            "SQLITE_PATH": str(Path(data_dir) / "replay.db"),
+            "ENVIRONMENT": "benchmark",  # INFO logs, localhost allowed as host
+            # Setup creates every recorded table from this one address
+            "RATE_LIMIT_CREATE_BURST": "1000000",
+            "RATE_LIMIT_CREATE_TABLE_BURST": "1000000",
+        }
+        server = subprocess.Popen(  # noqa: S603 - runs uvicorn with the current interpreter
+            [sys.executable, "-m", "uvicorn", "main:socket_app", "--port", str(HERMETIC_PORT)],
+            cwd=API_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        url = f"http://127.0.0.1:{HERMETIC_PORT}"
+        try:
+            for _ in range(100):
+                with contextlib.suppress(httpx.HTTPError):
+                    if httpx.get(f"{url}/livez").status_code == 200:
+                        break
+                time.sleep(0.1)
+            else:
+                raise RuntimeError("Hermetic API did not start")
+            yield url
+        finally:
+            server.terminate()
+            server.wait()
+
+
+def load_traces(path: str, limit: int | None) -> list[dict[str, Any]]:
+    """Read traces ordered by time."""
+    with open(path) as f:
+        traces = [json.loads(line) for line in f if line.strip()]
+    traces.sort(key=lambda trace: trace["t"])
+    return traces[:limit] if limit else traces
+
+
+async def create_tables(
+    client: httpx.AsyncClient, hashes: list[str], concurrency: int
+) -> dict[str, LocalTable]:
+    """Create one local table per recorded table hash."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def create(table_hash: str) -> tuple[str, LocalTable]:
+        async with semaphore:
+            created = (await client.post("/api/v1/tables", json={"title": table_hash})).json()
+            headers = {"Authorization": f"Bearer {created['admin_token']}"}
+            table = (await client.get(f"/api/v1/tables/{created['slug']}", headers=headers)).json()
+        return table_hash, LocalTable(
+            created["slug"], created["admin_token"], table["rows"], table["cols"]
+        )
+
+    return dict(await asyncio.gather(*(create(table_hash) for table_hash in hashes)))
+
+
+def build_body(trace: dict[str, Any], table: LocalTable | None) -> Any:
+    """Synthesize a request body of the recorded shape (placeholder values only)."""
+    route, method, batch = trace["route"], trace["method"], trace.get("batch") or 1
+    if method in ("GET", "HEAD"):
+        return None
+    if route == "/api/v1/tables":
+        return {}
+    if route == "/api/v1/tables/batch":
+        return {"tables": [{} for _ in range(batch)]}
+    if route == TABLE_ROUTE + "/cells" and table is not None:
+        return {
+            "cells": [
+                {"row": (i // table.cols) % table.rows, "col": i % table.cols, "value": f"r{i}"}
+                for i in range(batch)
+            ]
+        }
+    if route in (TABLE_ROUTE + "/rows", TABLE_ROUTE + "/columns"):
+        return {"count": batch}
+    if route == TABLE_ROUTE + "/config":
+        return {"title": "Replay"}
+    if route == TABLE_ROUTE + "/storage":
+        return {"storage_mode": "cells"}
+    if route == TABLE_ROUTE + "/clone":
+        return {"include_cells": True}
+    return None
+
+
+def build_request(
+    trace: dict[str, Any], tables: dict[str, LocalTable], job_key: str | None
+) -> dict[str, Any] | None:
+    """Turn a trace into ``httpx`` request arguments, or None if it cannot be replayed."""
+    route = trace.get("route")
+    if route is None or (route.startswith("/api/v1/admin") and job_key is None):
+        return None
+
+    table = tables.get(trace["table"]) if trace.get("table") else None
+    if "{slug}" in route and table is None:
+        return None
+
+    url = route.replace("{slug}", table.slug if table else "").replace("{col}", "0")
+    url = url.replace("{key}", "app.title")
+    # Only window parameters are recorded with values; the others cannot be replayed
+    params = {name: value for name, value in trace["params"].items() if value is not None}
+    headers = {}
+    if route.startswith("/api/v1/admin"):
+        headers["Authorization"] = f"Bearer {job_key}"
+    elif table is not None:
+        headers["Authorization"] = f"Bearer {table.token}"
+
+    body = build_body(trace, table)
+    if route == "/api/v1/tables/batch-get":
+        batch = list(tables.values())[: trace.get("batch") or 1]
+        body = {"tables": [{"slug": local.slug, "token": local.token} for local in batch]}
+
+    return {
+        "method": trace["method"],
+        "url": url,
+        "params": params,
+        "headers": headers,
+        "json": body,
+    }
+
+
+async def replay(args: argparse.Namespace) -> int:
+    traces = load_traces(args.traces, args.limit)
+    if not traces:
+        print("No traces")
+        return 1
+
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30) as client:
+        hashes = sorted({trace["table"] for trace in traces if trace.get("table")})
+        print(f"Creating {len(hashes)} tables for {len(traces)} requests...")
+        tables = await create_tables(client, hashes, min(args.concurrency, 16))
+
+        latencies: dict[str, list[float]] = defaultdict(list)
+        errors: dict[str, int] = defaultdict(int)
+        lags: list[float] = []
+        skipped = 0
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def send(trace: dict[str, Any], request: dict[str, Any], due: float) -> None:
+            async with semaphore:
+                lags.append(max(0.0, time.perf_counter() - due))
+                start = time.perf_counter()
+                try:
+                    response = await client.request(**request)
+                    failed = response.status_code >= 500 or (
+                        response.status_code >= 400 and trace["status"] < 400
+                    )
+                except httpx.HTTPError:
+                    failed = True
+                key = f"{trace['method']} {trace['route']}"
+                latencies[key].append((time.perf_counter() - start) * 1000)
+                if failed:
+                    errors[key] += 1
+
+        first = traces[0]["t"]
+        started = time.perf_counter()
+        pending = []
+        for trace in traces:
+            request = build_request(trace, tables, args.job_key)
+            if request is None:
+                skipped += 1
+                continue
+            due = started + (trace["t"] - first) / args.speed
+            await asyncio.sleep(max(0.0, due - time.perf_counter()))
+            pending.append(asyncio.create_task(send(trace, request, due)))
+        await asyncio.gather(*pending)
+        elapsed = time.perf_counter() - started
+
+    recorded: dict[str, list[float]] = defaultdict(list)
+    for trace in traces:
+        recorded[f"{trace['method']} {trace['route']}"].append(trace["ms"])
+
+    print(
+        f"\n{len(pending)} requests in {elapsed:.1f}s at {args.speed}x "
+        f"({len(pending) / elapsed:.1f} req/s), {skipped} skipped, "
+        f"max schedule lag {max(lags, default=0) * 1000:.0f} ms\n"
+    )
+    print(
+        f"{'route':<48} {'count':>6} {'err':>5} {'p50':>8} {'p90':>8} {'p99':>8} "
+        f"{'max':>8} {'rec p50':>8}"
+    )
+    for key in sorted(latencies, key=lambda key: -len(latencies[key])):
+        samples = latencies[key]
+        p50, p90, p99 = percentiles(samples)
+        print(
+            f"{key:<48} {len(samples):>6} {errors[key]:>5} {p50:>8.1f} {p90:>8.1f} "
+            f"{p99:>8.1f} {max(samples):>8.1f} {statistics.median(recorded[key]):>8.1f}"
+        )
+    return 1 if sum(errors.values()) else 0
+
+
+def percentiles(samples: list[float]) -> tuple[float, float, float]:
+    """p50, p90 and p99 of a list of latencies."""
+    if len(samples) == 1:
+        return samples[0], samples[0], samples[0]
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return cuts[49], cuts[89], cuts[98]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("traces", help="trace file written with TRAFFIC_RECORD_PATH")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier")
+    parser.add_argument("--limit", type=int, default=None, help="replay only the first N traces")
+    parser.add_argument("--concurrency", type=int, default=256, help="max requests in flight")
+    parser.add_argument("--job-key", default=None, help="JOB_KEY for /api/v1/admin routes")
+    parser.add_argument(
+        "--hermetic", action="store_true", help="replay against a fresh local SQLite-backed API"
+    )
+    args = parser.parse_args()
+
+    if not args.hermetic:
+        return asyncio.run(replay(args))
+    with hermetic_server() as url:
+        args.base_url = url
+        return asyncio.run(replay(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
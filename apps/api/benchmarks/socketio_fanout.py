@@ -0,0 +1,117 @@
+"""Benchmark CPU time and bytes per ``cell_update`` fan-out for each payload encoding.
+
+Runs ``AsyncServer.emit`` to a room of N fake clients and counts what the
+server does per fan-out: packet encoding (once per emit) plus the Engine.IO
+packet encoded for every client. Transport I/O is not included.
+
+- json/rows: default serializer, one ``{row, col, value}`` object per cell
+- json/columnar: default serializer, ``rows``/``cols``/``values`` arrays
+- msgpack/columnar: msgpack serializer (SOCKETIO_SERIALIZER=msgpack), columnar arrays
+
+Usage:
+    python benchmarks/socketio_fanout.py [--clients 10,50,100,500] [--cells 1,50,300]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Settings validation needs credentials; no connection is made by this benchmark
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "benchmark")
+
+import socketio
+
+from app.core.realtime import columnar_cells
+from app.models.table import CellUpdateRequest
+
+ROOM = "table:bench"
+
+
+def make_cells(count: int) -> list[CellUpdateRequest]:
+    """Cell updates with values typical of the grid (short text and dates)."""
+    return [
+        CellUpdateRequest(
+            row=i, col=i % 8, value="2025-03-14" if i % 8 == 0 else f"Guest {i} (+{i % 4})"
+        )
+        for i in range(count)
+    ]
+
+
+def make_event(cells: list[CellUpdateRequest], columnar: bool) -> dict[str, Any]:
+    if columnar:
+        body = columnar_cells(cells)
+    else:
+        body = {"cells": [{"row": c.row, "col": c.col, "value": c.value} for c in cells]}
+    return {"table_id": "5b0a4c1e-8f3d-4a6b-9c2e-7d1f0e3a5b6c", **body, "seq": 1, "epoch": "a1b2"}
+
+
+async def make_server(serializer: str, clients: int) -> tuple[socketio.AsyncServer, list[int]]:
+    """Server with ``clients`` fake participants in one room, counting bytes sent."""
+    sio = socketio.AsyncServer(async_mode="asgi", serializer=serializer)
+    sent = [0]
+
+    async def send_eio_packet(eio_sid, eio_pkt):
+        encoded = eio_pkt.encode()
+        sent[0] += len(encoded)
+
+    sio._send_eio_packet = send_eio_packet
+    for i in range(clients):
+        sid = await sio.manager.connect(f"eio-{i}", "/")
+        await sio.manager.enter_room(sid, "/", ROOM)
+    return sio, sent
+
+
+async def measure(serializer: str, event: dict[str, Any], clients: int, repeat: int):
+    sio, sent = await make_server(serializer, clients)
+    await sio.emit("cell_update", event, room=ROOM)  # warm up
+    sent[0] = 0
+
+    start = time.process_time()
+    for _ in range(repeat):
+        await sio.emit("cell_update", event, room=ROOM)
+    cpu = (time.process_time() - start) / repeat
+    return cpu, sent[0] // repeat
+
+
+async def run(args: argparse.Namespace) -> None:
+    variants = [
+        ("json/rows", "default", False),
+        ("json/columnar", "default", True),
+        ("msgpack/columnar", "msgpack", True),
+    ]
+    print(f"{'cells':>6} {'clients':>8} {'variant':<18} {'CPU/fan-out':>12} {'bytes/client':>13}")
+    for cell_count in args.cells:
+        cells = make_cells(cell_count)
+        for clients in args.clients:
+            for name, serializer, columnar in variants:
+                cpu, total = await measure(
+                    serializer, make_event(cells, columnar), clients, args.repeat
+                )
+                print(
+                    f"{cell_count:>6} {clients:>8} {name:<18} {cpu * 1000:>9.3f} ms "
+                    f"{total // clients:>13}"
+                )
+
+
+def parse_list(value: str) -> list[int]:
+    return [int(part) for part in value.split(",")]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--clients", type=parse_list, default=[10, 50, 100, 500])
+    parser.add_argument("--cells", type=parse_list, default=[1, 50, 300])
+    parser.add_argument("--repeat", type=int, default=50)
+    asyncio.run(run(parser.parse_args()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""Benchmark CPU time of the model-based and fast table serialization paths.
+
+Builds synthetic DB rows for a full table (500x64 by default) and measures the
+CPU time spent turning them into response bytes:
+
+- model path: ``CellData``/``TableResponse`` models, ``response_model``
+  re-validation and stock JSON encoding, as FastAPI does for ``get_table``
+- fast path: ``encode_table_payload`` on the raw rows
+
+Usage:
+    python benchmarks/table_serialization.py [--rows 500] [--cols 64] [--min-speedup 5]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Settings validation needs credentials; no connection is made by this benchmark
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "benchmark")
+
+from pydantic import TypeAdapter
+
+from app.core.serialization import encode_table_payload
+from app.models.table import TableResponse
+from app.services.table_service import TableService
+
+
+def make_rows(rows: int, cols: int) -> tuple[dict, list[dict], list[dict]]:
+    """Build a table row, column rows and cell rows as returned by the cell stores."""
+    table = {
+        "id": "00000000-0000-0000-0000-000000000000",
+        "slug": "benchmark",
+        "title": "Benchmark",
+        "description": None,
+        "cols": cols,
+        "rows": rows,
+        "fixed_rows": False,
+    }
+    columns = [
+        {"idx": c, "header": f"Column {c + 1}", "width": None, "format": "text"}
+        for c in range(cols)
+    ]
+    cells = [
+        {"row": r, "col": c, "value": f"value {r}-{c}"} for r in range(rows) for c in range(cols)
+    ]
+    return table, columns, cells
+
+
+def cpu_time(fn: Callable[[], bytes], repeat: int) -> tuple[float, int]:
+    """Return the best CPU time of ``repeat`` runs and the payload size."""
+    best = float("inf")
+    size = 0
+    for _ in range(repeat):
+        start = time.process_time()
+        size = len(fn())
+        best = min(best, time.process_time() - start)
+    return best, size
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--cols", type=int, default=64)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-speedup", type=float, default=5.0)
+    args = parser.parse_args()
+
+    table, columns, cells = make_rows(args.rows, args.cols)
+    adapter = TypeAdapter(TableResponse)
+
+    def model_path() -> bytes:
+        response = TableService.build_table_response(table, columns, cells)
+        # What FastAPI does with response_model: validate, dump to JSON-able data, json.dumps
+        validated = adapter.validate_python(response, from_attributes=True)
+        content = adapter.dump_python(validated, mode="json")
+        return json.dumps(
+            content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+        ).encode("utf-8")
+
+    def fast_path() -> bytes:
+        return encode_table_payload(table, columns, cells)
+
+    model_cpu, model_size = cpu_time(model_path, args.repeat)
+    fast_cpu, fast_size = cpu_time(fast_path, args.repeat)
+    speedup = model_cpu / fast_cpu if fast_cpu else float("inf")
+
+    print(f"table: {args.rows}x{args.cols} ({args.rows * args.cols} cells)")
+    print(f"model path: {model_cpu * 1000:8.2f} ms CPU, {model_size} bytes")
+    print(f"fast path:  {fast_cpu * 1000:8.2f} ms CPU, {fast_size} bytes")
+    print(f"speedup:    {speedup:8.1f}x (required {args.min_speedup}x)")
+
+    return 0 if speedup >= args.min_speedup else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,7 +3,7 @@
 from contextlib import asynccontextmanager
 
 import socketio
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
@@ -11,16 +11,32 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse, Response
 
 from app.api.dependencies import set_socketio_server
+from app.api.v1.admin import router as admin_router
 from app.api.v1.cells import router as cells_router
 from app.api.v1.config import router as config_router
+from app.api.v1.query import router as query_router
+from app.api.v1.stats import router as stats_router
 from app.api.v1.tables import router as tables_router
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.core.health import health_probe
 from app.core.logging import RequestLoggingMiddleware, setup_logging
+from app.core.metrics import metrics
+from app.core.realtime import room_events
+from app.core.security import require_operator
+from app.core.tasks import task_queue
+from app.services.config_service import config_cache, get_table_templates
 
 # Socket.IO setup - environment-aware CORS origins
 cors_origins = settings.cors_origins
 
-sio = socketio.AsyncServer(async_mode="asgi", cors_allowed_origins=cors_origins)
+sio = socketio.AsyncServer(
+    async_mode="asgi",
+    serializer="msgpack" if settings.socketio_serializer == "msgpack" else "default",
+    cors_allowed_origins=cors_origins,
+    http_compression=settings.socketio_http_compression,
+    compression_threshold=settings.socketio_compression_threshold,
+)
 
 
 class SecurityHeadersMiddleware(BaseHTTPMiddleware):
@@ -62,12 +78,45 @@ async def disconnect(sid):
 
 @sio.event
 async def join_table(sid, data):
-    """Join a table room for real-time updates."""
+    """Join a table room for real-time updates.
+
+    Reconnecting clients send the ``last_seq`` and ``epoch`` of the last
+    ``cell_update`` they saw and get the missed updates replayed, or a
+    resync when those are no longer buffered. Clients sending
+    ``batch_replay`` get both inside ``room_joined`` (``replay`` or
+    ``resync``), read from the log with no await before the emit, so every
+    broadcast queued to them earlier is also in the replay; others get the
+    replay as separate ``resync`` and ``cell_update`` events.
+    """
     table_id = data.get("table_id")
     if table_id:
         room = f"table:{table_id}"
         await sio.enter_room(sid, room)
-        await sio.emit("room_joined", {"table_id": table_id}, room=sid)
+        joined = {"table_id": table_id, "seq": room_events.seq, "epoch": room_events.epoch}
+        last_seq = data.get("last_seq")
+
+        if data.get("batch_replay"):
+            if isinstance(last_seq, int):
+                missed = room_events.since(room, last_seq, data.get("epoch"))
+                if missed is None:
+                    joined["resync"] = True
+                else:
+                    joined["replay"] = [{**event, "seq": seq} for seq, event in missed]
+            await sio.emit("room_joined", joined, room=sid)
+        else:
+            await sio.emit("room_joined", joined, room=sid)
+            if isinstance(last_seq, int):
+                missed = room_events.since(room, last_seq, data.get("epoch"))
+                if missed is None:
+                    await sio.emit(
+                        "resync",
+                        {"table_id": table_id, "seq": room_events.seq, "epoch": room_events.epoch},
+                        room=sid,
+                    )
+                for seq, event in missed or []:
+                    await sio.emit(
+                        "cell_update", {**event, "seq": seq, "epoch": room_events.epoch}, room=sid
+                    )
 
         import logging
 
@@ -112,9 +161,37 @@ async def lifespan(app: FastAPI):
             }
         },
     )
+    get_table_templates()  # Compile default column templates before the first request
+    task_queue.start()
+    health_probe.start(sio)
+    config_cache.start()
+
+    # Optional background services are imported only when enabled, keeping them off cold start
+    services = []
+    if settings.traffic_record_path:
+        from app.core.traffic import traffic_recorder
+
+        services.append(traffic_recorder)
+    # Stats and archival run in Postgres functions the SQLite backend does not have
+    if settings.db_backend == "supabase":
+        if settings.stats_rebuild_interval > 0:
+            from app.services.stats_service import stats_rebuilder
+
+            services.append(stats_rebuilder)
+        if settings.archive_idle_days > 0 and settings.archive_interval > 0:
+            from app.services.archive_service import table_archiver
+
+            services.append(table_archiver)
+    for service in services:
+        service.start()
     yield
     # Shutdown
     logger.info("FastAPI server shutting down")
+    await task_queue.stop(settings.task_drain_timeout)
+    for service in services:
+        await service.stop()
+    await config_cache.stop()
+    await health_probe.stop()
 
 
 def create_app() -> FastAPI:
@@ -211,6 +288,14 @@ def create_app() -> FastAPI:
     # Request logging middleware (must be first for proper timing)
     app.add_middleware(RequestLoggingMiddleware)
 
+    # Response compression for large payloads
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_min_size,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality,
+    )
+
     # Security headers middleware
     app.add_middleware(SecurityHeadersMiddleware)
 
@@ -224,73 +309,41 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        # Lets the frontend tell table data served while the database is down
+        expose_headers=["X-Data-Stale"],
     )
 
-    # Health check endpoint
+    # Health check endpoints (served from the background probe, never query the DB inline)
+    @app.get("/livez")
+    async def liveness_check():
+        """Liveness check: the process is up and serving requests."""
+        return {"status": "ok"}
+
+    @app.get("/readyz")
+    async def readiness_check():
+        """Readiness check from the latest background probe."""
+        return JSONResponse(
+            status_code=200 if health_probe.is_ready else 503, content=health_probe.snapshot()
+        )
+
     @app.get("/healthz")
     async def health_check():
-        """Enhanced health check with connectivity tests."""
-        import logging
-        import time
-
-        import fastapi
-        import pydantic
-        import uvicorn
-
-        from app.core.database import get_supabase_client
-
-        logger = logging.getLogger("api.health")
-        health_status = {
-            "status": "healthy",
-            "timestamp": time.time(),
-            "environment": settings.environment,
-            "version": {
-                "api": "1.0.0",
-                "fastapi": fastapi.__version__,
-                "pydantic": pydantic.__version__,
-                "uvicorn": uvicorn.__version__,
-            },
-        }
-
-        # Test database connectivity
-        try:
-            supabase = get_supabase_client()
-            # Simple query to test connection
-            supabase.table("tables").select("id").limit(1).execute()
-            health_status["database"] = {
-                "status": "connected",
-                "response_time_ms": 0,  # Could add timing if needed
-            }
-            logger.info("Health check - database connected")
-        except Exception as e:
-            health_status["database"] = {"status": "error", "error": str(e)}
-            health_status["status"] = "degraded"
-            logger.error("Health check - database connection failed", exc_info=e)
-
-        # Test Socket.IO server
-        try:
-            if sio and hasattr(sio, "manager"):
-                # Get client count safely
-                try:
-                    client_count = len(sio.manager.rooms.get("/", {}))
-                except (AttributeError, KeyError):
-                    client_count = 0
-
-                health_status["socketio"] = {"status": "running", "connected_clients": client_count}
-                logger.info("Health check - Socket.IO server running")
-            else:
-                health_status["socketio"] = {"status": "not_initialized"}
-                logger.warning("Health check - Socket.IO not initialized")
-        except Exception as e:
-            health_status["socketio"] = {"status": "error", "error": str(e)}
-            logger.error("Health check - Socket.IO check failed", exc_info=e)
-
-        return health_status
+        """Detailed health report from the latest background probe."""
+        return health_probe.snapshot()
+
+    # Metrics endpoint (operators only; exposes traffic and table activity figures)
+    @app.get("/metrics", dependencies=[Depends(require_operator)])
+    async def get_metrics():
+        """In-process metrics snapshot."""
+        return metrics.snapshot()
 
     # API routes
     app.include_router(tables_router, prefix="/api/v1")
     app.include_router(cells_router, prefix="/api/v1")
     app.include_router(config_router, prefix="/api/v1")
+    app.include_router(query_router, prefix="/api/v1")
+    app.include_router(stats_router, prefix="/api/v1")
+    app.include_router(admin_router, prefix="/api/v1")
 
     return app
 
@@ -318,4 +371,9 @@ if __name__ == "__main__":
     reload = os.getenv("ENVIRONMENT", "development") == "development"
 
     print(f"🚀 Starting server on {host}:{port} (reload={reload})")
-    uvicorn.run("main:socket_app", host=host, port=port, reload=reload)
+    uvicorn.run(
+        "main:socket_app",
+        host=host,
+        port=port,
+        reload=reload,
+    )
@@ -0,0 +1,64 @@
+"""Hard-delete soft-deleted tables past the retention window.
+
+Tables are removed in bounded steps (see ``TablePurger``) so the purge can run
+against a live database; interrupting it is safe and a rerun continues where
+it stopped. Defaults come from the PURGE_* settings.
+
+Usage:
+    python scripts/purge_deleted_tables.py [--retention-days 30] [--chunk-size 1000]
+        [--delay 0.2] [--max-tables N] [--dry-run]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.config import settings
+from app.services.purge_service import TablePurger
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--retention-days", type=float, default=settings.purge_retention_days)
+    parser.add_argument("--chunk-size", type=int, default=settings.purge_chunk_size)
+    parser.add_argument("--delay", type=float, default=settings.purge_step_delay)
+    parser.add_argument("--max-tables", type=int, default=None)
+    parser.add_argument(
+        "--dry-run", action="store_true", help="only report how many tables would be purged"
+    )
+    return parser.parse_args()
+
+
+async def purge(args: argparse.Namespace) -> int:
+    purger = TablePurger(args.retention_days, args.chunk_size, args.delay)
+    pending = await purger.count_pending()
+    print(f"{pending} deleted tables older than {args.retention_days} days")
+    if args.dry_run or pending == 0:
+        return 0
+
+    start = time.perf_counter()
+
+    def report(progress: dict[str, Any]) -> None:
+        print(
+            f"\r{progress['tables']}/{pending} tables, {progress['cells']} cells, "
+            f"{progress['blocks']} blocks purged ({time.perf_counter() - start:.1f}s)",
+            end="",
+            flush=True,
+        )
+
+    totals = await purger.run(max_tables=args.max_tables, on_progress=report)
+    print(f"\nDone: {totals['tables']} tables purged")
+    return 0
+
+
+def main() -> int:
+    return asyncio.run(purge(parse_args()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
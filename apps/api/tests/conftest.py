@@ -0,0 +1,36 @@
+"""Shared setup for the API tests.
+
+Tests import the app the way ``main.py`` is run, from the API directory, on
+the embedded SQLite backend in a throwaway file, so no Supabase is needed.
+Settings are read at import, so the environment is set before anything from
+``app`` is imported.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+API_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(API_DIR))
+
+_db_dir = tempfile.mkdtemp(prefix="online-tables-tests-")
+os.environ.update(
+    DB_BACKEND="sqlite",
+    SQLITE_PATH=str(Path(_db_dir) / "tests.db"),
+    # Tests create and write far more than one client would
+    RATE_LIMIT_ENABLED="false",
+)
+
+
+@pytest.fixture(scope="session")
+def client():
+    """A client for the app, started once for the whole session."""
+    from fastapi.testclient import TestClient
+
+    import main
+
+    with TestClient(main.app) as test_client:
+        yield test_client
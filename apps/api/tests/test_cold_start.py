@@ -0,0 +1,39 @@
+"""Cold start budget: fresh interpreters answering their first table request."""
+
+import os
+import statistics
+
+import pytest
+
+from benchmarks import cold_start
+
+# CI runners are slower and noisier than production machines; the budgets are upper bounds
+MAX_MS = float(os.getenv("COLD_START_MAX_MS", "1500"))
+# Import time of main and app.* alone, without FastAPI, pydantic and Socket.IO
+MAX_APP_IMPORT_MS = float(os.getenv("COLD_START_APP_IMPORT_MAX_MS", "200"))
+RUNS = int(os.getenv("COLD_START_RUNS", "3"))
+
+
+@pytest.fixture(scope="module")
+def runs():
+    return cold_start.measure(RUNS)
+
+
+def test_first_table_request_within_budget(runs):
+    total = cold_start.median_total(runs)
+    steps = ", ".join(
+        f"{step} {statistics.median(run[step] for run in runs):.0f} ms" for step in cold_start.STEPS
+    )
+    assert total <= MAX_MS, f"cold start {total:.0f} ms over {MAX_MS:.0f} ms budget ({steps})"
+
+
+def test_app_import_within_budget(runs):
+    app_import = statistics.median(cold_start.app_import_ms(run) for run in runs)
+    slowest = ", ".join(
+        f"{name} {ms:.0f} ms"
+        for name, ms in cold_start.median_split(runs).items()
+        if cold_start.is_app_module(name)
+    )
+    assert app_import <= MAX_APP_IMPORT_MS, (
+        f"app modules import in {app_import:.0f} ms, over {MAX_APP_IMPORT_MS:.0f} ms ({slowest})"
+    )
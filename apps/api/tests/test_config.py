@@ -0,0 +1,39 @@
+"""/config responses, including while the configuration cannot be loaded."""
+
+import pytest
+
+from app.services.config_service import config_cache
+
+
+@pytest.fixture
+def failing_config(monkeypatch):
+    async def refresh():
+        raise RuntimeError("database down")
+
+    config_cache.invalidate()
+    monkeypatch.setattr(config_cache, "refresh", refresh)
+    yield
+    config_cache.invalidate()
+
+
+def test_config_is_cacheable(client):
+    response = client.get("/api/v1/config")
+
+    assert response.status_code == 200
+    assert response.headers["cache-control"].startswith("public")
+    assert (
+        client.get(
+            "/api/v1/config", headers={"If-None-Match": response.headers["etag"]}
+        ).status_code
+        == 304
+    )
+
+
+@pytest.mark.usefixtures("failing_config")
+@pytest.mark.parametrize("path", ["/api/v1/config", "/api/v1/config/app.title"])
+def test_fallback_is_not_cached(client, path):
+    response = client.get(path)
+
+    assert response.status_code == 503
+    assert response.headers["cache-control"] == "no-store"
+    assert "etag" not in response.headers
@@ -0,0 +1,135 @@
+"""Circuit breaker state transitions, on their own and through run_query."""
+
+import asyncio
+import threading
+
+import pytest
+
+from app.core import db_scheduler
+from app.core.db_scheduler import (
+    BreakerState,
+    CircuitBreaker,
+    DatabaseUnavailableError,
+    DBLane,
+    run_query,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(db_scheduler.time, "monotonic", clock)
+    return clock
+
+
+def open_breaker(breaker):
+    for _ in range(breaker.threshold):
+        assert breaker.before_call() is False
+        breaker.record_failure()
+    assert breaker.state == BreakerState.OPEN
+
+
+def test_closed_open_half_open_closed(clock):
+    breaker = CircuitBreaker(threshold=3, reset_timeout=10)
+
+    breaker.before_call()
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == BreakerState.CLOSED
+
+    open_breaker(breaker)
+    with pytest.raises(DatabaseUnavailableError):
+        breaker.before_call()
+
+    # After the reset timeout one probe is admitted, everything else still fails fast
+    clock.now += 10
+    assert breaker.before_call() is True
+    assert breaker.state == BreakerState.HALF_OPEN
+    with pytest.raises(DatabaseUnavailableError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == BreakerState.CLOSED
+    assert breaker.before_call() is False
+
+
+def test_failed_probe_reopens(clock):
+    breaker = CircuitBreaker(threshold=2, reset_timeout=10)
+    open_breaker(breaker)
+
+    clock.now += 10
+    assert breaker.before_call() is True
+    breaker.record_failure()
+
+    assert breaker.state == BreakerState.OPEN
+    with pytest.raises(DatabaseUnavailableError):
+        breaker.before_call()
+
+
+def test_cancelled_probe_frees_the_probe_slot(clock, monkeypatch):
+    breaker = CircuitBreaker(threshold=1, reset_timeout=10)
+    monkeypatch.setattr(db_scheduler, "db_breaker", breaker)
+    open_breaker(breaker)
+    clock.now += 10
+
+    started = threading.Event()
+    finish = threading.Event()
+
+    class SlowQuery:
+        def execute(self):
+            started.set()
+            finish.wait(5)
+
+    async def scenario():
+        probe = asyncio.create_task(run_query(SlowQuery(), DBLane.WRITE))
+        await asyncio.to_thread(started.wait, 5)
+        assert breaker.state == BreakerState.HALF_OPEN
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+        finish.set()
+
+    asyncio.run(scenario())
+
+    # The next query probes instead of the breaker rejecting everything while half-open
+    assert breaker.state == BreakerState.HALF_OPEN
+    assert breaker.before_call() is True
+    breaker.record_success()
+    assert breaker.state == BreakerState.CLOSED
+
+
+class CodedError(Exception):
+    def __init__(self, code):
+        super().__init__(code)
+        self.code = code
+
+
+@pytest.mark.parametrize(("code", "attempts", "failures"), [("57014", 1, 0), ("PGRST001", 3, 3)])
+def test_canceled_queries_are_not_transient(monkeypatch, code, attempts, failures):
+    breaker = CircuitBreaker(threshold=5, reset_timeout=10)
+    monkeypatch.setattr(db_scheduler, "db_breaker", breaker)
+    monkeypatch.setattr(db_scheduler.settings, "db_read_retries", 2)
+    monkeypatch.setattr(db_scheduler.settings, "db_retry_backoff", 0)
+    calls = []
+
+    class FailingQuery:
+        def execute(self):
+            calls.append(code)
+            raise CodedError(code)
+
+    with pytest.raises(CodedError):
+        asyncio.run(run_query(FailingQuery(), DBLane.READ))
+
+    # A canceled statement (timeout, search deadline) is neither retried nor a health failure
+    assert len(calls) == attempts
+    assert breaker.stats()["consecutive_failures"] == failures
+    assert breaker.state == BreakerState.CLOSED
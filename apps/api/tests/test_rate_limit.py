@@ -0,0 +1,30 @@
+"""Token-bucket admission, including limits disabled by a rate of 0."""
+
+from app.core.rate_limit import RateBudget, WriteRateLimiter
+
+
+def limiter(requests_per_second, cells_per_second, request_burst=2):
+    budget = RateBudget(
+        requests_per_second=requests_per_second,
+        request_burst=request_burst,
+        cells_per_second=cells_per_second,
+        cell_burst=10,
+    )
+    return WriteRateLimiter({"editor": budget})
+
+
+def test_exhausted_budget_asks_to_wait():
+    writes = limiter(requests_per_second=1, cells_per_second=100)
+
+    assert writes.acquire("table", "token", "editor", cells=5) == 0
+    assert writes.acquire("table", "token", "editor", cells=5) == 0
+    assert writes.acquire("table", "token", "editor", cells=5) > 0
+
+
+def test_zero_rate_disables_the_limit():
+    requests_unlimited = limiter(requests_per_second=0, cells_per_second=100)
+    cells_unlimited = limiter(requests_per_second=100, cells_per_second=0, request_burst=100)
+
+    for _ in range(50):
+        assert requests_unlimited.acquire("table", "token", "editor", cells=0) == 0
+        assert cells_unlimited.acquire("table", "token", "editor", cells=1000) == 0
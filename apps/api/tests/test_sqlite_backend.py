@@ -0,0 +1,252 @@
+"""Table lifecycle on the SQLite backend (DB_BACKEND=sqlite), through the HTTP API."""
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.security import verify_token
+from app.services import cell_store, table_service
+
+STORAGE_MODES = ["cells", "blocks"]
+
+
+def auth(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def create(client, **table):
+    response = client.post("/api/v1/tables", json={"rows": 6, "cols": 3, **table})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def load(client, table, token=None):
+    response = client.get(
+        f"/api/v1/tables/{table['slug']}", headers=auth(token or table["admin_token"])
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def cells_of(payload):
+    # Cleared cells come back as null in cells storage and not at all in blocks storage
+    return {
+        (cell["row"], cell["col"]): cell["value"]
+        for cell in payload["cells"]
+        if cell["value"] is not None
+    }
+
+
+def write(client, table, cells, token=None):
+    response = client.post(
+        f"/api/v1/tables/{table['slug']}/cells",
+        json={"cells": [{"row": row, "col": col, "value": value} for (row, col), value in cells]},
+        headers=auth(token or table["admin_token"]),
+    )
+    assert response.status_code == 200, response.text
+
+
+def test_create_table(client):
+    table = create(client, title="Shifts", rows=4, cols=2)
+
+    payload = load(client, table)
+    assert (payload["title"], payload["rows"], payload["cols"]) == ("Shifts", 4, 2)
+    assert [column["idx"] for column in payload["columns"]] == [0, 1]
+    assert payload["cells"] == []
+
+
+def test_batch_create_and_batch_get(client):
+    response = client.post(
+        "/api/v1/tables/batch",
+        json={"tables": [{"title": f"Batch {i}", "rows": 2, "cols": 2} for i in range(3)]},
+    )
+    assert response.status_code == 200, response.text
+    tables = response.json()["tables"]
+    assert len({table["slug"] for table in tables}) == 3
+    write(client, tables[1], [((1, 1), "x")])
+
+    response = client.post(
+        "/api/v1/tables/batch-get",
+        json={
+            "tables": [
+                {"slug": tables[1]["slug"], "token": tables[1]["edit_token"]},
+                {"slug": tables[0]["slug"], "token": tables[2]["admin_token"]},
+                {"slug": "missing-slug", "token": tables[0]["admin_token"]},
+                {"slug": tables[2]["slug"], "token": tables[2]["admin_token"]},
+            ]
+        },
+    )
+    assert response.status_code == 200, response.text
+    results = response.json()["tables"]
+
+    assert [result["slug"] for result in results] == [
+        tables[1]["slug"],
+        tables[0]["slug"],
+        "missing-slug",
+        tables[2]["slug"],
+    ]
+    assert cells_of(results[0]["table"]) == {(1, 1): "x"}
+    assert results[1]["table"] is None
+    assert results[1]["error"]["status"] == 403
+    assert results[2]["error"]["status"] == 404
+    assert results[3]["table"]["title"] == "Batch 2"
+
+
+@pytest.mark.parametrize("storage_mode", STORAGE_MODES)
+def test_batch_get_pages_and_chunks(client, monkeypatch, storage_mode):
+    # Small pages and chunks, so every read spans several of each
+    monkeypatch.setattr(cell_store, "PAGE_ROWS", 4)
+    monkeypatch.setattr(table_service, "BATCH_GET_CHUNK_CELLS", 20)
+    tables = [create(client, rows=6, cols=3, storage_mode=storage_mode) for _ in range(3)]
+    expected = []
+    for n, table in enumerate(tables):
+        cells = {(row, col): f"{n}:{row}:{col}" for row in range(6) for col in range(3)}
+        write(client, table, cells.items())
+        expected.append(cells)
+
+    order = [0, 1, 0, 2, 1]
+    response = client.post(
+        "/api/v1/tables/batch-get",
+        json={
+            "tables": [
+                {"slug": tables[n]["slug"], "token": tables[n]["admin_token"]} for n in order
+            ]
+        },
+    )
+    assert response.status_code == 200, response.text
+
+    results = response.json()["tables"]
+    assert [cells_of(result["table"]) for result in results] == [expected[n] for n in order]
+    assert all(len(result["table"]["columns"]) == 3 for result in results)
+
+
+@pytest.mark.parametrize("storage_mode", STORAGE_MODES)
+def test_cell_writes(client, storage_mode):
+    table = create(client, storage_mode=storage_mode)
+
+    write(client, table, [((0, 0), "a"), ((5, 2), "b"), ((3, 1), "c")])
+    write(client, table, [((0, 0), "A"), ((3, 1), None)], token=table["edit_token"])
+
+    assert cells_of(load(client, table)) == {(0, 0): "A", (5, 2): "b"}
+    window = client.get(
+        f"/api/v1/tables/{table['slug']}/cells",
+        params={"row_start": 4, "row_end": 6},
+        headers=auth(table["admin_token"]),
+    )
+    assert window.status_code == 200, window.text
+    assert cells_of(window.json()) == {(5, 2): "b"}
+
+
+@pytest.mark.parametrize("storage_mode", STORAGE_MODES)
+def test_truncation(client, storage_mode):
+    table = create(client, storage_mode=storage_mode)
+    write(client, table, [((0, 0), "keep"), ((5, 0), "last row"), ((0, 2), "last col")])
+
+    rows = client.request(
+        "DELETE",
+        f"/api/v1/tables/{table['slug']}/rows",
+        json={"count": 1},
+        headers=auth(table["admin_token"]),
+    )
+    assert rows.status_code == 200, rows.text
+    assert rows.json()["new_rows"] == 5
+    columns = client.request(
+        "DELETE",
+        f"/api/v1/tables/{table['slug']}/columns",
+        json={"count": 1},
+        headers=auth(table["admin_token"]),
+    )
+    assert columns.status_code == 200, columns.text
+    assert columns.json()["new_cols"] == 2
+
+    payload = load(client, table)
+    assert (payload["rows"], payload["cols"]) == (5, 2)
+    assert cells_of(payload) == {(0, 0): "keep"}
+
+    # Grown back, the removed cells stay gone
+    client.post(
+        f"/api/v1/tables/{table['slug']}/rows",
+        json={"count": 1},
+        headers=auth(table["admin_token"]),
+    )
+    assert cells_of(load(client, table)) == {(0, 0): "keep"}
+
+
+def test_storage_migration(client):
+    table = create(client)
+    cells = {(0, 0): "a", (2, 1): "b", (5, 2): "c"}
+    write(client, table, cells.items())
+
+    for storage_mode in ["blocks", "cells"]:
+        response = client.put(
+            f"/api/v1/tables/{table['slug']}/storage",
+            json={"storage_mode": storage_mode},
+            headers=auth(table["admin_token"]),
+        )
+        assert response.status_code == 200, response.text
+        assert response.json()["storage_mode"] == storage_mode
+        assert cells_of(load(client, table)) == cells
+
+        # Writes keep working in the new mode
+        write(client, table, [((1, 1), storage_mode)])
+        cells[(1, 1)] = storage_mode
+        assert cells_of(load(client, table)) == cells
+
+
+@pytest.mark.parametrize("include_cells", [True, False])
+def test_clone(client, include_cells):
+    table = create(client, title="Source", storage_mode="blocks")
+    write(client, table, [((0, 0), "a"), ((4, 2), "b")])
+
+    response = client.post(
+        f"/api/v1/tables/{table['slug']}/clone",
+        json={"title": "Copy", "include_cells": include_cells},
+        headers=auth(table["admin_token"]),
+    )
+    assert response.status_code == 200, response.text
+    clone = response.json()
+
+    assert clone["slug"] != table["slug"]
+    payload = load(client, clone)
+    assert (payload["title"], payload["rows"], payload["cols"]) == ("Copy", 6, 3)
+    assert cells_of(payload) == ({(0, 0): "a", (4, 2): "b"} if include_cells else {})
+
+    # The clone is independent of its source
+    write(client, clone, [((0, 0), "changed")])
+    assert cells_of(load(client, table))[(0, 0)] == "a"
+
+
+def test_verify_token(client):
+    table = create(client)
+
+    verified, role = client.portal.call(verify_token, table["slug"], table["admin_token"])
+    assert (verified["slug"], role) == (table["slug"], "admin")
+    _, role = client.portal.call(verify_token, table["slug"], table["edit_token"])
+    assert role == "editor"
+
+    for slug, token, status in [
+        (table["slug"], "not-a-token", 403),
+        ("missing-slug", table["admin_token"], 404),
+        (table["slug"], "", 401),
+    ]:
+        with pytest.raises(HTTPException) as error:
+            client.portal.call(verify_token, slug, token)
+        assert error.value.status_code == status
+
+    # Editors write cells but cannot change the table
+    response = client.put(
+        f"/api/v1/tables/{table['slug']}/config",
+        json={"title": "Renamed"},
+        headers=auth(table["edit_token"]),
+    )
+    assert response.status_code == 403
+
+
+@pytest.mark.parametrize("path", ["stats", "query", "columns/0/overlaps"])
+def test_postgres_only_endpoints(client, path):
+    table = create(client)
+
+    response = client.get(
+        f"/api/v1/tables/{table['slug']}/{path}", headers=auth(table["admin_token"])
+    )
+
+    assert response.status_code == 501
@@ -0,0 +1,26 @@
+"""Task queue capacity: side work is dropped when full, realtime broadcasts are not."""
+
+import asyncio
+
+from app.core.tasks import TaskPriority, TaskQueue
+
+
+def test_full_queue_keeps_keyed_high_tasks():
+    async def scenario():
+        queue = TaskQueue(maxsize=1, workers=1, max_retries=0, retry_backoff=0)
+        ran = []
+
+        async def record(name):
+            ran.append(name)
+
+        assert queue.submit(record, "normal")
+        assert not queue.submit(record, "low", priority=TaskPriority.LOW)
+        assert not queue.submit(record, "high unkeyed", priority=TaskPriority.HIGH)
+        for seq in range(3):
+            assert queue.submit(record, f"broadcast {seq}", priority=TaskPriority.HIGH, key="room")
+
+        queue.start()
+        await queue.stop(timeout=1)
+        return ran
+
+    assert asyncio.run(scenario()) == ["broadcast 0", "broadcast 1", "broadcast 2", "normal"]
@@ -2,10 +2,11 @@
  * Table grid component with FIXED corner issues
  */
 
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 import { useSearchParams } from 'next/navigation'
 import { useTranslations } from 'next-intl'
 import { useCellEditor } from '@/hooks/use-cell-editor'
+import { useViewportCells } from '@/hooks/use-viewport-cells'
 import { AdminDialog } from '@/components/ui'
 import { TableCell } from './table-cell'
 import {
@@ -19,6 +20,8 @@ import {
 import { Button } from '@/components/ui/button'
 import { Plus, Settings } from 'lucide-react'
 import { findNextUpcomingDate, isNextUpcomingDate } from '@/lib/date-utils'
+import { ESTIMATED_ROW_HEIGHT, VIEWPORT_BLOCK_ROWS } from '@/constants'
+import { getCellWindow } from '@/lib/api'
 import type { TableData } from '@/types'
 
 interface TableGridProps {
@@ -37,18 +40,51 @@ export function TableGrid({ tableData }: TableGridProps) {
   // Local state for table data to enable immediate updates
   const [localTableData, setLocalTableData] = useState<TableData>(tableData)
 
-  const { getCellValue, updateCell, error } = useCellEditor({
+  const { getCellValue, updateCell, mergeCells, resyncVersion, error } = useCellEditor({
     tableId: localTableData.id,
     tableSlug: localTableData.slug,
     token: token || '',
+    rows: localTableData.rows,
     initialCells: localTableData.cells || [],
   })
 
+  // Viewport mode: only the rows on screen are rendered and their cells fetched by block
+  const tableBodyRef = useRef<HTMLTableSectionElement>(null)
+  const { renderStart, renderEnd } = useViewportCells({
+    tableSlug: localTableData.slug,
+    token: token || '',
+    rows: localTableData.rows,
+    containerRef: tableBodyRef,
+    onCellsLoaded: mergeCells,
+    resyncVersion,
+  })
+
   // Update local state when props change
   useEffect(() => {
     setLocalTableData(tableData)
   }, [tableData])
 
+  // Next-date highlighting needs every value of the date columns, not just the loaded blocks:
+  // load those columns in full (each one a narrow column window) when the table has more rows
+  // than the initial load
+  const dateColumnKey = localTableData.columns
+    .filter(col => col.format === 'date' || col.format === 'timerange')
+    .map(col => col.idx)
+    .join(',')
+  useEffect(() => {
+    if (!token || !dateColumnKey || localTableData.rows <= VIEWPORT_BLOCK_ROWS) {
+      return
+    }
+
+    for (const col of dateColumnKey.split(',').map(Number)) {
+      getCellWindow(localTableData.slug, token, { colStart: col, colEnd: col + 1 })
+        .then(mergeCells)
+        .catch(() => {
+          // Highlighting falls back to the loaded rows
+        })
+    }
+  }, [localTableData.slug, localTableData.rows, token, dateColumnKey, mergeCells, resyncVersion])
+
   // Get all date/timerange values for next date highlighting
   const getDateColumnsAndValues = () => {
     const dateColumns = localTableData.columns.filter(
@@ -181,8 +217,12 @@ export function TableGrid({ tableData }: TableGridProps) {
                 ))}
               </TableRow>
             </TableHeader>
-            <TableBody>
-              {Array.from({ length: localTableData.rows }).map((_, rowIndex) => {
+            <TableBody ref={tableBodyRef}>
+              {renderStart > 0 && (
+                <tr aria-hidden="true" style={{ height: renderStart * ESTIMATED_ROW_HEIGHT }} />
+              )}
+              {Array.from({ length: renderEnd - renderStart }).map((_, offset) => {
+                const rowIndex = renderStart + offset
                 // Check if this row contains the next upcoming date
                 const isNextDateRow = dateColumns.some(column => {
                   const cellValue = getCellValue(rowIndex, column.idx)
@@ -215,6 +255,12 @@ export function TableGrid({ tableData }: TableGridProps) {
                   </TableRow>
                 )
               })}
+              {renderEnd < localTableData.rows && (
+                <tr
+                  aria-hidden="true"
+                  style={{ height: (localTableData.rows - renderEnd) * ESTIMATED_ROW_HEIGHT }}
+                />
+              )}
             </TableBody>
           </Table>
         </div>
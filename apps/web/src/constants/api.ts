@@ -4,6 +4,8 @@
 
 export const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'
 export const API_VERSION = 'v1'
+// Must match the API's SOCKETIO_SERIALIZER=msgpack
+export const SOCKETIO_MSGPACK = process.env.NEXT_PUBLIC_SOCKETIO_MSGPACK === 'true'
 export const API_ENDPOINTS = {
   HEALTH: '/healthz',
   TABLES: `/api/${API_VERSION}/tables`,
@@ -0,0 +1,14 @@
+/**
+ * Table data-loading and rendering constants.
+ */
+
+// Rows per block in viewport mode; the first block is part of the initial table load
+export const VIEWPORT_BLOCK_ROWS = 100
+// Blocks prefetched above and below the visible rows
+export const VIEWPORT_PREFETCH_BLOCKS = 1
+// Rows rendered outside the visible range to keep scrolling smooth
+export const VIEWPORT_OVERSCAN_ROWS = 10
+// Estimated rendered row height, used to map the scroll position to rows
+export const ESTIMATED_ROW_HEIGHT = 48
+// Page size for keyset-paginated cell reads
+export const CELL_PAGE_SIZE = 1000
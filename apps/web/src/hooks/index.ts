@@ -5,3 +5,4 @@
 export { useTable } from './use-table'
 export { useCellEditor } from './use-cell-editor'
 export { useSocket } from './use-socket'
+export { useViewportCells } from './use-viewport-cells'
@@ -4,18 +4,60 @@
 
 import { useState, useCallback, useRef } from 'react'
 import { CellData, CellUpdateRequest, CellBatchUpdateRequest } from '@/types'
-import { updateCells } from '@/lib/api'
+import { getCellWindow, updateCells } from '@/lib/api'
+import { VIEWPORT_BLOCK_ROWS } from '@/constants'
 import { useSocket } from './use-socket'
 
+// Cells are kept in a map keyed by coordinates so lookups don't scan the whole grid
+type CellMap = Map<string, string>
+
+const cellKeyOf = (row: number, col: number) => `${row}-${col}`
+
+function buildCellMap(cells: CellData[]): CellMap {
+  const map: CellMap = new Map()
+  cells.forEach(cell => {
+    if (cell.value !== null && cell.value !== '') {
+      map.set(cellKeyOf(cell.row, cell.col), cell.value)
+    }
+  })
+  return map
+}
+
+// Apply cell values to a copy of the map; empty values remove the cell
+function applyCells(prevCells: CellMap, updates: CellData[]): CellMap {
+  const newCells = new Map(prevCells)
+  updates.forEach(update => {
+    const key = cellKeyOf(update.row, update.col)
+    if (update.value === null || update.value === '') {
+      newCells.delete(key)
+    } else {
+      newCells.set(key, update.value)
+    }
+  })
+  return newCells
+}
+
 interface UseCellEditorProps {
   tableId: string
   tableSlug: string
   token: string
+  rows: number
   initialCells: CellData[]
 }
 
-export function useCellEditor({ tableId, tableSlug, token, initialCells }: UseCellEditorProps) {
-  const [cells, setCells] = useState<CellData[]>(initialCells)
+export function useCellEditor({
+  tableId,
+  tableSlug,
+  token,
+  rows,
+  initialCells,
+}: UseCellEditorProps) {
+  const [cells, setCells] = useState<CellMap>(() => buildCellMap(initialCells))
+  // Bumped after a resync so windows loaded on demand (viewport blocks) are fetched again
+  const [resyncVersion, setResyncVersion] = useState(0)
+  // Read by the resync handler, so a row count change does not reconnect the socket
+  const rowsRef = useRef(rows)
+  rowsRef.current = rows
   const [pendingUpdates, setPendingUpdates] = useState<Map<string, CellUpdateRequest>>(new Map())
   const [isUpdating, setIsUpdating] = useState(false)
   const [error, setError] = useState<string | null>(null)
@@ -25,49 +67,41 @@ export function useCellEditor({ tableId, tableSlug, token, initialCells }: UseCe
 
   // Handle real-time cell updates from other clients
   const handleRemoteCellUpdate = useCallback((remoteCells: CellData[]) => {
-    setCells(prevCells => {
-      const newCells = [...prevCells]
-
-      remoteCells.forEach(remoteCell => {
-        const existingIndex = newCells.findIndex(
-          c => c.row === remoteCell.row && c.col === remoteCell.col
-        )
-
-        if (existingIndex >= 0) {
-          if (remoteCell.value === null || remoteCell.value === '') {
-            // Remove empty cells
-            newCells.splice(existingIndex, 1)
-          } else {
-            // Update existing cell
-            newCells[existingIndex].value = remoteCell.value
-          }
-        } else if (remoteCell.value !== null && remoteCell.value !== '') {
-          // Add new cell
-          newCells.push(remoteCell)
-        }
-      })
-
-      return newCells
-    })
+    setCells(prevCells => applyCells(prevCells, remoteCells))
   }, [])
 
+  // Reload cells when updates missed during a disconnect can't be replayed: all of them for
+  // small tables, otherwise the first block, after which the other loaded windows are refetched
+  const handleResync = useCallback(() => {
+    const cellWindow =
+      rowsRef.current > VIEWPORT_BLOCK_ROWS ? { rowStart: 0, rowEnd: VIEWPORT_BLOCK_ROWS } : {}
+    getCellWindow(tableSlug, token, cellWindow)
+      .then(freshCells => {
+        setCells(buildCellMap(freshCells))
+        setResyncVersion(version => version + 1)
+      })
+      .catch(() => {
+        // Keep the current cells; the next update or reload will correct them
+      })
+  }, [tableSlug, token])
+
   // Socket.IO integration for real-time updates
   const { isConnected, connectionError } = useSocket({
     tableId,
     onCellUpdate: handleRemoteCellUpdate,
+    onResync: handleResync,
   })
 
   // Get cell value by coordinates
   const getCellValue = useCallback(
     (row: number, col: number): string | null => {
-      const cellKey = `${row}-${col}`
+      const cellKey = cellKeyOf(row, col)
       const pendingUpdate = pendingUpdates.get(cellKey)
       if (pendingUpdate) {
         return pendingUpdate.value
       }
 
-      const cell = cells.find(c => c.row === row && c.col === col)
-      return cell?.value || null
+      return cells.get(cellKey) || null
     },
     [cells, pendingUpdates]
   )
@@ -75,7 +109,7 @@ export function useCellEditor({ tableId, tableSlug, token, initialCells }: UseCe
   // Update cell with optimistic update
   const updateCell = useCallback(
     async (row: number, col: number, value: string | null) => {
-      const cellKey = `${row}-${col}`
+      const cellKey = cellKeyOf(row, col)
 
       // Add to pending updates for optimistic UI
       setPendingUpdates(prev => {
@@ -106,34 +140,7 @@ export function useCellEditor({ tableId, tableSlug, token, initialCells }: UseCe
           await updateCells(tableSlug, token, request)
 
           // Update local state
-          setCells(prevCells => {
-            const newCells = [...prevCells]
-
-            updatesToSend.forEach(update => {
-              const existingIndex = newCells.findIndex(
-                c => c.row === update.row && c.col === update.col
-              )
-
-              if (existingIndex >= 0) {
-                if (update.value === null || update.value === '') {
-                  // Remove empty cells
-                  newCells.splice(existingIndex, 1)
-                } else {
-                  // Update existing cell
-                  newCells[existingIndex].value = update.value
-                }
-              } else if (update.value !== null && update.value !== '') {
-                // Add new cell
-                newCells.push({
-                  row: update.row,
-                  col: update.col,
-                  value: update.value,
-                })
-              }
-            })
-
-            return newCells
-          })
+          setCells(prevCells => applyCells(prevCells, updatesToSend))
 
           // Clear pending updates
           setPendingUpdates(new Map())
@@ -156,14 +163,21 @@ export function useCellEditor({ tableId, tableSlug, token, initialCells }: UseCe
 
   // Sync with external cell updates (from real-time)
   const syncCells = useCallback((newCells: CellData[]) => {
-    setCells(newCells)
+    setCells(buildCellMap(newCells))
     // Keep pending updates for optimistic UI
   }, [])
 
+  // Merge cells loaded for a window (viewport mode) without touching other cells
+  const mergeCells = useCallback((loadedCells: CellData[]) => {
+    setCells(prevCells => applyCells(prevCells, loadedCells))
+  }, [])
+
   return {
     getCellValue,
     updateCell,
     syncCells,
+    mergeCells,
+    resyncVersion,
     isUpdating,
     error: error || connectionError,
     hasPendingUpdates: pendingUpdates.size > 0,
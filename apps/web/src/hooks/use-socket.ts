@@ -1,19 +1,69 @@
 /**
  * Socket.IO client hook for real-time table updates.
+ *
+ * Remembers the sequence number of the last update seen so that after a
+ * reconnect the server replays only the missed updates, or asks for a resync
+ * when it no longer has them. The replay comes with `room_joined`; live updates
+ * arriving before it are held back and applied after it, so an older replayed
+ * update never lands after a newer live one.
  */
 
 import { useEffect, useRef, useState } from 'react'
 import { io, Socket } from 'socket.io-client'
-import { API_BASE_URL } from '@/constants'
+import { API_BASE_URL, SOCKETIO_MSGPACK } from '@/constants'
 import { CellData } from '@/types'
 
 interface UseSocketProps {
   tableId: string | null
   onCellUpdate?: (__cells: CellData[]) => void
+  onResync?: () => void
 }
 
-export function useSocket({ tableId, onCellUpdate }: UseSocketProps) {
+interface SequencedEvent {
+  table_id: string
+  seq: number
+  epoch: string
+}
+
+// cell_update carries a list of cells, or parallel arrays when the server sends them
+// columnar (SOCKETIO_COLUMNAR_UPDATES); both shapes are read while either may be sent
+interface CellUpdateEvent extends SequencedEvent {
+  cells?: CellData[]
+  rows?: number[]
+  cols?: number[]
+  values?: (string | null)[]
+}
+
+function cellsOf(data: CellUpdateEvent): CellData[] {
+  if (data.cells) {
+    return data.cells
+  }
+  const cols = data.cols ?? []
+  const values = data.values ?? []
+  return (data.rows ?? []).map((row, i) => ({ row, col: cols[i], value: values[i] }))
+}
+
+// The msgpack parser is only downloaded when the server is configured for it
+async function loadParser() {
+  if (!SOCKETIO_MSGPACK) {
+    return null
+  }
+  const parserModule = await import('socket.io-msgpack-parser')
+  return parserModule.default
+}
+
+// Answer to join_table: the missed updates, or resync when they are gone
+interface RoomJoinedEvent extends SequencedEvent {
+  replay?: Omit<CellUpdateEvent, 'epoch'>[]
+  resync?: boolean
+}
+
+export function useSocket({ tableId, onCellUpdate, onResync }: UseSocketProps) {
   const socketRef = useRef<Socket | null>(null)
+  const lastSeqRef = useRef<number | null>(null)
+  const epochRef = useRef<string | null>(null)
+  // Live updates received while the join (and its replay) is outstanding
+  const heldUpdatesRef = useRef<CellUpdateEvent[] | null>(null)
   const [isConnected, setIsConnected] = useState(false)
   const [connectionError, setConnectionError] = useState<string | null>(null)
 
@@ -22,56 +72,119 @@ export function useSocket({ tableId, onCellUpdate }: UseSocketProps) {
       return
     }
 
-    // Create Socket.IO connection
-    const socket = io(API_BASE_URL, {
-      transports: ['websocket', 'polling'],
-      forceNew: true,
-      upgrade: true,
-      rememberUpgrade: false,
-      timeout: 20000,
-    })
+    let socket: Socket | null = null
+    let cancelled = false
 
-    socketRef.current = socket
+    lastSeqRef.current = null
+    epochRef.current = null
+    heldUpdatesRef.current = null
+
+    // Apply an update unless it was already applied (replays overlap live broadcasts)
+    const applyUpdate = (data: CellUpdateEvent) => {
+      if (data.epoch === epochRef.current && data.seq <= (lastSeqRef.current ?? 0)) {
+        return
+      }
+      lastSeqRef.current = data.seq
+      epochRef.current = data.epoch
+
+      if (onCellUpdate) {
+        onCellUpdate(cellsOf(data))
+      }
+    }
 
     // Connection event handlers
-    socket.on('connect', () => {
-      // Socket.IO connected
-      setIsConnected(true)
-      setConnectionError(null)
-
-      // Join the table room
-      socket.emit('join_table', { table_id: tableId })
-    })
-
-    socket.on('disconnect', () => {
-      // Socket.IO disconnected
-      setIsConnected(false)
-    })
-
-    socket.on('connect_error', error => {
-      // Socket.IO connection error
-      setIsConnected(false)
-      setConnectionError(error.message)
-    })
-
-    // Table-specific event handlers
-    socket.on('room_joined', () => {
-      // Joined table room
-    })
-
-    socket.on('cell_update', data => {
-      // Received cell update
-      if (data.table_id === tableId && onCellUpdate && data.cells) {
-        onCellUpdate(data.cells)
+    const listen = (socket: Socket) => {
+      socket.on('connect', () => {
+        // Socket.IO connected
+        setIsConnected(true)
+        setConnectionError(null)
+
+        // Join the table room, asking for updates missed while disconnected
+        heldUpdatesRef.current = []
+        socket.emit('join_table', {
+          table_id: tableId,
+          last_seq: lastSeqRef.current,
+          epoch: epochRef.current,
+          batch_replay: true,
+        })
+      })
+
+      socket.on('disconnect', () => {
+        // Socket.IO disconnected
+        setIsConnected(false)
+      })
+
+      socket.on('connect_error', error => {
+        // Socket.IO connection error
+        setIsConnected(false)
+        setConnectionError(error.message)
+      })
+
+      // Table-specific event handlers
+      socket.on('room_joined', (data: RoomJoinedEvent) => {
+        const held = heldUpdatesRef.current ?? []
+        const firstJoin = lastSeqRef.current === null
+        heldUpdatesRef.current = null
+
+        if (data.resync) {
+          // Missed updates are gone; reload and count from the current sequence
+          lastSeqRef.current = data.seq
+          epochRef.current = data.epoch
+          onResync?.()
+        } else if (!firstJoin) {
+          data.replay?.forEach(update => applyUpdate({ ...update, epoch: data.epoch }))
+        }
+        held.forEach(applyUpdate)
+
+        // First join: updates are counted from here
+        if (firstJoin && !data.resync) {
+          lastSeqRef.current = Math.max(lastSeqRef.current ?? 0, data.seq)
+          epochRef.current = data.epoch
+        }
+      })
+
+      socket.on('cell_update', (data: CellUpdateEvent) => {
+        if (data.table_id !== tableId) {
+          return
+        }
+        if (heldUpdatesRef.current) {
+          heldUpdatesRef.current.push(data)
+          return
+        }
+        applyUpdate(data)
+      })
+    }
+
+    // Create the Socket.IO connection once the parser is loaded
+    const connect = (parser: Awaited<ReturnType<typeof loadParser>>) => {
+      if (cancelled) {
+        return
       }
-    })
+      socket = io(API_BASE_URL, {
+        transports: ['websocket', 'polling'],
+        forceNew: true,
+        upgrade: true,
+        rememberUpgrade: false,
+        timeout: 20000,
+        ...(parser ? { parser } : {}),
+      })
+      socketRef.current = socket
+      listen(socket)
+    }
+
+    loadParser()
+      .then(connect)
+      .catch(error => setConnectionError(error instanceof Error ? error.message : String(error)))
 
     // Cleanup on unmount
     return () => {
-      socket.emit('leave_table', { table_id: tableId })
-      socket.disconnect()
+      cancelled = true
+      if (socket) {
+        socket.emit('leave_table', { table_id: tableId })
+        socket.disconnect()
+      }
     }
-  }, [tableId, onCellUpdate])
+  }, [tableId, onCellUpdate, onResync])
 
   return {
     isConnected,
@@ -4,8 +4,12 @@
 
 import { useState, useEffect } from 'react'
 import { api } from '@/lib/api'
+import { VIEWPORT_BLOCK_ROWS } from '@/constants'
 import type { TableData, LoadingState } from '@/types'
 
+// First paint only needs the first block of rows; the grid loads the rest by viewport
+const INITIAL_WINDOW = { rowEnd: VIEWPORT_BLOCK_ROWS }
+
 interface UseTableOptions {
   slug: string
   token: string | null
@@ -32,7 +36,7 @@ export function useTable({ slug, token }: UseTableOptions): UseTableReturn {
       try {
         setError(null)
         setIsLoading(true)
-        const data = await api.getTable(slug, token)
+        const data = await api.getTable(slug, token, INITIAL_WINDOW)
         setTableData(data)
       } catch (err) {
         const errorMessage = err instanceof Error ? err.message : 'Failed to load table'
@@ -56,7 +60,7 @@ export function useTable({ slug, token }: UseTableOptions): UseTableReturn {
     try {
       setError(null)
       setIsLoading(true)
-      const data = await api.getTable(slug, token)
+      const data = await api.getTable(slug, token, INITIAL_WINDOW)
       setTableData(data)
     } catch (err) {
       const errorMessage = err instanceof Error ? err.message : 'Failed to load table'
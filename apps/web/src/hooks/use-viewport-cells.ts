@@ -0,0 +1,118 @@
+/**
+ * Hook for viewport-based cell loading on large tables.
+ *
+ * Tracks which rows of the grid are on screen, fetches the row blocks that
+ * cover them and prefetches neighbouring blocks. The first block is expected
+ * to come with the initial table load (or resync); a new `resyncVersion`
+ * fetches the other blocks again.
+ */
+
+import { useEffect, useRef, useState, type RefObject } from 'react'
+import { getCellWindow } from '@/lib/api'
+import {
+  ESTIMATED_ROW_HEIGHT,
+  VIEWPORT_BLOCK_ROWS,
+  VIEWPORT_OVERSCAN_ROWS,
+  VIEWPORT_PREFETCH_BLOCKS,
+} from '@/constants'
+import type { CellData } from '@/types'
+
+interface UseViewportCellsProps {
+  tableSlug: string
+  token: string
+  rows: number
+  containerRef: RefObject<HTMLElement>
+  onCellsLoaded: (__cells: CellData[]) => void
+  resyncVersion?: number
+}
+
+interface RowRange {
+  start: number
+  end: number
+}
+
+export function useViewportCells({
+  tableSlug,
+  token,
+  rows,
+  containerRef,
+  onCellsLoaded,
+  resyncVersion = 0,
+}: UseViewportCellsProps) {
+  const [visibleRows, setVisibleRows] = useState<RowRange>({
+    start: 0,
+    end: Math.min(rows, VIEWPORT_BLOCK_ROWS),
+  })
+  const loadedBlocksRef = useRef<Set<number>>(new Set([0]))
+
+  // A different table or token, or a resync, means a fresh set of blocks
+  useEffect(() => {
+    loadedBlocksRef.current = new Set([0])
+  }, [tableSlug, token, resyncVersion])
+
+  // Map the scroll position to the range of visible rows
+  useEffect(() => {
+    const updateVisibleRows = () => {
+      const container = containerRef.current
+      if (!container) {
+        return
+      }
+
+      const top = container.getBoundingClientRect().top
+      const start = Math.min(rows, Math.max(0, Math.floor(-top / ESTIMATED_ROW_HEIGHT)))
+      const bottom = Math.ceil((window.innerHeight - top) / ESTIMATED_ROW_HEIGHT)
+      const end = Math.min(rows, Math.max(start, bottom))
+
+      setVisibleRows(prev => (prev.start === start && prev.end === end ? prev : { start, end }))
+    }
+
+    updateVisibleRows()
+    window.addEventListener('scroll', updateVisibleRows, { passive: true })
+    window.addEventListener('resize', updateVisibleRows)
+
+    return () => {
+      window.removeEventListener('scroll', updateVisibleRows)
+      window.removeEventListener('resize', updateVisibleRows)
+    }
+  }, [containerRef, rows])
+
+  // Fetch the visible blocks plus prefetch neighbours
+  useEffect(() => {
+    if (!token || rows <= VIEWPORT_BLOCK_ROWS) {
+      return
+    }
+
+    const lastBlock = Math.floor((rows - 1) / VIEWPORT_BLOCK_ROWS)
+    const firstWanted = Math.max(
+      0,
+      Math.floor(visibleRows.start / VIEWPORT_BLOCK_ROWS) - VIEWPORT_PREFETCH_BLOCKS
+    )
+    const lastWanted = Math.min(
+      lastBlock,
+      Math.floor(Math.max(visibleRows.end - 1, 0) / VIEWPORT_BLOCK_ROWS) + VIEWPORT_PREFETCH_BLOCKS
+    )
+
+    for (let block = firstWanted; block <= lastWanted; block++) {
+      if (loadedBlocksRef.current.has(block)) {
+        continue
+      }
+
+      loadedBlocksRef.current.add(block)
+      getCellWindow(tableSlug, token, {
+        rowStart: block * VIEWPORT_BLOCK_ROWS,
+        rowEnd: (block + 1) * VIEWPORT_BLOCK_ROWS,
+      })
+        .then(onCellsLoaded)
+        .catch(() => {
+          // Allow the block to be retried on the next scroll
+          loadedBlocksRef.current.delete(block)
+        })
+    }
+  }, [tableSlug, token, rows, visibleRows, onCellsLoaded, resyncVersion])
+
+  // Rows to render, including overscan around the visible range
+  return {
+    renderStart: Math.max(0, visibleRows.start - VIEWPORT_OVERSCAN_ROWS),
+    renderEnd: Math.min(rows, visibleRows.end + VIEWPORT_OVERSCAN_ROWS),
+  }
+}
@@ -3,9 +3,12 @@
  * Uses native fetch() only as per project requirements.
  */
 
-import { API_BASE_URL, API_ENDPOINTS } from '@/constants'
+import { API_BASE_URL, API_ENDPOINTS, CELL_PAGE_SIZE } from '@/constants'
 import type {
   TableData,
+  CellData,
+  CellPage,
+  CellWindow,
   CreateTableRequest,
   CreateTableResponse,
   CellBatchUpdateRequest,
@@ -16,6 +19,8 @@ import type {
   AddColumnRequest,
   RemoveColumnRequest,
   RowColumnResponse,
+  TableQuery,
+  TableQueryResponse,
 } from '@/types'
 
 class ApiError extends Error {
@@ -59,6 +64,28 @@ async function apiRequest<T>(endpoint: string, options: ApiRequestOptions = {}):
   return response.json()
 }
 
+function cellWindowParams(cellWindow: CellWindow = {}): URLSearchParams {
+  const params = new URLSearchParams()
+  if (cellWindow.rowStart !== undefined) {
+    params.set('row_start', String(cellWindow.rowStart))
+  }
+  if (cellWindow.rowEnd !== undefined) {
+    params.set('row_end', String(cellWindow.rowEnd))
+  }
+  if (cellWindow.colStart !== undefined) {
+    params.set('col_start', String(cellWindow.colStart))
+  }
+  if (cellWindow.colEnd !== undefined) {
+    params.set('col_end', String(cellWindow.colEnd))
+  }
+  return params
+}
+
+function withQuery(endpoint: string, params: URLSearchParams): string {
+  const query = params.toString()
+  return query ? `${endpoint}?${query}` : endpoint
+}
+
 export const api = {
   async createTable(
     request: CreateTableRequest,
@@ -70,12 +97,63 @@ export const api = {
     })
   },
 
-  async getTable(slug: string, token: string): Promise<TableData> {
-    return apiRequest<TableData>(`${API_ENDPOINTS.TABLES}/${slug}`, {
+  async getTable(slug: string, token: string, cellWindow?: CellWindow): Promise<TableData> {
+    return apiRequest<TableData>(
+      withQuery(`${API_ENDPOINTS.TABLES}/${slug}`, cellWindowParams(cellWindow)),
+      { token }
+    )
+  },
+
+  async getCellPage(
+    slug: string,
+    token: string,
+    cellWindow?: CellWindow,
+    after?: string | null,
+    limit: number = CELL_PAGE_SIZE
+  ): Promise<CellPage> {
+    const params = cellWindowParams(cellWindow)
+    params.set('limit', String(limit))
+    if (after) {
+      params.set('after', after)
+    }
+    return apiRequest<CellPage>(withQuery(`${API_ENDPOINTS.TABLES}/${slug}/cells`, params), {
       token,
     })
   },
 
+  // Load every cell in a window, following keyset cursors page by page
+  async getCellWindow(slug: string, token: string, cellWindow: CellWindow): Promise<CellData[]> {
+    const cells: CellData[] = []
+    let after: string | null | undefined = null
+    do {
+      const page: CellPage = await api.getCellPage(slug, token, cellWindow, after)
+      cells.push(...page.cells)
+      after = page.next_cursor
+    } while (after)
+    return cells
+  },
+
+  // Filter, sort and page rows on the server instead of loading the whole grid
+  async queryTable(slug: string, token: string, query: TableQuery): Promise<TableQueryResponse> {
+    const params = new URLSearchParams()
+    for (const filter of query.filters ?? []) {
+      params.append('filter', `${filter.col}:${filter.op}:${filter.value}`)
+    }
+    for (const sort of query.sort ?? []) {
+      params.append('sort', `${sort.desc ? '-' : ''}${sort.col}`)
+    }
+    if (query.limit !== undefined) {
+      params.set('limit', String(query.limit))
+    }
+    if (query.offset !== undefined) {
+      params.set('offset', String(query.offset))
+    }
+    return apiRequest<TableQueryResponse>(
+      withQuery(`${API_ENDPOINTS.TABLES}/${slug}/query`, params),
+      { token }
+    )
+  },
+
   async updateCells(
     slug: string,
     token: string,
@@ -177,6 +255,8 @@ export { ApiError }
 // Convenience exports
 export const createTable = api.createTable
 export const updateCells = api.updateCells
+export const getCellWindow = api.getCellWindow
+export const queryTable = api.queryTable
 export const updateTableConfig = api.updateTableConfig
 export const getConfig = api.getConfig
 export const getConfigValue = api.getConfigValue
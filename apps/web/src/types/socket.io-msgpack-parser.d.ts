@@ -0,0 +1,2 @@
+// The parser ships without type declarations; it is only passed to io() as `parser`
+declare module 'socket.io-msgpack-parser'
@@ -17,6 +17,51 @@ export interface CellData {
   value: string | null
 }
 
+export interface CellWindow {
+  rowStart?: number
+  rowEnd?: number
+  colStart?: number
+  colEnd?: number
+}
+
+export interface CellPage {
+  cells: CellData[]
+  next_cursor?: string | null
+}
+
+export type QueryOperator =
+  | 'eq'
+  | 'contains'
+  | 'prefix'
+  | 'before'
+  | 'after'
+  | 'overlaps'
+  | 'includes'
+
+export interface QueryFilter {
+  col: number
+  op: QueryOperator
+  value: string
+}
+
+export interface QuerySort {
+  col: number
+  desc?: boolean
+}
+
+export interface TableQuery {
+  filters?: QueryFilter[]
+  sort?: QuerySort[]
+  limit?: number
+  offset?: number
+}
+
+export interface TableQueryResponse {
+  total: number
+  rows: number[]
+  cells: CellData[]
+}
+
 export interface TableData {
   id: string
   slug: string
@@ -6,6 +6,12 @@
 -- Enable UUID extension if not already enabled
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 
+-- Trigram matching and GIN support for scalar columns (cell queries)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE EXTENSION IF NOT EXISTS btree_gin;
+-- GiST support for scalar columns (typed time range index)
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
 -- Tables table - stores table metadata
 CREATE TABLE IF NOT EXISTS tables (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -20,12 +26,18 @@ CREATE TABLE IF NOT EXISTS tables (
     updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
     last_activity_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
     deleted_at TIMESTAMPTZ,
-    fixed_rows BOOLEAN NOT NULL DEFAULT false
+    fixed_rows BOOLEAN NOT NULL DEFAULT false,
+    storage_mode TEXT NOT NULL DEFAULT 'cells',
+    archived_at TIMESTAMPTZ
 );
 
--- Create index on slug for fast lookups
-CREATE INDEX IF NOT EXISTS idx_tables_slug ON tables(slug);
+-- Purge candidates: soft-deleted tables by deletion time
+CREATE INDEX IF NOT EXISTS idx_tables_deleted_at ON tables(deleted_at)
+    WHERE deleted_at IS NOT NULL;
 CREATE INDEX IF NOT EXISTS idx_tables_created_at ON tables(created_at);
+-- Archival candidates: live, unarchived tables by last activity
+CREATE INDEX IF NOT EXISTS idx_tables_archive_candidates ON tables(last_activity_at)
+    WHERE archived_at IS NULL AND deleted_at IS NULL;
 
 -- Columns table - stores column configuration
 CREATE TABLE IF NOT EXISTS columns (
@@ -57,7 +69,9 @@ CREATE TABLE IF NOT EXISTS cells (
     c INT4 NOT NULL,
     value TEXT,
     updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-    updated_by TEXT
+    updated_by TEXT,
+    value_date DATE,
+    value_range TSTZRANGE
 );
 
 -- Create indexes for cells
@@ -65,6 +79,99 @@ CREATE INDEX IF NOT EXISTS idx_cells_table_id ON cells(table_id);
 CREATE UNIQUE INDEX IF NOT EXISTS idx_cells_table_id_r_c ON cells(table_id, r, c);
 CREATE INDEX IF NOT EXISTS idx_cells_updated_at ON cells(updated_at);
 
+-- Query indexes: trigram search on values scoped to a table, and per-column scans
+CREATE INDEX IF NOT EXISTS idx_cells_table_id_value_trgm ON cells
+    USING GIN (table_id, value gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_cells_table_id_c ON cells(table_id, c);
+
+-- Typed indexes for date and timerange columns (value_date/value_range are set by trigger)
+CREATE INDEX IF NOT EXISTS idx_cells_value_date ON cells(table_id, c, value_date)
+    WHERE value_date IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_cells_value_range ON cells
+    USING GIST (table_id, c, value_range) WHERE value_range IS NOT NULL;
+
+-- Full-text indexes for operator search; fastupdate queues new entries in the GIN
+-- pending list so cell writes stay cheap and autovacuum merges them incrementally
+CREATE INDEX IF NOT EXISTS idx_cells_value_fts ON cells
+    USING GIN (to_tsvector('simple', COALESCE(value, '')))
+    WITH (fastupdate = on, gin_pending_list_limit = 4096);
+CREATE INDEX IF NOT EXISTS idx_tables_text_fts ON tables
+    USING GIN (to_tsvector('simple', COALESCE(title, '') || ' ' || COALESCE(description, '')));
+
+-- Add constraint for storage mode
+ALTER TABLE tables
+DROP CONSTRAINT IF EXISTS tables_storage_mode_check;
+
+ALTER TABLE tables
+ADD CONSTRAINT tables_storage_mode_check
+CHECK (storage_mode IN ('cells', 'blocks'));
+
+-- Cell blocks table - row-block storage for tables with storage_mode = 'blocks'
+-- Each row holds 64 grid rows as one JSONB object keyed by "r:c"; empty cells are absent
+CREATE TABLE IF NOT EXISTS cell_blocks (
+    table_id UUID NOT NULL REFERENCES tables(id) ON DELETE CASCADE,
+    block_idx INT4 NOT NULL,
+    data JSONB NOT NULL DEFAULT '{}'::jsonb,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (table_id, block_idx)
+);
+
+-- Full-text index for operator search over block values
+CREATE INDEX IF NOT EXISTS idx_cell_blocks_data_fts ON cell_blocks
+    USING GIN (to_tsvector('simple', data))
+    WITH (fastupdate = on, gin_pending_list_limit = 4096);
+
+-- Column stats tables - aggregates kept current by statement-level triggers on cells and
+-- cell_blocks; rebuild_table_stats() recomputes a table from scratch to correct drift
+CREATE TABLE IF NOT EXISTS column_stats (
+    table_id UUID NOT NULL REFERENCES tables(id) ON DELETE CASCADE,
+    c INT4 NOT NULL,
+    non_empty INT8 NOT NULL DEFAULT 0,
+    distinct_values INT8 NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (table_id, c)
+);
+
+-- Columns with drifted counters, found by stale_table_stats()
+CREATE INDEX IF NOT EXISTS idx_column_stats_drift ON column_stats(table_id)
+    WHERE non_empty < 0 OR distinct_values < 0;
+
+-- Occurrences of each distinct value per column (keyed by hash, values can be long)
+CREATE TABLE IF NOT EXISTS column_value_counts (
+    table_id UUID NOT NULL REFERENCES tables(id) ON DELETE CASCADE,
+    c INT4 NOT NULL,
+    value_hash TEXT NOT NULL,
+    count INT8 NOT NULL,
+    PRIMARY KEY (table_id, c, value_hash)
+);
+
+-- Filled cells per date in date columns
+CREATE TABLE IF NOT EXISTS column_date_counts (
+    table_id UUID NOT NULL REFERENCES tables(id) ON DELETE CASCADE,
+    c INT4 NOT NULL,
+    day DATE NOT NULL,
+    count INT8 NOT NULL,
+    PRIMARY KEY (table_id, c, day)
+);
+
+-- When each table's stats were last rebuilt from its cells
+CREATE TABLE IF NOT EXISTS table_stats (
+    table_id UUID PRIMARY KEY REFERENCES tables(id) ON DELETE CASCADE,
+    rebuilt_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Table archives - cells of idle tables, moved out of cells/cell_blocks into one
+-- (TOAST-compressed) document per table until the table is next opened
+CREATE TABLE IF NOT EXISTS table_archives (
+    table_id UUID PRIMARY KEY REFERENCES tables(id) ON DELETE CASCADE,
+    data JSONB NOT NULL,
+    archived_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Search of archived cells (search_tables), like idx_cell_blocks_data_fts
+CREATE INDEX IF NOT EXISTS idx_table_archives_data_fts ON table_archives
+    USING GIN (to_tsvector('simple', data));
+
 -- Comments table - stores comments/notes
 CREATE TABLE IF NOT EXISTS comments (
     id INT8 PRIMARY KEY GENERATED ALWAYS AS IDENTITY,
@@ -110,6 +217,12 @@ CREATE INDEX IF NOT EXISTS idx_app_config_key ON app_config(key);
 ALTER TABLE tables ENABLE ROW LEVEL SECURITY;
 ALTER TABLE columns ENABLE ROW LEVEL SECURITY;
 ALTER TABLE cells ENABLE ROW LEVEL SECURITY;
+ALTER TABLE cell_blocks ENABLE ROW LEVEL SECURITY;
+ALTER TABLE column_stats ENABLE ROW LEVEL SECURITY;
+ALTER TABLE column_value_counts ENABLE ROW LEVEL SECURITY;
+ALTER TABLE column_date_counts ENABLE ROW LEVEL SECURITY;
+ALTER TABLE table_stats ENABLE ROW LEVEL SECURITY;
+ALTER TABLE table_archives ENABLE ROW LEVEL SECURITY;
 ALTER TABLE comments ENABLE ROW LEVEL SECURITY;
 ALTER TABLE snapshots ENABLE ROW LEVEL SECURITY;
 ALTER TABLE app_config ENABLE ROW LEVEL SECURITY;
@@ -150,6 +263,32 @@ CREATE POLICY IF NOT EXISTS "Cells are updatable by everyone" ON cells
 CREATE POLICY IF NOT EXISTS "Cells are deletable by everyone" ON cells
     FOR DELETE USING (true);
 
+-- Cell blocks policies
+CREATE POLICY IF NOT EXISTS "Cell blocks are viewable by everyone" ON cell_blocks
+    FOR SELECT USING (true);
+
+CREATE POLICY IF NOT EXISTS "Cell blocks are insertable by everyone" ON cell_blocks
+    FOR INSERT WITH CHECK (true);
+
+CREATE POLICY IF NOT EXISTS "Cell blocks are updatable by everyone" ON cell_blocks
+    FOR UPDATE USING (true);
+
+CREATE POLICY IF NOT EXISTS "Cell blocks are deletable by everyone" ON cell_blocks
+    FOR DELETE USING (true);
+
+-- Column stats policies (written by triggers, read by the API)
+CREATE POLICY IF NOT EXISTS "Column stats are viewable by everyone" ON column_stats
+    FOR SELECT USING (true);
+
+CREATE POLICY IF NOT EXISTS "Column value counts are viewable by everyone" ON column_value_counts
+    FOR SELECT USING (true);
+
+CREATE POLICY IF NOT EXISTS "Column date counts are viewable by everyone" ON column_date_counts
+    FOR SELECT USING (true);
+
+CREATE POLICY IF NOT EXISTS "Table stats are viewable by everyone" ON table_stats
+    FOR SELECT USING (true);
+
 -- Comments policies
 CREATE POLICY IF NOT EXISTS "Comments are viewable by everyone" ON comments
     FOR SELECT USING (true);
@@ -195,25 +334,1052 @@ CREATE TRIGGER update_cells_updated_at
     BEFORE UPDATE ON cells
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+DROP TRIGGER IF EXISTS update_cell_blocks_updated_at ON cell_blocks;
+CREATE TRIGGER update_cell_blocks_updated_at
+    BEFORE UPDATE ON cell_blocks
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
 DROP TRIGGER IF EXISTS update_app_config_updated_at ON app_config;
 CREATE TRIGGER update_app_config_updated_at
     BEFORE UPDATE ON app_config
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
--- Update last_activity_at when tables are accessed
+-- Update last_activity_at when tables are accessed: statement-level, so a batch touches each
+-- table row once; rows marked active within the last few seconds are left alone so concurrent
+-- writers don't queue on the tables row lock
 CREATE OR REPLACE FUNCTION update_table_activity()
 RETURNS TRIGGER AS $$
 BEGIN
-    UPDATE tables SET last_activity_at = NOW() WHERE id = NEW.table_id;
+    UPDATE tables t
+    SET last_activity_at = NOW()
+    FROM (SELECT DISTINCT table_id FROM new_rows) AS changed
+    WHERE t.id = changed.table_id AND t.last_activity_at < NOW() - INTERVAL '5 seconds';
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+-- Triggers to update activity when cells or cell blocks are modified
+DROP TRIGGER IF EXISTS update_table_activity_on_cell_insert ON cells;
+CREATE TRIGGER update_table_activity_on_cell_insert
+    AFTER INSERT ON cells REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_table_activity();
+
+DROP TRIGGER IF EXISTS update_table_activity_on_cell_update ON cells;
+CREATE TRIGGER update_table_activity_on_cell_update
+    AFTER UPDATE ON cells REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_table_activity();
+
+DROP TRIGGER IF EXISTS update_table_activity_on_block_insert ON cell_blocks;
+CREATE TRIGGER update_table_activity_on_block_insert
+    AFTER INSERT ON cell_blocks REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_table_activity();
+
+DROP TRIGGER IF EXISTS update_table_activity_on_block_update ON cell_blocks;
+CREATE TRIGGER update_table_activity_on_block_update
+    AFTER UPDATE ON cell_blocks REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_table_activity();
+
+-- Table creation: insert a table and its columns atomically; p_table holds the tables
+-- fields (token hashes computed by the API), p_columns a JSON array of {idx, header, width, format}
+CREATE OR REPLACE FUNCTION create_table_with_columns(p_table JSONB, p_columns JSONB)
+RETURNS UUID AS $$
+DECLARE
+    v_table_id UUID;
+BEGIN
+    INSERT INTO tables (
+        slug, title, description, cols, rows, fixed_rows, storage_mode,
+        admin_token_hash, edit_token_hash
+    )
+    VALUES (
+        p_table->>'slug',
+        p_table->>'title',
+        p_table->>'description',
+        (p_table->>'cols')::INT4,
+        (p_table->>'rows')::INT4,
+        COALESCE((p_table->>'fixed_rows')::BOOLEAN, false),
+        COALESCE(p_table->>'storage_mode', 'cells'),
+        p_table->>'admin_token_hash',
+        p_table->>'edit_token_hash'
+    )
+    RETURNING id INTO v_table_id;
+
+    INSERT INTO columns (table_id, idx, header, width, format)
+    SELECT v_table_id, (col->>'idx')::INT4, col->>'header', (col->>'width')::INT4,
+           COALESCE(col->>'format', 'text')
+    FROM jsonb_array_elements(p_columns) AS col;
+
+    RETURN v_table_id;
+END;
+$$ language 'plpgsql';
+
+-- Create several tables in one transaction; p_tables is a JSON array of {table, columns}
+-- in the create_table_with_columns argument shapes. Returns the new ids in order.
+CREATE OR REPLACE FUNCTION create_tables_with_columns(p_tables JSONB)
+RETURNS UUID[] AS $$
+DECLARE
+    v_entry JSONB;
+    v_ids UUID[] := '{}';
+BEGIN
+    FOR v_entry IN SELECT value FROM jsonb_array_elements(p_tables) LOOP
+        v_ids := v_ids || create_table_with_columns(v_entry->'table', v_entry->'columns');
+    END LOOP;
+    RETURN v_ids;
+END;
+$$ language 'plpgsql';
+
+-- Clone a table with set-based copies of its columns and (optionally) cells in either
+-- storage mode; p_table holds slug, token hashes and optional title/description overrides
+CREATE OR REPLACE FUNCTION clone_table(p_source_id UUID, p_table JSONB, p_include_cells BOOLEAN)
+RETURNS UUID AS $$
+DECLARE
+    v_table_id UUID;
+BEGIN
+    INSERT INTO tables (
+        slug, title, description, cols, rows, fixed_rows, storage_mode,
+        admin_token_hash, edit_token_hash
+    )
+    SELECT p_table->>'slug',
+           COALESCE(p_table->>'title', t.title),
+           COALESCE(p_table->>'description', t.description),
+           t.cols, t.rows, t.fixed_rows, t.storage_mode,
+           p_table->>'admin_token_hash',
+           p_table->>'edit_token_hash'
+    FROM tables t
+    WHERE t.id = p_source_id AND t.deleted_at IS NULL
+    RETURNING id INTO v_table_id;
+
+    IF v_table_id IS NULL THEN
+        RAISE EXCEPTION 'Table % not found', p_source_id;
+    END IF;
+
+    INSERT INTO columns (table_id, idx, header, width, format)
+    SELECT v_table_id, idx, header, width, format
+    FROM columns
+    WHERE table_id = p_source_id;
+
+    IF p_include_cells THEN
+        INSERT INTO cells (table_id, r, c, value, value_date, value_range)
+        SELECT v_table_id, r, c, value, value_date, value_range
+        FROM cells
+        WHERE table_id = p_source_id;
+
+        INSERT INTO cell_blocks (table_id, block_idx, data)
+        SELECT v_table_id, block_idx, data
+        FROM cell_blocks
+        WHERE table_id = p_source_id;
+    END IF;
+
+    RETURN v_table_id;
+END;
+$$ language 'plpgsql';
+
+-- Row-block storage functions (block size 64 must match CELL_BLOCK_ROWS in the API)
+-- Apply a batch of cell writes; p_cells is a JSON array of {row, col, value}, later entries win
+CREATE OR REPLACE FUNCTION write_cell_blocks(p_table_id UUID, p_cells JSONB)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO cell_blocks (table_id, block_idx)
+    SELECT DISTINCT p_table_id, (e->>'row')::INT4 / 64
+    FROM jsonb_array_elements(p_cells) AS e
+    ON CONFLICT (table_id, block_idx) DO NOTHING;
+
+    -- Lock blocks in a fixed order so concurrent batches cannot deadlock
+    PERFORM 1 FROM cell_blocks
+    WHERE table_id = p_table_id
+      AND block_idx IN (SELECT (e->>'row')::INT4 / 64 FROM jsonb_array_elements(p_cells) AS e)
+    ORDER BY block_idx
+    FOR UPDATE;
+
+    -- Empty values become JSON nulls in the patch and are stripped from the block
+    UPDATE cell_blocks b
+    SET data = jsonb_strip_nulls(b.data || p.patch)
+    FROM (
+        SELECT r / 64 AS block_idx,
+               jsonb_object_agg(r || ':' || c, NULLIF(value, '') ORDER BY ord) AS patch
+        FROM (
+            SELECT (e->>'row')::INT4 AS r, (e->>'col')::INT4 AS c, e->>'value' AS value, ord
+            FROM jsonb_array_elements(p_cells) WITH ORDINALITY AS t(e, ord)
+        ) u
+        GROUP BY r / 64
+    ) p
+    WHERE b.table_id = p_table_id AND b.block_idx = p.block_idx;
+END;
+$$ language 'plpgsql';
+
+-- Drop cells at or beyond p_row_count (row removal)
+CREATE OR REPLACE FUNCTION truncate_cell_block_rows(p_table_id UUID, p_row_count INT4)
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM cell_blocks WHERE table_id = p_table_id AND block_idx * 64 >= p_row_count;
+
+    UPDATE cell_blocks
+    SET data = COALESCE(
+        (SELECT jsonb_object_agg(key, value) FROM jsonb_each(data)
+         WHERE split_part(key, ':', 1)::INT4 < p_row_count),
+        '{}'::jsonb
+    )
+    WHERE table_id = p_table_id AND block_idx = p_row_count / 64;
+END;
+$$ language 'plpgsql';
+
+-- Drop cells at or beyond p_col_count, rewriting only blocks that hold such cells
+CREATE OR REPLACE FUNCTION truncate_cell_block_cols(p_table_id UUID, p_col_count INT4)
+RETURNS VOID AS $$
+BEGIN
+    UPDATE cell_blocks
+    SET data = COALESCE(
+        (SELECT jsonb_object_agg(key, value) FROM jsonb_each(data)
+         WHERE split_part(key, ':', 2)::INT4 < p_col_count),
+        '{}'::jsonb
+    )
+    WHERE table_id = p_table_id
+      AND EXISTS (
+          SELECT 1 FROM jsonb_object_keys(data) AS k
+          WHERE split_part(k, ':', 2)::INT4 >= p_col_count
+      );
+END;
+$$ language 'plpgsql';
+
+-- Move a table's cells into row blocks in one transaction
+CREATE OR REPLACE FUNCTION migrate_table_to_blocks(p_table_id UUID)
+RETURNS VOID AS $$
+BEGIN
+    PERFORM 1 FROM tables WHERE id = p_table_id AND storage_mode = 'cells' FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+
+    INSERT INTO cell_blocks (table_id, block_idx, data)
+    SELECT p_table_id, r / 64, jsonb_object_agg(r || ':' || c, value)
+    FROM cells
+    WHERE table_id = p_table_id AND COALESCE(value, '') <> ''
+    GROUP BY r / 64
+    ON CONFLICT (table_id, block_idx) DO UPDATE SET data = EXCLUDED.data;
+
+    DELETE FROM cells WHERE table_id = p_table_id;
+    UPDATE tables SET storage_mode = 'blocks' WHERE id = p_table_id;
+END;
+$$ language 'plpgsql';
+
+-- Move a table's row blocks back into one row per cell
+CREATE OR REPLACE FUNCTION migrate_table_to_cells(p_table_id UUID)
+RETURNS VOID AS $$
+BEGIN
+    PERFORM 1 FROM tables WHERE id = p_table_id AND storage_mode = 'blocks' FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+
+    INSERT INTO cells (table_id, r, c, value, value_date, value_range)
+    SELECT p_table_id, u.r, u.c, u.value,
+           CASE WHEN col.format = 'date' THEN parse_cell_date(u.value) END,
+           CASE WHEN col.format = 'timerange' THEN parse_cell_timerange(u.value) END
+    FROM (
+        SELECT split_part(e.key, ':', 1)::INT4 AS r, split_part(e.key, ':', 2)::INT4 AS c,
+               e.value #>> '{}' AS value
+        FROM cell_blocks b, jsonb_each(b.data) AS e
+        WHERE b.table_id = p_table_id
+    ) u
+    LEFT JOIN columns col ON col.table_id = p_table_id AND col.idx = u.c
+    ON CONFLICT (table_id, r, c) DO UPDATE
+    SET value = EXCLUDED.value, value_date = EXCLUDED.value_date,
+        value_range = EXCLUDED.value_range;
+
+    DELETE FROM cell_blocks WHERE table_id = p_table_id;
+    UPDATE tables SET storage_mode = 'cells' WHERE id = p_table_id;
+END;
+$$ language 'plpgsql';
+
+-- Per-cell storage writes: upsert a batch of {row, col, value} in one statement, later
+-- entries win. Typed values come from one join with the table's columns, as in every other
+-- writer of cells
+CREATE OR REPLACE FUNCTION write_cells(p_table_id UUID, p_cells JSONB)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO cells (table_id, r, c, value, value_date, value_range)
+    SELECT DISTINCT ON (u.r, u.c) p_table_id, u.r, u.c, u.value,
+           CASE WHEN col.format = 'date' THEN parse_cell_date(u.value) END,
+           CASE WHEN col.format = 'timerange' THEN parse_cell_timerange(u.value) END
+    FROM (
+        SELECT (e->>'row')::INT4 AS r, (e->>'col')::INT4 AS c, e->>'value' AS value, ord
+        FROM jsonb_array_elements(p_cells) WITH ORDINALITY AS t(e, ord)
+    ) u
+    LEFT JOIN columns col ON col.table_id = p_table_id AND col.idx = u.c
+    ORDER BY u.r, u.c, u.ord DESC
+    ON CONFLICT (table_id, r, c) DO UPDATE
+    SET value = EXCLUDED.value, value_date = EXCLUDED.value_date,
+        value_range = EXCLUDED.value_range;
+END;
+$$ language 'plpgsql';
+
+-- Structural changes: each is one transaction, so a failure between steps cannot leave
+-- cells, columns and the tables counts out of step. Cells are dropped in both storages;
+-- the one a table does not use has no rows for it.
+CREATE OR REPLACE FUNCTION remove_table_rows(p_table_id UUID, p_row_count INT4)
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM cells WHERE table_id = p_table_id AND r >= p_row_count;
+    PERFORM truncate_cell_block_rows(p_table_id, p_row_count);
+    UPDATE tables SET rows = p_row_count WHERE id = p_table_id;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION remove_table_columns(p_table_id UUID, p_col_count INT4)
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM columns WHERE table_id = p_table_id AND idx >= p_col_count;
+    DELETE FROM cells WHERE table_id = p_table_id AND c >= p_col_count;
+    PERFORM truncate_cell_block_cols(p_table_id, p_col_count);
+    UPDATE tables SET cols = p_col_count WHERE id = p_table_id;
+END;
+$$ language 'plpgsql';
+
+-- Append columns; p_columns is a JSON array of {idx, header, width, format}
+CREATE OR REPLACE FUNCTION add_table_columns(p_table_id UUID, p_columns JSONB)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO columns (table_id, idx, header, width, format)
+    SELECT p_table_id, (col->>'idx')::INT4, col->>'header', (col->>'width')::INT4,
+           COALESCE(col->>'format', 'text')
+    FROM jsonb_array_elements(p_columns) AS col;
+
+    UPDATE tables
+    SET cols = (SELECT count(*) FROM columns WHERE table_id = p_table_id)
+    WHERE id = p_table_id;
+END;
+$$ language 'plpgsql';
+
+-- Query helpers: parse date and timerange cell values (NULL when unparseable)
+-- Dates are "YYYY-MM-DD" or ISO timestamps; timeranges are "start|end" ISO timestamps
+CREATE OR REPLACE FUNCTION parse_cell_date(p_value TEXT)
+RETURNS DATE AS $$
+BEGIN
+    RETURN left(p_value, 10)::DATE;
+EXCEPTION
+    WHEN others THEN RETURN NULL;
+END;
+$$ language 'plpgsql' STABLE;
+
+CREATE OR REPLACE FUNCTION parse_cell_timerange(p_value TEXT)
+RETURNS TSTZRANGE AS $$
+BEGIN
+    IF position('|' IN p_value) = 0 THEN
+        RETURN tstzrange(p_value::TIMESTAMPTZ, p_value::TIMESTAMPTZ, '[]');
+    END IF;
+    RETURN tstzrange(split_part(p_value, '|', 1)::TIMESTAMPTZ, split_part(p_value, '|', 2)::TIMESTAMPTZ);
+EXCEPTION
+    WHEN others THEN RETURN NULL;
+END;
+$$ language 'plpgsql' STABLE;
+
+-- Typed shadow values for date and timerange columns: the functions writing cells derive them
+-- set-based (one join with columns per statement), and a format change re-derives a column
+DROP TRIGGER IF EXISTS set_cells_typed_values ON cells;
+DROP FUNCTION IF EXISTS set_cell_typed_values();
+
+-- Re-derive typed values for a column's cells after its format changes
+CREATE OR REPLACE FUNCTION refresh_cell_typed_values()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE cells
+    SET value_date = CASE WHEN NEW.format = 'date' THEN parse_cell_date(value) END,
+        value_range = CASE WHEN NEW.format = 'timerange' THEN parse_cell_timerange(value) END
+    WHERE table_id = NEW.table_id AND c = NEW.idx;
+
+    -- Block values have no typed columns, so re-derive their date stats instead
+    IF EXISTS (SELECT 1 FROM tables WHERE id = NEW.table_id AND storage_mode = 'blocks') THEN
+        PERFORM rebuild_table_stats(NEW.table_id);
+    END IF;
     RETURN NEW;
 END;
 $$ language 'plpgsql';
 
--- Trigger to update activity when cells are modified
-DROP TRIGGER IF EXISTS update_table_activity_on_cell_change ON cells;
-CREATE TRIGGER update_table_activity_on_cell_change
-    AFTER INSERT OR UPDATE ON cells
-    FOR EACH ROW EXECUTE FUNCTION update_table_activity();
+-- Trigger to refresh typed values when a column's format changes
+DROP TRIGGER IF EXISTS refresh_cells_typed_values_on_format_change ON columns;
+CREATE TRIGGER refresh_cells_typed_values_on_format_change
+    AFTER UPDATE OF format ON columns
+    FOR EACH ROW WHEN (OLD.format IS DISTINCT FROM NEW.format)
+    EXECUTE FUNCTION refresh_cell_typed_values();
+
+-- Filter, sort and paginate a table's rows
+-- p_filters: [{col, op, value}] with op one of eq, ilike, like, date_eq, date_lt, date_gt,
+--            range_overlaps, range_contains, range_before, range_after (all must match)
+-- p_sort:    [{col, format, desc}] applied in order, then by row index
+-- Returns {"total", "rows", "cells"} for the requested page of rows
+-- Cost: filtered queries scale with the first filter's matches, unfiltered unsorted ones with
+-- the page size; sort-only queries (and every query on a blocks table) still scan all rows
+CREATE OR REPLACE FUNCTION query_table_rows(
+    p_table_id UUID, p_filters JSONB, p_sort JSONB, p_limit INT4, p_offset INT4
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_rows INT4;
+    v_mode TEXT;
+    v_grid TEXT;
+    v_from TEXT;
+    v_skip TEXT := '$4';
+    v_total TEXT := '(SELECT count(*) FROM matched)';
+    v_where TEXT := '';
+    v_joins TEXT := '';
+    v_order TEXT := '';
+    v_filter JSONB;
+    v_sort JSONB;
+    v_value TEXT;
+    v_pred TEXT;
+    v_i INT4 := 0;
+    v_result JSONB;
+BEGIN
+    SELECT rows, storage_mode INTO v_rows, v_mode FROM tables WHERE id = p_table_id;
+
+    IF v_mode = 'blocks' THEN
+        -- Block values are parsed on the fly; only per-cell tables have typed columns
+        v_grid := 'SELECT split_part(e.key, '':'', 1)::INT4 AS r, '
+            || 'split_part(e.key, '':'', 2)::INT4 AS c, e.value #>> ''{}'' AS value, '
+            || 'parse_cell_date(e.value #>> ''{}'') AS value_date, '
+            || 'parse_cell_timerange(e.value #>> ''{}'') AS value_range '
+            || 'FROM cell_blocks b, jsonb_each(b.data) AS e WHERE b.table_id = $1';
+    ELSE
+        v_grid := 'SELECT r, c, value, value_date, value_range FROM cells WHERE table_id = $1';
+    END IF;
+
+    -- Each filter keeps the rows whose cell in that column matches; the first one drives the
+    -- query, so a filtered query reads only that filter's matches through the typed indexes
+    FOR v_filter IN SELECT * FROM jsonb_array_elements(COALESCE(p_filters, '[]'::jsonb))
+    LOOP
+        v_value := quote_literal(v_filter->>'value');
+        v_pred := CASE v_filter->>'op'
+            WHEN 'eq' THEN 'g.value = ' || v_value
+            WHEN 'ilike' THEN 'g.value ILIKE ' || v_value
+            WHEN 'like' THEN 'g.value LIKE ' || v_value
+            WHEN 'date_eq' THEN 'g.value_date = ' || v_value || '::DATE'
+            WHEN 'date_lt' THEN 'g.value_date < ' || v_value || '::DATE'
+            WHEN 'date_gt' THEN 'g.value_date > ' || v_value || '::DATE'
+            WHEN 'range_overlaps' THEN 'g.value_range && ' || v_value || '::TSTZRANGE'
+            WHEN 'range_contains' THEN 'g.value_range @> ' || v_value || '::TIMESTAMPTZ'
+            WHEN 'range_before' THEN 'upper(g.value_range) <= ' || v_value || '::TIMESTAMPTZ'
+            WHEN 'range_after' THEN 'lower(g.value_range) >= ' || v_value || '::TIMESTAMPTZ'
+        END;
+        IF v_pred IS NULL THEN
+            RAISE EXCEPTION 'Unsupported query operator: %', v_filter->>'op';
+        END IF;
+        IF v_from IS NULL THEN
+            v_from := format(
+                '(SELECT DISTINCT g.r FROM grid g WHERE g.c = %s AND g.r < $2 AND %s) AS t(r)',
+                (v_filter->>'col')::INT4, v_pred
+            );
+        ELSE
+            v_where := v_where || format(
+                ' AND t.r IN (SELECT g.r FROM grid g WHERE g.c = %s AND %s)',
+                (v_filter->>'col')::INT4, v_pred
+            );
+        END IF;
+    END LOOP;
+
+    -- Each sort key joins the row's cell in that column and orders by its typed value
+    FOR v_sort IN SELECT * FROM jsonb_array_elements(COALESCE(p_sort, '[]'::jsonb))
+    LOOP
+        v_i := v_i + 1;
+        v_joins := v_joins || format(
+            ' LEFT JOIN grid s%1$s ON s%1$s.r = t.r AND s%1$s.c = %2$s', v_i, (v_sort->>'col')::INT4
+        );
+        v_order := v_order || CASE v_sort->>'format'
+            WHEN 'date' THEN format('s%s.value_date', v_i)
+            WHEN 'timerange' THEN format('lower(s%s.value_range)', v_i)
+            ELSE format('s%s.value', v_i)
+        END || CASE WHEN (v_sort->>'desc')::BOOLEAN THEN ' DESC' ELSE ' ASC' END || ' NULLS LAST, ';
+    END LOOP;
+
+    IF v_from IS NULL AND v_order = '' THEN
+        -- Neither filtered nor sorted: the page is a plain range of row indexes
+        v_from := 'generate_series($4::INT8, LEAST($2::INT8, $4::INT8 + $3) - 1) AS t(r)';
+        v_skip := '0';
+        v_total := '$2';
+    ELSIF v_from IS NULL THEN
+        -- Sorted only: every row takes part in the ordering
+        v_from := 'generate_series(0, $2 - 1) AS t(r)';
+    END IF;
+
+    EXECUTE format(
+        'WITH grid AS NOT MATERIALIZED (%s),
+        matched AS MATERIALIZED (
+            SELECT t.r, row_number() OVER (ORDER BY %s t.r) AS pos
+            FROM %s %s
+            WHERE true %s
+        ),
+        page AS (SELECT r, pos FROM matched ORDER BY pos LIMIT $3 OFFSET %s)
+        SELECT jsonb_build_object(
+            ''total'', %s,
+            ''rows'', COALESCE((SELECT jsonb_agg(r ORDER BY pos) FROM page), ''[]''::jsonb),
+            ''cells'', COALESCE((
+                SELECT jsonb_agg(
+                    jsonb_build_object(''row'', g.r, ''col'', g.c, ''value'', g.value)
+                    ORDER BY p.pos, g.c
+                )
+                FROM page p JOIN grid g ON g.r = p.r
+            ), ''[]''::jsonb)
+        )',
+        v_grid, v_order, v_from, v_joins, v_where, v_skip, v_total
+    )
+    INTO v_result
+    USING p_table_id, v_rows, p_limit, p_offset;
+
+    RETURN v_result;
+END;
+$$ language 'plpgsql' STABLE;
+
+-- Raise query_canceled once p_deadline has passed; called per scanned row to bound a query
+CREATE OR REPLACE FUNCTION check_deadline(p_deadline TIMESTAMPTZ)
+RETURNS BOOLEAN AS $$
+BEGIN
+    IF clock_timestamp() > p_deadline THEN
+        RAISE EXCEPTION 'canceling statement due to time budget' USING ERRCODE = 'query_canceled';
+    END IF;
+    RETURN true;
+END;
+$$ language 'plpgsql' VOLATILE;
+
+-- Operator search across all live tables, ranked by title/description and cell matches;
+-- cells of archived tables are searched in their table_archives document
+-- Only the full-text indexes may be used (enable_seqscan = off) and every matched row checks
+-- the p_timeout_ms budget, which bounds each search (statement_timeout changed inside the
+-- call would only apply to later statements)
+DROP FUNCTION IF EXISTS search_tables(TEXT, INT4, INT4);
+CREATE OR REPLACE FUNCTION search_tables(
+    p_query TEXT, p_limit INT4, p_offset INT4, p_timeout_ms INT4
+)
+RETURNS JSONB AS $$
+    WITH q AS (
+        SELECT websearch_to_tsquery('simple', p_query) AS query,
+               clock_timestamp() + p_timeout_ms * INTERVAL '1 millisecond' AS deadline
+    ),
+    cell_hits AS (
+        SELECT c.table_id, c.r, c.c, c.value,
+               ts_rank(to_tsvector('simple', COALESCE(c.value, '')), q.query) AS rank
+        FROM cells c, q
+        WHERE to_tsvector('simple', COALESCE(c.value, '')) @@ q.query AND check_deadline(q.deadline)
+        UNION ALL
+        SELECT b.table_id, split_part(e.key, ':', 1)::INT4, split_part(e.key, ':', 2)::INT4,
+               e.value #>> '{}', ts_rank(to_tsvector('simple', e.value #>> '{}'), q.query)
+        FROM cell_blocks b, q, jsonb_each(b.data) AS e
+        WHERE to_tsvector('simple', b.data) @@ q.query
+          AND to_tsvector('simple', e.value #>> '{}') @@ q.query
+          AND check_deadline(q.deadline)
+        UNION ALL
+        SELECT a.table_id, (e->>0)::INT4, (e->>1)::INT4, e->>2,
+               ts_rank(to_tsvector('simple', COALESCE(e->>2, '')), q.query)
+        FROM table_archives a, q, jsonb_array_elements(a.data->'cells') AS e
+        WHERE to_tsvector('simple', a.data) @@ q.query
+          AND to_tsvector('simple', COALESCE(e->>2, '')) @@ q.query
+          AND check_deadline(q.deadline)
+        UNION ALL
+        SELECT a.table_id, split_part(e.key, ':', 1)::INT4, split_part(e.key, ':', 2)::INT4,
+               e.value #>> '{}', ts_rank(to_tsvector('simple', e.value #>> '{}'), q.query)
+        FROM table_archives a, q, jsonb_each(a.data->'blocks') AS b, jsonb_each(b.value) AS e
+        WHERE to_tsvector('simple', a.data) @@ q.query
+          AND to_tsvector('simple', e.value #>> '{}') @@ q.query
+          AND check_deadline(q.deadline)
+    ),
+    cell_matches AS (
+        SELECT table_id, count(*) AS matches, sum(rank) AS rank,
+               (array_agg(
+                   jsonb_build_object('row', r, 'col', c, 'value', value) ORDER BY rank DESC, r, c
+               ))[1:3] AS samples
+        FROM cell_hits
+        GROUP BY table_id
+    ),
+    title_matches AS (
+        SELECT t.id AS table_id,
+               ts_rank(
+                   to_tsvector('simple', COALESCE(t.title, '') || ' ' || COALESCE(t.description, '')),
+                   q.query
+               ) AS rank
+        FROM tables t, q
+        WHERE to_tsvector('simple', COALESCE(t.title, '') || ' ' || COALESCE(t.description, ''))
+            @@ q.query
+          AND check_deadline(q.deadline)
+    ),
+    results AS (
+        SELECT t.slug, t.title, t.description, t.last_activity_at,
+               COALESCE(tm.rank, 0) * 4 + COALESCE(cm.rank, 0) AS rank,
+               COALESCE(cm.matches, 0) AS matches,
+               to_jsonb(COALESCE(cm.samples, '{}'::jsonb[])) AS samples
+        FROM (SELECT table_id FROM cell_matches UNION SELECT table_id FROM title_matches) AS m
+        JOIN tables t ON t.id = m.table_id
+        LEFT JOIN cell_matches cm ON cm.table_id = m.table_id
+        LEFT JOIN title_matches tm ON tm.table_id = m.table_id
+        WHERE t.deleted_at IS NULL
+    )
+    SELECT jsonb_build_object(
+        'total', (SELECT count(*) FROM results),
+        'results', COALESCE((
+            SELECT jsonb_agg(to_jsonb(page) ORDER BY page.rank DESC, page.slug)
+            FROM (
+                SELECT * FROM results ORDER BY rank DESC, slug LIMIT p_limit OFFSET p_offset
+            ) AS page
+        ), '[]'::jsonb)
+    );
+$$ language 'sql' STABLE
+SET enable_seqscan = off;
+
+-- Pairs of rows whose time ranges in one column overlap (booking conflicts), up to p_limit
+CREATE OR REPLACE FUNCTION find_overlapping_rows(p_table_id UUID, p_col INT4, p_limit INT4)
+RETURNS JSONB AS $$
+DECLARE
+    v_mode TEXT;
+    v_result JSONB;
+BEGIN
+    SELECT storage_mode INTO v_mode FROM tables WHERE id = p_table_id;
+
+    IF v_mode = 'blocks' THEN
+        WITH ranges AS MATERIALIZED (
+            SELECT split_part(e.key, ':', 1)::INT4 AS r,
+                   parse_cell_timerange(e.value #>> '{}') AS value_range
+            FROM cell_blocks b, jsonb_each(b.data) AS e
+            WHERE b.table_id = p_table_id AND split_part(e.key, ':', 2)::INT4 = p_col
+        )
+        SELECT COALESCE(jsonb_agg(jsonb_build_array(p.a, p.b) ORDER BY p.a, p.b), '[]'::jsonb)
+        INTO v_result
+        FROM (
+            SELECT x.r AS a, y.r AS b
+            FROM ranges x JOIN ranges y ON y.r > x.r AND y.value_range && x.value_range
+            ORDER BY x.r, y.r
+            LIMIT p_limit
+        ) AS p;
+    ELSE
+        -- Each probe is a GiST lookup on (table_id, c, value_range)
+        SELECT COALESCE(jsonb_agg(jsonb_build_array(p.a, p.b) ORDER BY p.a, p.b), '[]'::jsonb)
+        INTO v_result
+        FROM (
+            SELECT x.r AS a, y.r AS b
+            FROM cells x
+            JOIN cells y
+              ON y.table_id = x.table_id AND y.c = x.c AND y.r > x.r
+             AND y.value_range && x.value_range
+            WHERE x.table_id = p_table_id AND x.c = p_col AND x.value_range IS NOT NULL
+            ORDER BY x.r, y.r
+            LIMIT p_limit
+        ) AS p;
+    END IF;
+
+    RETURN v_result;
+END;
+$$ language 'plpgsql' STABLE;
+
+-- Column stats maintenance
+-- Non-empty cell values of a table in either storage mode
+CREATE OR REPLACE FUNCTION table_cell_values(p_table_id UUID)
+RETURNS TABLE (r INT4, c INT4, value TEXT) AS $$
+    SELECT cells.r, cells.c, cells.value
+    FROM cells
+    WHERE cells.table_id = p_table_id AND COALESCE(cells.value, '') <> ''
+    UNION ALL
+    SELECT split_part(e.key, ':', 1)::INT4, split_part(e.key, ':', 2)::INT4, e.value #>> '{}'
+    FROM cell_blocks b, jsonb_each(b.data) AS e
+    WHERE b.table_id = p_table_id;
+$$ language 'sql' STABLE;
+
+-- Apply signed per-value deltas: [{t: table_id, c, v: value, d: date or null, n: +1/-1}]
+CREATE OR REPLACE FUNCTION apply_cell_stat_deltas(p_deltas JSONB)
+RETURNS VOID AS $$
+BEGIN
+    IF p_deltas IS NULL THEN
+        RETURN;
+    END IF;
+
+    -- Serialize with rebuild_table_stats, which holds the table row FOR UPDATE; writers
+    -- share this lock, so they don't block each other
+    PERFORM 1 FROM tables
+    WHERE id IN (SELECT DISTINCT (e->>'t')::UUID FROM jsonb_array_elements(p_deltas) AS e)
+    FOR KEY SHARE;
+
+    -- Value counts drive non-empty and distinct counts; deltas of deleted tables are skipped
+    WITH d AS (
+        SELECT (e->>'t')::UUID AS table_id, (e->>'c')::INT4 AS c, md5(e->>'v') AS value_hash,
+               sum((e->>'n')::INT8) AS delta
+        FROM jsonb_array_elements(p_deltas) AS e
+        WHERE EXISTS (SELECT 1 FROM tables t WHERE t.id = (e->>'t')::UUID)
+        GROUP BY 1, 2, 3
+        HAVING sum((e->>'n')::INT8) <> 0
+    ),
+    counted AS (
+        INSERT INTO column_value_counts AS v (table_id, c, value_hash, count)
+        SELECT table_id, c, value_hash, delta FROM d
+        ON CONFLICT (table_id, c, value_hash) DO UPDATE SET count = v.count + EXCLUDED.count
+        RETURNING v.table_id, v.c, v.value_hash, v.count
+    )
+    INSERT INTO column_stats AS s (table_id, c, non_empty, distinct_values)
+    SELECT d.table_id, d.c, sum(d.delta),
+           sum((counted.count > 0)::INT4 - (counted.count - d.delta > 0)::INT4)
+    FROM d JOIN counted USING (table_id, c, value_hash)
+    GROUP BY d.table_id, d.c
+    ON CONFLICT (table_id, c) DO UPDATE
+        SET non_empty = s.non_empty + EXCLUDED.non_empty,
+            distinct_values = s.distinct_values + EXCLUDED.distinct_values,
+            updated_at = NOW();
+
+    DELETE FROM column_value_counts v
+    USING (
+        SELECT DISTINCT (e->>'t')::UUID AS table_id, (e->>'c')::INT4 AS c, md5(e->>'v') AS value_hash
+        FROM jsonb_array_elements(p_deltas) AS e
+    ) AS d
+    WHERE v.table_id = d.table_id AND v.c = d.c AND v.value_hash = d.value_hash
+      AND v.count <= 0;
+
+    WITH d AS (
+        SELECT (e->>'t')::UUID AS table_id, (e->>'c')::INT4 AS c, (e->>'d')::DATE AS day,
+               sum((e->>'n')::INT8) AS delta
+        FROM jsonb_array_elements(p_deltas) AS e
+        WHERE e->>'d' IS NOT NULL
+          AND EXISTS (SELECT 1 FROM tables t WHERE t.id = (e->>'t')::UUID)
+        GROUP BY 1, 2, 3
+        HAVING sum((e->>'n')::INT8) <> 0
+    )
+    INSERT INTO column_date_counts AS x (table_id, c, day, count)
+    SELECT table_id, c, day, delta FROM d
+    ON CONFLICT (table_id, c, day) DO UPDATE SET count = x.count + EXCLUDED.count;
+
+    DELETE FROM column_date_counts x
+    USING (
+        SELECT DISTINCT (e->>'t')::UUID AS table_id, (e->>'c')::INT4 AS c, (e->>'d')::DATE AS day
+        FROM jsonb_array_elements(p_deltas) AS e
+        WHERE e->>'d' IS NOT NULL
+    ) AS d
+    WHERE x.table_id = d.table_id AND x.c = d.c AND x.day = d.day AND x.count <= 0;
+END;
+$$ language 'plpgsql';
+
+-- Deltas for changed cells rows: +1 per new non-empty value, -1 per old one
+CREATE OR REPLACE FUNCTION cell_stat_deltas(p_old cells[], p_new cells[])
+RETURNS JSONB AS $$
+    SELECT jsonb_agg(x)
+    FROM (
+        SELECT jsonb_build_object('t', n.table_id, 'c', n.c, 'v', n.value, 'd', n.value_date, 'n', 1) AS x
+        FROM unnest(COALESCE(p_new, '{}')) AS n
+        WHERE COALESCE(n.value, '') <> ''
+        UNION ALL
+        SELECT jsonb_build_object('t', o.table_id, 'c', o.c, 'v', o.value, 'd', o.value_date, 'n', -1)
+        FROM unnest(COALESCE(p_old, '{}')) AS o
+        WHERE COALESCE(o.value, '') <> ''
+    ) AS s;
+$$ language 'sql' STABLE;
+
+-- Deltas for changed blocks, counting only the entries whose value changed
+CREATE OR REPLACE FUNCTION cell_block_stat_deltas(p_old cell_blocks[], p_new cell_blocks[])
+RETURNS JSONB AS $$
+    WITH old_entries AS (
+        SELECT o.table_id, o.block_idx, e.key, e.value #>> '{}' AS value
+        FROM unnest(COALESCE(p_old, '{}')) AS o, jsonb_each(o.data) AS e
+    ),
+    new_entries AS (
+        SELECT n.table_id, n.block_idx, e.key, e.value #>> '{}' AS value
+        FROM unnest(COALESCE(p_new, '{}')) AS n, jsonb_each(n.data) AS e
+    ),
+    changed AS (
+        SELECT COALESCE(n.table_id, o.table_id) AS table_id,
+               split_part(COALESCE(n.key, o.key), ':', 2)::INT4 AS c,
+               o.value AS old_value, n.value AS new_value
+        FROM old_entries o
+        FULL JOIN new_entries n
+          ON n.table_id = o.table_id AND n.block_idx = o.block_idx AND n.key = o.key
+        WHERE o.value IS DISTINCT FROM n.value
+    ),
+    entries AS (
+        SELECT table_id, c, new_value AS value, 1 AS n FROM changed WHERE new_value IS NOT NULL
+        UNION ALL
+        SELECT table_id, c, old_value, -1 FROM changed WHERE old_value IS NOT NULL
+    )
+    SELECT jsonb_agg(jsonb_build_object(
+        't', e.table_id, 'c', e.c, 'v', e.value,
+        'd', CASE WHEN col.format = 'date' THEN parse_cell_date(e.value) END, 'n', e.n
+    ))
+    FROM entries e
+    LEFT JOIN columns col ON col.table_id = e.table_id AND col.idx = e.c;
+$$ language 'sql' STABLE;
+
+-- Transition table rows are anonymous records, cast to the row type the delta functions take
+CREATE OR REPLACE FUNCTION track_cell_stats()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM apply_cell_stat_deltas(
+            cell_stat_deltas(NULL, (SELECT array_agg(n::cells) FROM new_rows n))
+        );
+    ELSIF TG_OP = 'UPDATE' THEN
+        PERFORM apply_cell_stat_deltas(cell_stat_deltas(
+            (SELECT array_agg(o::cells) FROM old_rows o),
+            (SELECT array_agg(n::cells) FROM new_rows n)
+        ));
+    ELSE
+        PERFORM apply_cell_stat_deltas(
+            cell_stat_deltas((SELECT array_agg(o::cells) FROM old_rows o), NULL)
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION track_cell_block_stats()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM apply_cell_stat_deltas(
+            cell_block_stat_deltas(NULL, (SELECT array_agg(n::cell_blocks) FROM new_rows n))
+        );
+    ELSIF TG_OP = 'UPDATE' THEN
+        PERFORM apply_cell_stat_deltas(cell_block_stat_deltas(
+            (SELECT array_agg(o::cell_blocks) FROM old_rows o),
+            (SELECT array_agg(n::cell_blocks) FROM new_rows n)
+        ));
+    ELSE
+        PERFORM apply_cell_stat_deltas(
+            cell_block_stat_deltas((SELECT array_agg(o::cell_blocks) FROM old_rows o), NULL)
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+-- Recompute a table's stats from its cells; locks the table row so stat deltas of
+-- concurrent writes wait (see apply_cell_stat_deltas)
+CREATE OR REPLACE FUNCTION rebuild_table_stats(p_table_id UUID)
+RETURNS VOID AS $$
+BEGIN
+    PERFORM 1 FROM tables WHERE id = p_table_id FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+
+    DELETE FROM column_stats WHERE table_id = p_table_id;
+    DELETE FROM column_value_counts WHERE table_id = p_table_id;
+    DELETE FROM column_date_counts WHERE table_id = p_table_id;
+
+    INSERT INTO column_value_counts (table_id, c, value_hash, count)
+    SELECT p_table_id, v.c, md5(v.value), count(*)
+    FROM table_cell_values(p_table_id) AS v
+    GROUP BY v.c, md5(v.value);
+
+    INSERT INTO column_stats (table_id, c, non_empty, distinct_values)
+    SELECT p_table_id, c, sum(count), count(*)
+    FROM column_value_counts
+    WHERE table_id = p_table_id
+    GROUP BY c;
+
+    INSERT INTO column_date_counts (table_id, c, day, count)
+    SELECT p_table_id, v.c, parse_cell_date(v.value), count(*)
+    FROM table_cell_values(p_table_id) AS v
+    JOIN columns col ON col.table_id = p_table_id AND col.idx = v.c AND col.format = 'date'
+    WHERE parse_cell_date(v.value) IS NOT NULL
+    GROUP BY v.c, parse_cell_date(v.value);
+
+    INSERT INTO table_stats (table_id, rebuilt_at) VALUES (p_table_id, NOW())
+    ON CONFLICT (table_id) DO UPDATE SET rebuilt_at = EXCLUDED.rebuilt_at;
+END;
+$$ language 'plpgsql';
+
+-- IDs of up to p_limit live, unarchived tables whose stats need a full rebuild, never rebuilt
+-- first: counts that went negative (drift), or changes since the last rebuild (or creation)
+-- once that is older than p_max_age. Each is rebuilt by its own rebuild_table_stats call
+DROP FUNCTION IF EXISTS rebuild_stale_table_stats(INT4);
+CREATE OR REPLACE FUNCTION stale_table_stats(p_max_age INTERVAL, p_limit INT4)
+RETURNS JSONB AS $$
+    SELECT COALESCE(jsonb_agg(id), '[]'::jsonb)
+    FROM (
+        SELECT t.id
+        FROM tables t
+        LEFT JOIN table_stats s ON s.table_id = t.id
+        WHERE t.deleted_at IS NULL AND t.archived_at IS NULL
+          AND (
+              t.id IN (
+                  SELECT table_id FROM column_stats WHERE non_empty < 0 OR distinct_values < 0
+              )
+              OR (COALESCE(s.rebuilt_at, t.created_at) < t.last_activity_at
+                  AND COALESCE(s.rebuilt_at, t.created_at) < NOW() - p_max_age)
+          )
+        ORDER BY s.rebuilt_at NULLS FIRST
+        LIMIT p_limit
+    ) AS stale;
+$$ language 'sql' STABLE;
+
+-- Triggers to keep column stats current (statement-level, one delta batch per statement)
+DROP TRIGGER IF EXISTS track_cell_stats_insert ON cells;
+CREATE TRIGGER track_cell_stats_insert
+    AFTER INSERT ON cells REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION track_cell_stats();
+
+DROP TRIGGER IF EXISTS track_cell_stats_update ON cells;
+CREATE TRIGGER track_cell_stats_update
+    AFTER UPDATE ON cells REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION track_cell_stats();
+
+DROP TRIGGER IF EXISTS track_cell_stats_delete ON cells;
+CREATE TRIGGER track_cell_stats_delete
+    AFTER DELETE ON cells REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION track_cell_stats();
+
+DROP TRIGGER IF EXISTS track_cell_block_stats_insert ON cell_blocks;
+CREATE TRIGGER track_cell_block_stats_insert
+    AFTER INSERT ON cell_blocks REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION track_cell_block_stats();
+
+DROP TRIGGER IF EXISTS track_cell_block_stats_update ON cell_blocks;
+CREATE TRIGGER track_cell_block_stats_update
+    AFTER UPDATE ON cell_blocks REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION track_cell_block_stats();
+
+DROP TRIGGER IF EXISTS track_cell_block_stats_delete ON cell_blocks;
+CREATE TRIGGER track_cell_block_stats_delete
+    AFTER DELETE ON cell_blocks REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION track_cell_block_stats();
+
+-- Archival of idle tables
+-- Move a table's cells into table_archives: {"cells": [[r, c, value], ...], "blocks": {idx: data}}.
+-- Skips tables that are deleted, already archived or active since p_idle; returns whether archived
+CREATE OR REPLACE FUNCTION archive_table(p_table_id UUID, p_idle INTERVAL)
+RETURNS BOOLEAN AS $$
+DECLARE
+    v_last_activity TIMESTAMPTZ;
+BEGIN
+    SELECT last_activity_at INTO v_last_activity
+    FROM tables
+    WHERE id = p_table_id AND deleted_at IS NULL AND archived_at IS NULL
+      AND last_activity_at < NOW() - p_idle
+    FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN false;
+    END IF;
+
+    INSERT INTO table_archives (table_id, data)
+    SELECT p_table_id, jsonb_build_object(
+        'cells', COALESCE((
+            SELECT jsonb_agg(jsonb_build_array(r, c, value) ORDER BY r, c)
+            FROM cells WHERE table_id = p_table_id
+        ), '[]'::jsonb),
+        'blocks', COALESCE((
+            SELECT jsonb_object_agg(block_idx, data)
+            FROM cell_blocks WHERE table_id = p_table_id
+        ), '{}'::jsonb)
+    )
+    ON CONFLICT (table_id) DO UPDATE SET data = EXCLUDED.data, archived_at = NOW();
+
+    DELETE FROM cells WHERE table_id = p_table_id;
+    DELETE FROM cell_blocks WHERE table_id = p_table_id;
+
+    -- Archiving is not activity
+    UPDATE tables SET archived_at = NOW(), last_activity_at = v_last_activity WHERE id = p_table_id;
+    RETURN true;
+END;
+$$ language 'plpgsql';
+
+-- Archive up to p_limit tables idle for longer than p_idle, least recently active first;
+-- tables locked by writers are skipped and picked up by a later batch
+CREATE OR REPLACE FUNCTION archive_idle_tables(p_idle INTERVAL, p_limit INT4)
+RETURNS INT4 AS $$
+DECLARE
+    v_table_id UUID;
+    v_count INT4 := 0;
+BEGIN
+    FOR v_table_id IN
+        SELECT id
+        FROM tables
+        WHERE deleted_at IS NULL AND archived_at IS NULL AND last_activity_at < NOW() - p_idle
+        ORDER BY last_activity_at
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    LOOP
+        IF archive_table(v_table_id, p_idle) THEN
+            v_count := v_count + 1;
+        END IF;
+    END LOOP;
+    RETURN v_count;
+END;
+$$ language 'plpgsql';
+
+-- Restore an archived table's cells; cells written since archiving win over archived ones.
+-- Concurrent callers wait on the archive row and find it gone; returns whether cells were restored
+CREATE OR REPLACE FUNCTION rehydrate_table(p_table_id UUID)
+RETURNS BOOLEAN AS $$
+DECLARE
+    v_data JSONB;
+BEGIN
+    SELECT data INTO v_data FROM table_archives WHERE table_id = p_table_id FOR UPDATE;
+    IF NOT FOUND THEN
+        UPDATE tables SET archived_at = NULL WHERE id = p_table_id AND archived_at IS NOT NULL;
+        RETURN false;
+    END IF;
+
+    INSERT INTO cells (table_id, r, c, value, value_date, value_range)
+    SELECT p_table_id, u.r, u.c, u.value,
+           CASE WHEN col.format = 'date' THEN parse_cell_date(u.value) END,
+           CASE WHEN col.format = 'timerange' THEN parse_cell_timerange(u.value) END
+    FROM (
+        SELECT (e->>0)::INT4 AS r, (e->>1)::INT4 AS c, e->>2 AS value
+        FROM jsonb_array_elements(v_data->'cells') AS e
+    ) u
+    LEFT JOIN columns col ON col.table_id = p_table_id AND col.idx = u.c
+    ON CONFLICT (table_id, r, c) DO NOTHING;
+
+    INSERT INTO cell_blocks (table_id, block_idx, data)
+    SELECT p_table_id, b.key::INT4, b.value
+    FROM jsonb_each(v_data->'blocks') AS b
+    ON CONFLICT (table_id, block_idx) DO UPDATE SET data = EXCLUDED.data || cell_blocks.data;
+
+    DELETE FROM table_archives WHERE table_id = p_table_id;
+    UPDATE tables SET archived_at = NULL WHERE id = p_table_id;
+    RETURN true;
+END;
+$$ language 'plpgsql';
+
+-- Purge of soft-deleted tables
+-- One bounded step: delete up to p_chunk cells (and p_chunk / 64 blocks) of the table deleted
+-- longest ago before p_retention, or the table itself once its cells are gone, so no statement
+-- holds locks for long. Returns {table_id, cells, blocks, purged}, or NULL when nothing is left
+CREATE OR REPLACE FUNCTION purge_deleted_tables_step(p_retention INTERVAL, p_chunk INT4)
+RETURNS JSONB AS $$
+DECLARE
+    v_table_id UUID;
+    v_cells INT4;
+    v_blocks INT4;
+BEGIN
+    SELECT id INTO v_table_id
+    FROM tables
+    WHERE deleted_at < NOW() - p_retention
+    ORDER BY deleted_at
+    LIMIT 1
+    FOR UPDATE SKIP LOCKED;
+    IF NOT FOUND THEN
+        RETURN NULL;
+    END IF;
+
+    DELETE FROM cells
+    WHERE id IN (SELECT id FROM cells WHERE table_id = v_table_id LIMIT p_chunk);
+    GET DIAGNOSTICS v_cells = ROW_COUNT;
+
+    DELETE FROM cell_blocks
+    WHERE table_id = v_table_id
+      AND block_idx IN (
+          SELECT block_idx FROM cell_blocks
+          WHERE table_id = v_table_id
+          LIMIT GREATEST(1, p_chunk / 64)
+      );
+    GET DIAGNOSTICS v_blocks = ROW_COUNT;
+
+    IF v_cells + v_blocks > 0 THEN
+        RETURN jsonb_build_object(
+            'table_id', v_table_id, 'cells', v_cells, 'blocks', v_blocks, 'purged', false
+        );
+    END IF;
+
+    -- Remaining children (columns, comments, snapshots, stats, archive) are small
+    DELETE FROM tables WHERE id = v_table_id;
+    RETURN jsonb_build_object('table_id', v_table_id, 'cells', 0, 'blocks', 0, 'purged', true);
+END;
+$$ language 'plpgsql';
+
+-- Number of soft-deleted tables past p_retention
+CREATE OR REPLACE FUNCTION count_purgeable_tables(p_retention INTERVAL)
+RETURNS INT8 AS $$
+    SELECT count(*) FROM tables WHERE deleted_at < NOW() - p_retention;
+$$ language 'sql' STABLE;
 
 -- Initial seed data for translatable app configuration only
 -- NOTE: Table defaults and other non-translatable config is in JSON files